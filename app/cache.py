@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+# Called with (cache name, key) on every local invalidation so other workers can
+# drop the same entry; key None means the whole cache
+InvalidationPublisher = Callable[[str, Hashable | None], None]
+
+_caches: dict[str, "TTLCache"] = {}
+_publisher: InvalidationPublisher | None = None
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries expire after a TTL"""
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        _caches[name] = self
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """Look up a key, returning (found, value)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(
+        self, key: Hashable, loader: Callable[[], Any], store: bool = True
+    ) -> Any:
+        """Return the cached value, calling the loader on a miss.
+
+        None results are not cached, so lookups of missing rows always go to
+        the database. With store=False a miss is loaded but not cached, for
+        loaders reading data that may be stale, e.g. from a lagging replica.
+        """
+        found, value = self.get(key)
+        if found:
+            return value
+        value = loader()
+        if store and value is not None:
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable | None = None, publish: bool = True):
+        """Drop one key, or every key when key is None, and notify other workers"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+        if publish and _publisher is not None:
+            _publisher(self.name, key)
+
+    def stats(self) -> dict:
+        """Get hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def set_invalidation_publisher(publisher: InvalidationPublisher | None):
+    """Install a hook that broadcasts invalidations to other workers.
+
+    The transport is up to the deployment (Redis pub/sub, Postgres NOTIFY, ...);
+    the receiving side should call apply_remote_invalidation.
+    """
+    global _publisher
+    _publisher = publisher
+
+
+def apply_remote_invalidation(name: str, key: Hashable | None = None):
+    """Apply an invalidation received from another worker without re-publishing"""
+    cache = _caches.get(name)
+    if cache is not None:
+        cache.invalidate(key, publish=False)
+
+
+def clear_caches():
+    """Drop every entry from every registered cache, locally only"""
+    for cache in _caches.values():
+        cache.invalidate(publish=False)
+
+
+def cache_stats() -> dict[str, dict]:
+    """Get stats for every registered cache"""
+    return {name: cache.stats() for name, cache in _caches.items()}
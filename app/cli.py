@@ -0,0 +1,53 @@
+"""Operational commands, run once per deploy rather than on every worker boot.
+
+Usage:
+    python -m app.cli migrate   # apply Alembic migrations up to head
+    python -m app.cli seed      # insert sample data into empty tables
+"""
+
+import argparse
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
+from app.db import SessionLocal
+from app.seed import seed_all
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+def alembic_config() -> Config:
+    return Config(str(ALEMBIC_INI))
+
+
+def migrate(revision: str = "head"):
+    """Upgrade the database schema"""
+    command.upgrade(alembic_config(), revision)
+
+
+def seed():
+    """Seed sample data"""
+    db = SessionLocal()
+    try:
+        seed_all(db)
+    finally:
+        db.close()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Hackathon API management commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = commands.add_parser("migrate", help="apply schema migrations")
+    migrate_parser.add_argument("revision", nargs="?", default="head")
+    commands.add_parser("seed", help="insert sample data into empty tables")
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        migrate(args.revision)
+    elif args.command == "seed":
+        seed()
+
+
+if __name__ == "__main__":
+    main()
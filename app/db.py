@@ -1,19 +1,235 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+import json
+import math
+import time
+
+from fastapi import Request, Response
+from sqlalchemy import (
+    Engine,
+    RowMapping,
+    String,
+    Table,
+    bindparam,
+    column,
+    create_engine,
+    event,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
 
 from app.config import settings
+from app.metrics import instrument_engine
+from app.pool import TimedQueuePool
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def create_db_engine(url: str) -> Engine:
+    """Create an engine with the pool and timeout limits from settings"""
+    connect_args = {}
+    if url.startswith("postgresql") and settings.db_statement_timeout_ms:
+        # Server-side cap so a runaway query can't pin a pooled connection
+        connect_args["options"] = (
+            f"-c statement_timeout={settings.db_statement_timeout_ms}"
+        )
+    engine = create_engine(
+        url,
+        poolclass=TimedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=connect_args,
+    )
+    if url.startswith("sqlite"):
+        # Deletes rely on ON DELETE rules, which SQLite only enforces when asked
+        event.listen(engine, "connect", _enable_sqlite_foreign_keys)
+    instrument_engine(engine)
+    return engine
+
+
+class RoutingSession(Session):
+    """Session that can send reads to a replica while writes stay on the primary.
+
+    Reads go to the replica only once use_replica is set; flushes and
+    INSERT/UPDATE/DELETE statements always go to the primary bind.
+    """
+
+    def __init__(self, *args, replica: Engine | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+        self.use_replica = False
 
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.use_replica
+            and self.replica is not None
+            and not self._flushing
+            and not isinstance(clause, UpdateBase)
+        ):
+            return self.replica
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+def reads_replica(db: Session) -> bool:
+    """Whether the session's reads may lag the primary.
+
+    Shared caches must not be filled from such reads: one written just after
+    an invalidation would hand the old row to every request for the full TTL,
+    including the writer's own requests pinned to the primary.
+    """
+    return getattr(db, "use_replica", False) and db.replica is not None
+
+
+engine = create_db_engine(settings.database_url)
+replica_engine = (
+    create_db_engine(settings.database_replica_url)
+    if settings.database_replica_url
+    else None
+)
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    replica=replica_engine,
+)
+
+READ_METHODS = {"GET", "HEAD"}
+# Holds the time until which a client that just wrote keeps reading from the
+# primary, so it sees its own writes despite replica lag
+PRIMARY_COOKIE = "db_primary_until"
 
 
 class Base(DeclarativeBase):
     pass
 
 
-def get_db():
+def _recently_wrote(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def get_db(request: Request, response: Response):
+    """Yield a session for the request.
+
+    With a replica configured, GET and HEAD requests read from it unless the
+    client wrote within replica_stickiness_seconds; any other method uses the
+    primary and starts that window.
+
+    The session checks a connection out of the pool only when it runs its first
+    statement and hands it back on commit or close, so handlers that never query (or
+    answer from cache) don't hold a pooled connection.
+    """
     db = SessionLocal()
+    if db.replica is not None:
+        if request.method in READ_METHODS:
+            db.use_replica = not _recently_wrote(request)
+        else:
+            window = settings.replica_stickiness_seconds
+            response.set_cookie(
+                PRIMARY_COOKIE,
+                f"{time.time() + window:.3f}",
+                max_age=math.ceil(window),
+                httponly=True,
+            )
     try:
         yield db
     finally:
         db.close()
+
+
+def insert_returning(
+    db: Session, table: Table, values: dict, columns: list
+) -> RowMapping:
+    """Insert one row and read back the given columns in the same statement"""
+    return (
+        db.execute(insert(table).values(**values).returning(*columns)).mappings().one()
+    )
+
+
+def update_returning(
+    db: Session, table: Table, row_id: int, values: dict, columns: list
+) -> RowMapping | None:
+    """Update one row by id and read back the given columns in the same statement.
+
+    Returns None when no row has that id. With nothing to update the row is
+    just selected, so callers can pass partial updates straight through.
+    """
+    if values:
+        statement = (
+            update(table)
+            .where(table.c.id == row_id)
+            .values(**values)
+            .returning(*columns)
+        )
+    else:
+        statement = select(*columns).where(table.c.id == row_id)
+    return db.execute(statement).mappings().first()
+
+
+def dialect_insert(db: Session, table: Table):
+    """An INSERT with the session's database's ON CONFLICT clauses available"""
+    dialects = {"postgresql": postgresql, "sqlite": sqlite}
+    return dialects[db.get_bind().dialect.name].insert(table)
+
+
+def insert_ignoring_conflicts(db: Session, table: Table):
+    """INSERT ... ON CONFLICT DO NOTHING for the session's database"""
+    return dialect_insert(db, table).on_conflict_do_nothing()
+
+
+def insert_many_returning_ids(db: Session, table: Table, rows: list[dict]) -> list[int]:
+    """Insert many rows in bulk and return their new ids in the rows' order.
+
+    PostgreSQL batches the rows and keeps RETURNING in parameter order. SQLite
+    can't promise that order for a batch, so SQLAlchemy sends it one INSERT ...
+    RETURNING per row instead; the database still picks every id.
+    """
+    if not rows:
+        return []
+    return db.scalars(
+        insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+    ).all()
+
+
+def update_rows(db: Session, table: Table, rows: list[dict]) -> int:
+    """Set per-row values on many rows by id in one UPDATE, returning the count.
+
+    The rows travel as a single JSON parameter that the database unpacks into
+    a table to join against, so the statement and its compiled form stay the
+    same size however many rows there are. Every row needs "id" and the same
+    other keys.
+    """
+    if not rows:
+        return 0
+    names = list(rows[0])
+    payload = bindparam("rows", json.dumps(rows), type_=String)
+    if db.get_bind().dialect.name == "sqlite":
+        new = func.json_each(payload).table_valued("value").alias("new")
+        fields = {name: func.json_extract(new.c.value, f"$.{name}") for name in names}
+    else:
+        new = (
+            func.json_to_recordset(payload)
+            .table_valued(*(column(name, table.c[name].type) for name in names))
+            .render_derived(with_types=True)
+            .alias("new")
+        )
+        fields = {name: new.c[name] for name in names}
+    return db.execute(
+        update(table)
+        .where(table.c.id == fields.pop("id"))
+        .values(fields)
+        .execution_options(synchronize_session=False)
+    ).rowcount
@@ -0,0 +1,33 @@
+from fastapi import Request, Response
+
+
+def board_etag(board_id: int, revision: int) -> str:
+    """Build the weak ETag for anything derived from a board's revision"""
+    return f'W/"board-{board_id}-{revision}"'
+
+
+def tags_etag(version: str) -> str:
+    """Build the weak ETag for the tag list"""
+    return f'W/"tags-{version}"'
+
+
+def _opaque_tag(etag: str) -> str:
+    """Strip the weak prefix so tags compare with the weak comparison function"""
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match header matches the ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = _opaque_tag(etag)
+    return any(_opaque_tag(candidate) == wanted for candidate in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """Build an empty 304 response carrying the current ETag"""
+    return Response(status_code=304, headers={"ETag": etag})
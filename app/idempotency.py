@@ -0,0 +1,278 @@
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+
+from app.cache import TTLCache
+from app.config import settings
+from app.db import SessionLocal, insert_ignoring_conflicts
+from app.models.idempotency import IdempotencyKey
+
+IDEMPOTENT_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+MAX_KEY_LENGTH = 255
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+# Specific to the original request, so never replayed
+UNSTORED_HEADERS = {b"set-cookie", b"server-timing"}
+
+KEYS = IdempotencyKey.__table__
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    fingerprint: str
+    # None while the first request with the key is still being handled
+    status_code: int | None
+    headers: list[list[str]]
+    body: bytes
+
+
+# Completed responses never change, so the local copy needs no invalidation
+response_cache = TTLCache(
+    "idempotency",
+    max_entries=settings.idempotency_cache_max_entries,
+    ttl_seconds=settings.idempotency_ttl_seconds,
+)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def fingerprint_request(method: str, path: str, query: bytes, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query, body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def scoped_key(scope, key: str) -> str:
+    """The stored form of a client's key: a digest of who sent it and the key.
+
+    Clients are told apart by their Authorization header, or their address
+    without one, so two clients picking the same key never see each other's
+    responses. Hashing keeps credentials out of the table.
+    """
+    headers = Headers(scope=scope)
+    client = headers.get("authorization")
+    if client is None:
+        client = scope["client"][0] if scope.get("client") else ""
+    digest = hashlib.sha256()
+    for part in (client.encode(), key.encode()):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def claim_key(db: Session, key: str, fingerprint: str) -> StoredResponse | None:
+    """Reserve a key for this request.
+
+    Returns None when the caller now owns the key and should run the handler,
+    otherwise the record of whoever holds it. Expired records are taken over,
+    including claims whose lease ran out before their request finished.
+    """
+    now = _utcnow()
+    values = {
+        "fingerprint": fingerprint,
+        "status_code": None,
+        "headers": None,
+        "body": None,
+        "expires_at": now + timedelta(seconds=settings.idempotency_claim_lease_seconds),
+    }
+    claimed = db.execute(
+        insert_ignoring_conflicts(db, KEYS).values(key=key, **values)
+    ).rowcount
+    if not claimed:
+        claimed = db.execute(
+            update(KEYS)
+            .where(KEYS.c.key == key, KEYS.c.expires_at <= now)
+            .values(**values)
+        ).rowcount
+    db.commit()
+    if claimed:
+        return None
+    row = db.execute(
+        select(
+            KEYS.c.fingerprint, KEYS.c.status_code, KEYS.c.headers, KEYS.c.body
+        ).where(KEYS.c.key == key)
+    ).first()
+    # Purged between the two statements: nobody else is using the key
+    return StoredResponse(row[0], row[1], row[2] or [], row[3] or b"") if row else None
+
+
+def store_response(db: Session, key: str, response: StoredResponse):
+    db.execute(
+        update(KEYS)
+        .where(KEYS.c.key == key)
+        .values(
+            status_code=response.status_code,
+            headers=response.headers,
+            body=response.body,
+            expires_at=_utcnow() + timedelta(seconds=settings.idempotency_ttl_seconds),
+        )
+    )
+    db.commit()
+
+
+def release_key(db: Session, key: str):
+    """Forget a key whose request failed, so a retry runs the handler again"""
+    db.execute(delete(KEYS).where(KEYS.c.key == key, KEYS.c.status_code.is_(None)))
+    db.commit()
+
+
+def purge_expired_keys(db: Session) -> int:
+    """Delete expired keys, returning how many were removed"""
+    removed = db.execute(delete(KEYS).where(KEYS.c.expires_at <= _utcnow())).rowcount
+    db.commit()
+    return removed
+
+
+def _with_session(function, *args):
+    db = SessionLocal()
+    try:
+        return function(db, *args)
+    finally:
+        db.close()
+
+
+async def run_idempotency_key_purge(interval_seconds: float):
+    """Purge expired idempotency keys forever, sleeping between runs"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            removed = await asyncio.to_thread(_with_session, purge_expired_keys)
+            print(f"Idempotency key purge removed {removed} keys")
+        except Exception as e:
+            print(f"Idempotency key purge failed: {e}")
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+async def _replay(response: StoredResponse, send):
+    headers = [(n.encode("latin-1"), v.encode("latin-1")) for n, v in response.headers]
+    await send(
+        {
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": [*headers, REPLAYED_HEADER],
+        }
+    )
+    await send({"type": "http.response.body", "body": response.body})
+
+
+class IdempotencyMiddleware:
+    """Pure ASGI middleware that runs a write at most once per Idempotency-Key.
+
+    Keys are scoped to the client sending them (see scoped_key). The first
+    request with a key claims it in the idempotency_keys table and its
+    response is stored there and in a local LRU; retries with the same key get
+    that response back without the handler running. Reusing a key for a
+    different request is a 422, and any request that arrives while the first
+    one is still running gets a 409, until the claim's lease runs out. Server
+    errors release the key so the write can be retried.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS:
+            await self.app(scope, receive, send)
+            return
+        key = Headers(scope=scope).get("idempotency-key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                status_code=400,
+                content={
+                    "detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"
+                },
+            )
+            await response(scope, receive, send)
+            return
+
+        key = scoped_key(scope, key)
+        body = await _read_body(receive)
+        fingerprint = fingerprint_request(
+            scope["method"], scope["path"], scope["query_string"], body
+        )
+        found, stored = response_cache.get(key)
+        if not found:
+            stored = await run_in_threadpool(_with_session, claim_key, key, fingerprint)
+            if stored is not None and stored.status_code is not None:
+                response_cache.set(key, stored)
+
+        if stored is not None:
+            if stored.status_code is None:
+                response = JSONResponse(
+                    status_code=409,
+                    content={
+                        "detail": "A request with this Idempotency-Key is running"
+                    },
+                    headers={"Retry-After": "1"},
+                )
+            elif stored.fingerprint != fingerprint:
+                response = JSONResponse(
+                    status_code=422,
+                    content={
+                        "detail": "Idempotency-Key was already used for another request"
+                    },
+                )
+            else:
+                await _replay(stored, send)
+                return
+            await response(scope, receive, send)
+            return
+
+        body_sent = False
+
+        async def receive_body():
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        status = None
+        headers: list[list[str]] = []
+        chunks: list[bytes] = []
+
+        async def send_and_capture(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers.extend(
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                    if name.lower() not in UNSTORED_HEADERS
+                )
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_and_capture)
+        except BaseException:
+            await run_in_threadpool(_with_session, release_key, key)
+            raise
+        if status is None or status >= 500:
+            await run_in_threadpool(_with_session, release_key, key)
+            return
+        stored = StoredResponse(fingerprint, status, headers, b"".join(chunks))
+        await run_in_threadpool(_with_session, store_response, key, stored)
+        response_cache.set(key, stored)
@@ -1,160 +1,59 @@
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import Session
 
-from app.db import Base, engine, get_db
-from app.models.board import Board as BoardModel
-from app.models.idea import Idea as IdeaModel
+from app.cache import cache_stats
+from app.config import settings
+from app.db import engine, get_db
+from app.idempotency import IdempotencyMiddleware, run_idempotency_key_purge
+from app.metrics import MetricsMiddleware, registry
 from app.models.item import Item as ItemModel
-from app.models.tag import Tag as TagModel
-from app.routers import ai, boards, connections, groups, ideas, tags
+from app.pool import pool_stats
+from app.routers import ai, boards, connections, groups, ideas, snapshots, tags
 from app.schemas.item import Item as ItemSchema
-
-
-def seed_database(db: Session):
-    """Seed the database with sample items if empty"""
-    if db.query(ItemModel).count() == 0:
-        sample_items = [
-            ItemModel(
-                name="Widget", description="A useful widget for your desk", price=9.99
-            ),
-            ItemModel(
-                name="Gadget", description="A fancy gadget with buttons", price=19.99
-            ),
-            ItemModel(
-                name="Gizmo",
-                description="An amazing gizmo that does things",
-                price=29.99,
-            ),
-        ]
-        db.add_all(sample_items)
-        db.commit()
-        print("Database seeded with sample items")
-
-
-def seed_boards_and_tags(db: Session):
-    """Seed the database with sample boards and tags if empty"""
-    if db.query(BoardModel).count() == 0:
-        sample_boards = [
-            BoardModel(
-                name="Hackathon Ideas",
-                description="Ideas for our hackathon project",
-                color="#3b82f6",
-            ),
-            BoardModel(
-                name="Future Features",
-                description="Features to consider for future releases",
-                color="#22c55e",
-            ),
-        ]
-        db.add_all(sample_boards)
-        db.commit()
-        print("Database seeded with sample boards")
-
-    if db.query(TagModel).count() == 0:
-        sample_tags = [
-            TagModel(name="ai", color="#8b5cf6"),
-            TagModel(name="ux", color="#ec4899"),
-            TagModel(name="backend", color="#3b82f6"),
-            TagModel(name="frontend", color="#22c55e"),
-            TagModel(name="priority", color="#ef4444"),
-        ]
-        db.add_all(sample_tags)
-        db.commit()
-        print("Database seeded with sample tags")
-
-
-def seed_ideas(db: Session):
-    """Seed the database with sample ideas if empty"""
-    if db.query(IdeaModel).count() == 0:
-        # Get the first board to assign ideas to
-        board = db.query(BoardModel).first()
-        board_id = board.id if board else None
-
-        # Get some tags
-        ai_tag = db.query(TagModel).filter(TagModel.name == "ai").first()
-        ux_tag = db.query(TagModel).filter(TagModel.name == "ux").first()
-        backend_tag = db.query(TagModel).filter(TagModel.name == "backend").first()
-        priority_tag = db.query(TagModel).filter(TagModel.name == "priority").first()
-
-        sample_ideas = [
-            IdeaModel(
-                title="AI-powered code review",
-                description="Use LLMs to automatically review pull requests",
-                color="yellow",
-                position_x=100,
-                position_y=100,
-                votes=5,
-                board_id=board_id,
-            ),
-            IdeaModel(
-                title="Smart home dashboard",
-                description="Central control for all IoT devices",
-                color="blue",
-                position_x=350,
-                position_y=150,
-                votes=3,
-                board_id=board_id,
-            ),
-            IdeaModel(
-                title="Team mood tracker",
-                description="Daily check-ins with emoji reactions",
-                color="pink",
-                position_x=600,
-                position_y=100,
-                votes=7,
-                board_id=board_id,
-            ),
-            IdeaModel(
-                title="Carbon footprint calculator",
-                description="Track environmental impact of daily activities",
-                color="green",
-                position_x=150,
-                position_y=350,
-                votes=2,
-                board_id=board_id,
-            ),
-            IdeaModel(
-                title="Habit gamification app",
-                description="Turn daily habits into RPG quests",
-                color="purple",
-                position_x=450,
-                position_y=400,
-                votes=4,
-                board_id=board_id,
-            ),
-        ]
-        db.add_all(sample_ideas)
-        db.commit()
-
-        # Add tags to some ideas
-        ideas = db.query(IdeaModel).all()
-        if ai_tag and len(ideas) > 0:
-            ideas[0].tags.append(ai_tag)
-        if backend_tag and len(ideas) > 0:
-            ideas[0].tags.append(backend_tag)
-        if ux_tag and len(ideas) > 1:
-            ideas[1].tags.append(ux_tag)
-        if priority_tag and len(ideas) > 2:
-            ideas[2].tags.append(priority_tag)
-        db.commit()
-
-        print("Database seeded with sample ideas")
+from app.services.ai_job_service import run_ai_job_workers, run_summary_refresher
+from app.services.ranking_service import run_vote_count_purge
+from app.services.revision_service import run_change_log_compaction
+from app.services.snapshot_service import run_board_snapshots
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: create tables and seed data
-    Base.metadata.create_all(bind=engine)
-    db = next(get_db())
-    seed_database(db)
-    seed_boards_and_tags(db)
-    seed_ideas(db)
-    db.close()
+    # Startup: schema and sample data are handled by `python -m app.cli`, not
+    # on every worker boot
+    compaction = asyncio.create_task(
+        run_change_log_compaction(settings.change_log_compaction_interval_seconds)
+    )
+    purge = asyncio.create_task(
+        run_idempotency_key_purge(settings.idempotency_purge_interval_seconds)
+    )
+    ai_jobs = asyncio.create_task(
+        run_ai_job_workers(
+            settings.ai_job_workers, settings.ai_job_poll_interval_seconds
+        )
+    )
+    summaries = asyncio.create_task(
+        run_summary_refresher(settings.summary_refresh_interval_seconds)
+    )
+    vote_counts = asyncio.create_task(
+        run_vote_count_purge(settings.vote_count_purge_interval_seconds)
+    )
+    board_snapshots = asyncio.create_task(
+        run_board_snapshots(settings.snapshot_interval_seconds)
+    )
     yield
-    # Shutdown: cleanup if needed
+    # Shutdown: stop background tasks
+    compaction.cancel()
+    purge.cancel()
+    ai_jobs.cancel()
+    summaries.cancel()
+    vote_counts.cancel()
+    board_snapshots.cancel()
 
 
 app = FastAPI(
@@ -164,6 +63,8 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Innermost, so replayed responses still get CORS headers and show in metrics
+app.add_middleware(IdempotencyMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -171,6 +72,18 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware, query_debug=settings.query_debug)
+
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    """Shed load with a retryable 503 when no pooled connection frees up in time"""
+    print("Connection pool exhausted, shedding request with 503")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
 
 
 @app.get("/")
@@ -183,6 +96,24 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Get hit/miss counters for the in-process caches"""
+    return cache_stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Per-route latency and DB usage in Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/db/pool")
+async def get_pool_stats():
+    """Get connection pool occupancy and checkout wait times"""
+    return pool_stats(engine)
+
+
 @app.get("/items", response_model=list[ItemSchema])
 async def get_items(db: Session = Depends(get_db)):
     """Get all items from the database"""
@@ -204,4 +135,5 @@ app.include_router(boards.router)
 app.include_router(connections.router)
 app.include_router(groups.router)
 app.include_router(ideas.router)
+app.include_router(snapshots.router)
 app.include_router(tags.router)
@@ -0,0 +1,221 @@
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import Engine, event
+
+from app.query_debug import CapturedStatement, report_request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+@dataclass
+class RequestStats:
+    """DB work done while handling one request"""
+
+    queries: int = 0
+    db_seconds: float = 0.0
+    # Only collected in query debug mode
+    statements: list[CapturedStatement] | None = None
+
+
+# Called with (method, route, stats) after every request, e.g. by the test
+# suite's query budget plugin
+RequestObserver = Callable[[str, str, RequestStats], None]
+request_observers: list[RequestObserver] = []
+
+# Extra Prometheus lines appended to every render, e.g. by the rate limiters
+MetricCollector = Callable[[], list[str]]
+metric_collectors: list[MetricCollector] = []
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_request_stats() -> RequestStats | None:
+    return _request_stats.get()
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus exposition layout"""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        # One slot per bucket plus +Inf; stored non-cumulative, summed on render
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.total}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Per-route request counters and histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: dict[tuple[str, str, int], int] = {}
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.queries: dict[tuple[str, str], Histogram] = {}
+        self.db_seconds: dict[tuple[str, str], float] = {}
+
+    def record(
+        self, method: str, route: str, status: int, seconds: float, stats: RequestStats
+    ):
+        key = (method, route)
+        with self._lock:
+            self.requests[(method, route, status)] = (
+                self.requests.get((method, route, status), 0) + 1
+            )
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.queries[key] = Histogram(QUERY_COUNT_BUCKETS)
+                self.db_seconds[key] = 0.0
+            self.latency[key].observe(seconds)
+            self.queries[key].observe(stats.queries)
+            self.db_seconds[key] += stats.db_seconds
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+            self.latency.clear()
+            self.queries.clear()
+            self.db_seconds.clear()
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        with self._lock:
+            lines = [
+                "# HELP http_requests_total Requests handled, by route and status.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'http_requests_total{{method="{method}",route="{route}",'
+                    f'status="{status}"}} {count}'
+                )
+            lines += [
+                "# HELP http_request_duration_seconds Request latency.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), histogram in sorted(self.latency.items()):
+                labels = f'method="{method}",route="{route}"'
+                lines += histogram.render("http_request_duration_seconds", labels)
+            lines += [
+                "# HELP db_queries_per_request SQL statements executed per request.",
+                "# TYPE db_queries_per_request histogram",
+            ]
+            for (method, route), histogram in sorted(self.queries.items()):
+                labels = f'method="{method}",route="{route}"'
+                lines += histogram.render("db_queries_per_request", labels)
+            lines += [
+                "# HELP db_query_seconds_total Time spent executing SQL.",
+                "# TYPE db_query_seconds_total counter",
+            ]
+            for (method, route), seconds in sorted(self.db_seconds.items()):
+                lines.append(
+                    f'db_query_seconds_total{{method="{method}",route="{route}"}} '
+                    f"{seconds}"
+                )
+        for collector in metric_collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the statement's own context, which is dropped whether or not the
+    # statement succeeds, so a failure can't leave a start time behind on a
+    # pooled connection
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = context._query_started
+    stats = _request_stats.get()
+    if stats is not None:
+        elapsed = time.perf_counter() - started
+        stats.queries += 1
+        stats.db_seconds += elapsed
+        if stats.statements is not None:
+            stats.statements.append(CapturedStatement(statement, parameters, elapsed))
+
+
+def instrument_engine(engine: Engine):
+    """Count statements and DB time against the request being handled"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency and DB usage per route.
+
+    Routes are labelled by their path template (/ideas/{idea_id}) so label
+    cardinality stays bounded; unmatched paths share one label. Each response
+    gets a Server-Timing header with the DB time and query count so far. With
+    query_debug on, every statement is kept and N+1 patterns and slow queries
+    are logged per request.
+    """
+
+    def __init__(self, app, query_debug: bool = False):
+        self.app = app
+        self.query_debug = query_debug
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(statements=[] if self.query_debug else None)
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} '
+                    f'queries", app;dur={elapsed:.1f}'
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", timing.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            method = scope["method"]
+            route = getattr(scope.get("route"), "path", "unmatched")
+            registry.record(method, route, status, time.perf_counter() - started, stats)
+            if stats.statements:
+                report_request(method, route, stats.statements)
+            for observer in request_observers:
+                observer(method, route, stats)
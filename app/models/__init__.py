@@ -0,0 +1,29 @@
+from app.models.ai_job import AIJob
+from app.models.board import Board
+from app.models.board_summary import BoardSummary
+from app.models.change import BoardChange, RevisionCounter
+from app.models.connection import IdeaConnection
+from app.models.group import IdeaGroup
+from app.models.idea import Idea
+from app.models.idempotency import IdempotencyKey
+from app.models.item import Item
+from app.models.snapshot import BoardSnapshot
+from app.models.tag import Tag, idea_tags
+from app.models.vote import IdeaVoteCount
+
+__all__ = [
+    "AIJob",
+    "Board",
+    "BoardSummary",
+    "BoardChange",
+    "BoardSnapshot",
+    "Idea",
+    "IdempotencyKey",
+    "IdeaConnection",
+    "IdeaGroup",
+    "IdeaVoteCount",
+    "Item",
+    "RevisionCounter",
+    "Tag",
+    "idea_tags",
+]
@@ -0,0 +1,30 @@
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.db import Base
+
+
+class AIJob(Base):
+    """A queued or finished AI request, processed by the background job workers"""
+
+    __tablename__ = "ai_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # summarize, suggest or categorize
+    kind = Column(String(20), nullable=False)
+    # queued, running, succeeded or failed
+    status = Column(String(20), nullable=False, default="queued")
+    board_id = Column(
+        Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=True
+    )
+    payload = Column(JSON, nullable=False)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    # POSTed the finished job, if set
+    callback_url = Column(String(2000), nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (Index("ix_ai_jobs_status_id", "status", "id"),)
@@ -14,5 +14,18 @@ class Board(Base):
     color = Column(String(20), default="#3b82f6")
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    # Bumped by every write that changes what the board's read endpoints return
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
+    # Change log entries at or below this revision may have been pruned
+    compacted_revision = Column(Integer, nullable=False, default=0, server_default="0")
+    # Revision of the latest snapshot, or of the one a worker has claimed to take
+    snapshot_revision = Column(Integer, nullable=False, default=0, server_default="0")
 
-    ideas = relationship("Idea", back_populates="board", cascade="all, delete-orphan")
+    # Child rows are removed by ON DELETE CASCADE rather than loaded and deleted
+    # one by one
+    ideas = relationship(
+        "Idea",
+        back_populates="board",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
@@ -0,0 +1,26 @@
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String, Text
+
+from app.db import Base
+
+
+class BoardSummary(Base):
+    """The latest AI summary of a board and the edits made since it was generated"""
+
+    __tablename__ = "board_summaries"
+
+    board_id = Column(
+        Integer, ForeignKey("boards.id", ondelete="CASCADE"), primary_key=True
+    )
+    summary = Column(Text, nullable=False)
+    themes = Column(JSON, nullable=False)
+    top_priority = Column(String(200), nullable=True)
+    # Timestamps are stored naive, in UTC
+    generated_at = Column(DateTime, nullable=False)
+    # Idea creates, content edits and deletes since generated_at
+    pending_edits = Column(Integer, nullable=False, default=0, server_default="0")
+    pending_votes = Column(Integer, nullable=False, default=0, server_default="0")
+    # First and latest counted change, for debouncing regeneration
+    first_change_at = Column(DateTime, nullable=True)
+    last_change_at = Column(DateTime, nullable=True)
+    # Background job regenerating the summary, if one was queued
+    refresh_job_id = Column(Integer, nullable=True)
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.sql import func
+
+from app.db import Base
+
+
+class BoardChange(Base):
+    """Append-only log of entity changes, keyed by the board revision they made"""
+
+    __tablename__ = "board_changes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    board_id = Column(
+        Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False
+    )
+    revision = Column(Integer, nullable=False)
+    # idea, group, connection or idea_tags (keyed by idea id)
+    entity_type = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    # upsert or delete
+    operation = Column(String(10), nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (Index("ix_board_changes_board_revision", "board_id", "revision"),)
+
+
+class RevisionCounter(Base):
+    """Named revision counters for data without a board, e.g. the tag list"""
+
+    __tablename__ = "revision_counters"
+
+    name = Column(String(50), primary_key=True)
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
@@ -10,10 +10,10 @@ class IdeaConnection(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     source_id = Column(
-        Integer, ForeignKey("ideas.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("ideas.id", ondelete="CASCADE"), nullable=False, index=True
     )
     target_id = Column(
-        Integer, ForeignKey("ideas.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("ideas.id", ondelete="CASCADE"), nullable=False, index=True
     )
     label = Column(String(50), nullable=True)
     connection_type = Column(String(20), default="relates_to")
@@ -12,15 +12,17 @@ class IdeaGroup(Base):
     name = Column(String(100), nullable=False)
     color = Column(String(20), default="#6b7280")
     board_id = Column(
-        Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=True
+        Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=True, index=True
     )
     position_x = Column(Float, default=0.0)
     position_y = Column(Float, default=0.0)
     width = Column(Float, default=400.0)
     height = Column(Float, default=300.0)
     is_collapsed = Column(Boolean, default=False)
+    # The group this one was copied from when its board was cloned
+    cloned_from_id = Column(Integer, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
 
     # Relationships
     board = relationship("Board")
-    ideas = relationship("Idea", back_populates="group")
+    ideas = relationship("Idea", back_populates="group", passive_deletes=True)
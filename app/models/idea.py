@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -19,17 +19,42 @@ class Idea(Base):
     height = Column(Float, default=150.0)
     rotation = Column(Float, default=0.0)
     votes = Column(Integer, default=0)
+    # The idea this one was copied from when its board was cloned; not a
+    # foreign key, since the original may be deleted since
+    cloned_from_id = Column(Integer, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
 
     # Board relationship
-    board_id = Column(Integer, ForeignKey("boards.id"), nullable=True)
+    board_id = Column(
+        Integer,
+        ForeignKey("boards.id", ondelete="CASCADE"),
+        nullable=True,
+        index=True,
+    )
     board = relationship("Board", back_populates="ideas")
 
     # Group relationship
     group_id = Column(
-        Integer, ForeignKey("idea_groups.id", ondelete="SET NULL"), nullable=True
+        Integer,
+        ForeignKey("idea_groups.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
     )
     group = relationship("IdeaGroup", back_populates="ideas")
 
     # Tags relationship
     tags = relationship("Tag", secondary=idea_tags, back_populates="ideas")
+
+    __table_args__ = (
+        # Top ideas per board read straight off the index, already in order
+        Index("ix_ideas_board_votes", "board_id", votes.desc()),
+        # Maps originals to their copies while a board is cloned; ideas that
+        # were never cloned stay out of it
+        Index(
+            "ix_ideas_cloned_from",
+            "cloned_from_id",
+            "board_id",
+            sqlite_where=cloned_from_id.is_not(None),
+            postgresql_where=cloned_from_id.is_not(None),
+        ),
+    )
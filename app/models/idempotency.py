@@ -0,0 +1,19 @@
+from sqlalchemy import JSON, Column, DateTime, Integer, LargeBinary, String
+
+from app.db import Base
+
+
+class IdempotencyKey(Base):
+    """A client-supplied Idempotency-Key and the response it produced"""
+
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(255), primary_key=True)
+    # sha256 of method, path, query and body, to reject reuse for another request
+    fingerprint = Column(String(64), nullable=False)
+    # NULL while the first request with this key is still being handled
+    status_code = Column(Integer, nullable=True)
+    headers = Column(JSON, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    # Stored naive, in UTC
+    expires_at = Column(DateTime, nullable=False, index=True)
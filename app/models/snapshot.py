@@ -0,0 +1,46 @@
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+)
+from sqlalchemy.sql import func
+
+from app.db import Base
+
+
+class BoardSnapshot(Base):
+    """A saved copy of a board's ideas, groups, connections and tag links.
+
+    `data` holds only what changed since the base snapshot, in the compressed
+    columnar format of app.columnar; a snapshot without a base holds the whole
+    board. Rebuilding one walks the chain of bases back to that full copy.
+    """
+
+    __tablename__ = "board_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    board_id = Column(
+        Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False
+    )
+    base_id = Column(
+        Integer, ForeignKey("board_snapshots.id", ondelete="CASCADE"), nullable=True
+    )
+    # Snapshots between this one and the full copy its chain starts from
+    depth = Column(Integer, nullable=False, default=0, server_default="0")
+    # The board's revision when the snapshot was taken
+    revision = Column(Integer, nullable=False)
+    # manual, periodic, or restore for the copy taken before restoring another
+    kind = Column(String(20), nullable=False)
+    label = Column(String(100), nullable=True)
+    idea_count = Column(Integer, nullable=False)
+    group_count = Column(Integer, nullable=False)
+    connection_count = Column(Integer, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (Index("ix_board_snapshots_board_id", "board_id", "id"),)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Table
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Table
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -14,6 +14,8 @@ idea_tags = Table(
     Column(
         "tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True
     ),
+    # The primary key covers lookups by idea; this covers tag filters and deletes
+    Index("ix_idea_tags_tag_id", "tag_id"),
 )
 
 
@@ -25,4 +27,6 @@ class Tag(Base):
     color = Column(String(20), default="#6b7280")
     created_at = Column(DateTime, server_default=func.now())
 
-    ideas = relationship("Idea", secondary=idea_tags, back_populates="tags")
+    ideas = relationship(
+        "Idea", secondary=idea_tags, back_populates="tags", passive_deletes=True
+    )
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer
+
+from app.db import Base
+
+
+class IdeaVoteCount(Base):
+    """Votes cast per idea per minute, kept for a day to rank trending ideas"""
+
+    __tablename__ = "idea_vote_counts"
+
+    idea_id = Column(
+        Integer, ForeignKey("ideas.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Whole minutes since the Unix epoch
+    minute = Column(Integer, primary_key=True)
+    # Copied from the idea so trending per board needs no join
+    board_id = Column(
+        Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=True
+    )
+    votes = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_idea_vote_counts_board_minute", "board_id", "minute"),
+        Index("ix_idea_vote_counts_minute", "minute"),
+    )
@@ -0,0 +1,65 @@
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+from app.config import settings
+
+# Expanded IN lists and VALUES rows vary in length with the data; collapse
+# them so the same query shape is recognised regardless of how many ids it had
+_PLACEHOLDER_LIST = re.compile(
+    r"\((?:\s*(?:\?|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|:\w+)\s*\)"
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class CapturedStatement:
+    statement: str
+    parameters: Any
+    seconds: float
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so repeats with different parameters compare equal"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    return _PLACEHOLDER_LIST.sub("(?)", shape)
+
+
+def find_repeated(
+    statements: list[CapturedStatement], threshold: int
+) -> list[tuple[str, int]]:
+    """Statement shapes executed at least threshold times: likely N+1 loads"""
+    counts = Counter(statement_shape(s.statement) for s in statements)
+    return [
+        (shape, count) for shape, count in counts.most_common() if count >= threshold
+    ]
+
+
+def find_slow(
+    statements: list[CapturedStatement], threshold_ms: float
+) -> list[CapturedStatement]:
+    return [s for s in statements if s.seconds * 1000 >= threshold_ms]
+
+
+def _short(value: Any, limit: int = 200) -> str:
+    text = repr(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def report_request(method: str, route: str, statements: list[CapturedStatement]):
+    """Log N+1 patterns and slow statements seen while handling one request"""
+    for shape, count in find_repeated(
+        statements, settings.query_debug_repeat_threshold
+    ):
+        example = next(s for s in statements if statement_shape(s.statement) == shape)
+        print(
+            f"[query-debug] {method} {route}: possible N+1, {count}x {_short(shape)} "
+            f"(e.g. params {_short(example.parameters)})"
+        )
+    for slow in find_slow(statements, settings.query_debug_slow_ms):
+        print(
+            f"[query-debug] {method} {route}: slow query {slow.seconds * 1000:.1f} ms "
+            f"{_short(statement_shape(slow.statement))} "
+            f"params {_short(slow.parameters)}"
+        )
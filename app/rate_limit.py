@@ -0,0 +1,202 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Protocol
+
+from fastapi import HTTPException
+
+from app.metrics import metric_collectors
+
+
+class RateLimitBackend(Protocol):
+    def take(self, key: str, rate_per_second: float, burst: int) -> float:
+        """Take a token from a key's bucket.
+
+        Returns 0 when the call is allowed, otherwise the seconds until the
+        next token frees up.
+        """
+
+
+class MemoryBuckets:
+    """Token buckets kept in this process, least recently used dropped first"""
+
+    def __init__(self, max_keys: int = 10_000):
+        self.max_keys = max_keys
+        # key -> (tokens, monotonic time of last refill)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate_per_second: float, burst: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate_per_second)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate_per_second
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+_backend: RateLimitBackend = MemoryBuckets()
+_rate_limits: dict[str, "RateLimit"] = {}
+_limiters: dict[str, "ConcurrencyLimiter"] = {}
+
+
+def set_rate_limit_backend(backend: RateLimitBackend | None):
+    """Share buckets between workers, e.g. through Redis.
+
+    Without one each worker enforces the limits on its own, so the effective
+    limit is multiplied by the number of workers.
+    """
+    global _backend
+    _backend = backend or MemoryBuckets()
+
+
+def clear_rate_limits():
+    """Refill every in-process bucket, e.g. between tests"""
+    if isinstance(_backend, MemoryBuckets):
+        with _backend._lock:
+            _backend._buckets.clear()
+
+
+def _retry_after(seconds: float) -> dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+class RateLimit:
+    """A token bucket per key: `per_minute` sustained, bursts of up to `burst`"""
+
+    def __init__(self, name: str, per_minute: float, burst: int):
+        self.name = name
+        self.per_minute = per_minute
+        self.burst = burst
+        self.limited = 0
+        _rate_limits[name] = self
+
+    def check(self, key: str | int):
+        """Raise a 429 when the key is over its limit"""
+        wait = _backend.take(f"{self.name}:{key}", self.per_minute / 60, self.burst)
+        if wait:
+            self.limited += 1
+            raise HTTPException(
+                status_code=429,
+                detail=f"Rate limit exceeded ({self.name}), please retry later",
+                headers=_retry_after(wait),
+            )
+
+
+class ConcurrencyLimiter:
+    """Caps concurrent calls, queueing a bounded number and shedding the rest.
+
+    Callers beyond max_concurrent wait in FIFO order; when max_queue are
+    already waiting, or a caller waits longer than queue_timeout, it gets a
+    503. Meant for one event loop, so no locking.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float,
+        retry_after: float = 1.0,
+    ):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.shed = {"queue_full": 0, "queue_timeout": 0}
+        self._waiters: deque[asyncio.Future] = deque()
+        _limiters[name] = self
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _overloaded(self, reason: str) -> HTTPException:
+        self.shed[reason] += 1
+        return HTTPException(
+            status_code=503,
+            detail=f"Too many {self.name} requests in progress, please retry",
+            headers=_retry_after(self.retry_after),
+        )
+
+    async def acquire(self):
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._overloaded("queue_full")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except BaseException as e:
+            if waiter.done():
+                # release() handed us its slot just as we gave up: pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, TimeoutError):
+                raise self._overloaded("queue_timeout") from None
+            raise
+
+    def release(self):
+        """Hand the slot to the next waiter, or free it"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+
+def render_metrics() -> list[str]:
+    lines = [
+        "# HELP rate_limited_total Requests rejected with 429, by limit.",
+        "# TYPE rate_limited_total counter",
+    ]
+    for name, limit in sorted(_rate_limits.items()):
+        lines.append(f'rate_limited_total{{limit="{name}"}} {limit.limited}')
+    lines += [
+        "# HELP limiter_in_flight Calls currently holding a concurrency slot.",
+        "# TYPE limiter_in_flight gauge",
+    ]
+    for name, limiter in sorted(_limiters.items()):
+        lines.append(f'limiter_in_flight{{limiter="{name}"}} {limiter.in_flight}')
+    lines += [
+        "# HELP limiter_queue_depth Calls waiting for a concurrency slot.",
+        "# TYPE limiter_queue_depth gauge",
+    ]
+    for name, limiter in sorted(_limiters.items()):
+        lines.append(f'limiter_queue_depth{{limiter="{name}"}} {limiter.queued}')
+    lines += [
+        "# HELP limiter_shed_total Calls rejected with 503, by reason.",
+        "# TYPE limiter_shed_total counter",
+    ]
+    for name, limiter in sorted(_limiters.items()):
+        for reason, count in sorted(limiter.shed.items()):
+            lines.append(
+                f'limiter_shed_total{{limiter="{name}",reason="{reason}"}} {count}'
+            )
+    return lines
+
+
+metric_collectors.append(render_metrics)
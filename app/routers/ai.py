@@ -1,15 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
 from app.db import get_db
-from app.models.board import Board
-from app.models.tag import Tag
-from app.services import ai_service
+from app.models.idea import Idea
+from app.rate_limit import ConcurrencyLimiter, RateLimit
+from app.schemas.ai_job import AIJobCreate, AIJobResponse
+from app.services import (
+    ai_job_service,
+    ai_service,
+    metadata_service,
+    summary_service,
+)
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
+client_limit = RateLimit(
+    "ai_client", settings.ai_rate_per_client_per_minute, settings.ai_burst_per_client
+)
+board_limit = RateLimit(
+    "ai_board", settings.ai_rate_per_board_per_minute, settings.ai_burst_per_board
+)
+# Model calls run in the threadpool; this keeps them from taking all of it
+model_calls = ConcurrencyLimiter(
+    "ai",
+    max_concurrent=settings.ai_max_concurrent,
+    max_queue=settings.ai_max_queue,
+    queue_timeout=settings.ai_queue_timeout_seconds,
+)
+
 
 class SuggestionsRequest(BaseModel):
     board_id: int
@@ -27,6 +50,10 @@ class SummarizeResponse(BaseModel):
     summary: str
     themes: list[str]
     top_priority: str | None
+    # Set once enough ideas changed since generated_at; a refresh is on its way
+    stale: bool = False
+    generated_at: datetime | None = None
+    age_seconds: float = 0.0
 
 
 class CategorizeRequest(BaseModel):
@@ -47,58 +74,144 @@ def check_api_key():
         )
 
 
-@router.post("/suggestions", response_model=SuggestionsResponse)
-async def get_suggestions(request: SuggestionsRequest, db: Session = Depends(get_db)):
-    """Generate idea suggestions for a board"""
-    check_api_key()
+def check_client_limit(http_request: Request):
+    """Raise a 429 if the calling client is over its AI limit"""
+    client_limit.check(http_request.client.host if http_request.client else "unknown")
+
+
+def require_board(db: Session, board_id: int) -> dict:
+    """Get the board an AI request is for, then charge its rate limit.
 
-    board = db.query(Board).filter(Board.id == request.board_id).first()
+    The board is looked up first so requests for missing boards get a 404
+    without using up a bucket.
+    """
+    board = metadata_service.get_board_meta(db, board_id)
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
+    board_limit.check(board_id)
+    return board
+
+
+def release_connection(db: Session):
+    """End the session's transaction and hand its connection back to the pool.
+
+    Called before waiting for a model call slot and the call itself, which
+    can take many seconds; the session checks out a connection again if it
+    is used afterwards.
+    """
+    db.close()
+
+
+@router.post("/suggestions", response_model=SuggestionsResponse)
+async def get_suggestions(
+    request: SuggestionsRequest, http_request: Request, db: Session = Depends(get_db)
+):
+    """Generate idea suggestions for a board"""
+    check_api_key()
+    check_client_limit(http_request)
+    board = require_board(db, request.board_id)
 
     existing_ideas = [
-        {"title": idea.title, "description": idea.description} for idea in board.ideas
+        {"title": title, "description": description}
+        for title, description in db.query(Idea.title, Idea.description).filter(
+            Idea.board_id == request.board_id
+        )
     ]
+    release_connection(db)
 
-    try:
-        suggestions = ai_service.get_idea_suggestions(board.name, existing_ideas)
-        return SuggestionsResponse(suggestions=suggestions)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"AI service error: {str(e)}")
+    async with model_calls:
+        try:
+            suggestions = await run_in_threadpool(
+                ai_service.get_idea_suggestions, board["name"], existing_ideas
+            )
+            return SuggestionsResponse(suggestions=suggestions)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"AI service error: {str(e)}")
 
 
 @router.post("/summarize", response_model=SummarizeResponse)
-async def summarize_board(request: SummarizeRequest, db: Session = Depends(get_db)):
-    """Summarize a board's ideas"""
-    check_api_key()
+async def summarize_board(
+    request: SummarizeRequest, http_request: Request, db: Session = Depends(get_db)
+):
+    """Summarize a board's ideas.
+
+    Boards summarized before answer from the stored summary, which is
+    regenerated in the background after enough edits. Only the first request
+    for a board waits for the model.
+    """
+    stored = summary_service.get_summary(db, request.board_id)
+    if stored is not None:
+        return SummarizeResponse(**stored)
 
-    board = db.query(Board).filter(Board.id == request.board_id).first()
-    if not board:
-        raise HTTPException(status_code=404, detail="Board not found")
+    check_api_key()
+    check_client_limit(http_request)
+    board = require_board(db, request.board_id)
 
     ideas = [
-        {"title": idea.title, "description": idea.description, "votes": idea.votes}
-        for idea in board.ideas
+        {"title": title, "description": description, "votes": votes}
+        for title, description, votes in db.query(
+            Idea.title, Idea.description, Idea.votes
+        ).filter(Idea.board_id == request.board_id)
     ]
+    release_connection(db)
+
+    async with model_calls:
+        try:
+            result = await run_in_threadpool(
+                ai_service.summarize_board, board["name"], ideas
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"AI service error: {str(e)}")
 
-    try:
-        result = ai_service.summarize_board(board.name, ideas)
-        return SummarizeResponse(**result)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"AI service error: {str(e)}")
+    generated_at = summary_service.store_summary(db, request.board_id, result)
+    db.commit()
+    return SummarizeResponse(**result, generated_at=generated_at)
 
 
 @router.post("/categorize", response_model=CategorizeResponse)
-async def categorize_idea(request: CategorizeRequest, db: Session = Depends(get_db)):
+async def categorize_idea(
+    request: CategorizeRequest, http_request: Request, db: Session = Depends(get_db)
+):
     """Auto-suggest tags for an idea"""
     check_api_key()
-
-    existing_tags = [tag.name for tag in db.query(Tag).all()]
-
-    try:
-        suggestions = ai_service.auto_categorize_idea(
-            request.title, request.description, existing_tags
-        )
-        return CategorizeResponse(suggested_tags=suggestions)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"AI service error: {str(e)}")
+    check_client_limit(http_request)
+
+    existing_tags = [tag["name"] for tag in metadata_service.get_tags(db)]
+    release_connection(db)
+
+    async with model_calls:
+        try:
+            suggestions = await run_in_threadpool(
+                ai_service.auto_categorize_idea,
+                request.title,
+                request.description,
+                existing_tags,
+            )
+            return CategorizeResponse(suggested_tags=suggestions)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"AI service error: {str(e)}")
+
+
+@router.post("/jobs", response_model=AIJobResponse, status_code=202)
+async def create_job(
+    job: AIJobCreate, http_request: Request, db: Session = Depends(get_db)
+):
+    """Queue a summarize, suggest or categorize request to run in the background.
+
+    Poll GET /ai/jobs/{job_id} for the result, or pass a callback_url to have
+    the finished job POSTed to it.
+    """
+    check_api_key()
+    check_client_limit(http_request)
+    if job.board_id is not None:
+        require_board(db, job.board_id)
+    return ai_job_service.enqueue_job(db, job)
+
+
+@router.get("/jobs/{job_id}", response_model=AIJobResponse)
+async def get_job(job_id: int, db: Session = Depends(get_db)):
+    """Get a background AI job's status and, once finished, its result"""
+    job = ai_job_service.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,54 +1,345 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import delete, func, insert, literal_column, select
+from sqlalchemy.orm import Session, aliased, joinedload
+from starlette.concurrency import run_in_threadpool
 
-from app.db import get_db
+from app.db import get_db, insert_returning, update_returning, update_rows
+from app.etag import board_etag, etag_matches, not_modified
 from app.models.board import Board
-from app.schemas.board import BoardCreate, BoardResponse, BoardUpdate
+from app.models.connection import IdeaConnection
+from app.models.group import IdeaGroup
+from app.models.idea import Idea
+from app.models.tag import idea_tags
+from app.routers.groups import (
+    GROUP_RETURNING,
+    GROUPS,
+    assign_ideas,
+    group_from_row,
+)
+from app.schemas.board import (
+    AutoLayoutRequest,
+    AutoLayoutResponse,
+    BoardClone,
+    BoardCreate,
+    BoardResponse,
+    BoardUpdate,
+)
+from app.schemas.change import BoardChangesResponse
+from app.schemas.group import AutoGroupRequest, AutoGroupResponse
+from app.serialization import json_response, response_columns
+from app.services import (
+    clone_service,
+    clustering_service,
+    layout_service,
+    metadata_service,
+    ranking_service,
+    summary_service,
+)
+from app.services.revision_service import (
+    get_board_revision,
+    get_changes_since,
+    record_board_changes,
+)
 
 router = APIRouter(prefix="/boards", tags=["boards"])
 
-
-def board_to_response(board: Board) -> dict:
-    """Convert board model to response with idea_count"""
-    return {
-        "id": board.id,
-        "name": board.name,
-        "description": board.description,
-        "color": board.color,
-        "created_at": board.created_at,
-        "updated_at": board.updated_at,
-        "idea_count": len(board.ideas),
-    }
+BOARDS = Board.__table__
+BOARD_COLUMNS = response_columns(
+    BOARDS,
+    BoardResponse,
+    # Parent spelled out for SQLite's unqualified RETURNING (see aggregated_ids)
+    idea_count=select(func.count(Idea.id))
+    .where(Idea.board_id == literal_column("boards.id"))
+    .scalar_subquery(),
+)
 
 
 @router.get("", response_model=list[BoardResponse])
 async def get_boards(db: Session = Depends(get_db)):
     """Get all boards with idea counts"""
-    boards = db.query(Board).order_by(Board.created_at).all()
-    return [board_to_response(board) for board in boards]
+    rows = db.execute(
+        select(*BOARD_COLUMNS).order_by(Board.created_at, Board.id)
+    ).mappings()
+    return json_response([dict(row) for row in rows])
 
 
 @router.post("", response_model=BoardResponse)
 async def create_board(board: BoardCreate, db: Session = Depends(get_db)):
     """Create a new board"""
-    db_board = Board(
-        name=board.name,
-        description=board.description,
-        color=board.color,
+    row = insert_returning(db, BOARDS, board.model_dump(), BOARD_COLUMNS)
+    db.commit()
+    return row
+
+
+@router.post("/{board_id}/clone", response_model=BoardResponse)
+async def clone_board(board_id: int, clone: BoardClone, db: Session = Depends(get_db)):
+    """Copy a board with its groups, ideas, tags and connections, e.g. a template"""
+    new_board_id = clone_service.clone_board(
+        db,
+        board_id,
+        clone.model_dump(exclude={"keep_votes"}, exclude_unset=True),
+        keep_votes=clone.keep_votes,
     )
-    db.add(db_board)
+    if new_board_id is None:
+        raise HTTPException(status_code=404, detail="Board not found")
     db.commit()
-    db.refresh(db_board)
-    return board_to_response(db_board)
+    return (
+        db.execute(select(*BOARD_COLUMNS).where(Board.id == new_board_id))
+        .mappings()
+        .one()
+    )
 
 
 @router.get("/{board_id}", response_model=BoardResponse)
-async def get_board(board_id: int, db: Session = Depends(get_db)):
+async def get_board(
+    board_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+):
     """Get a specific board by ID"""
-    board = db.query(Board).filter(Board.id == board_id).first()
+    revision = get_board_revision(db, board_id)
+    if revision is None:
+        raise HTTPException(status_code=404, detail="Board not found")
+    etag = board_etag(board_id, revision)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    board = metadata_service.get_board_meta(db, board_id)
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
-    return board_to_response(board)
+    idea_count = (
+        db.query(func.count(Idea.id)).filter(Idea.board_id == board_id).scalar()
+    )
+    response.headers["ETag"] = etag
+    return {**board, "idea_count": idea_count, "revision": revision}
+
+
+@router.get("/{board_id}/changes", response_model=BoardChangesResponse)
+async def get_board_changes(
+    board_id: int,
+    request: Request,
+    response: Response,
+    since: int = Query(..., ge=0, description="Last revision the client has seen"),
+    db: Session = Depends(get_db),
+):
+    """Get the ideas, groups, connections and tag links changed after a revision"""
+    state = (
+        db.query(Board.revision, Board.compacted_revision)
+        .filter(Board.id == board_id)
+        .first()
+    )
+    if not state:
+        raise HTTPException(status_code=404, detail="Board not found")
+    revision, compacted_revision = state
+
+    etag = board_etag(board_id, revision)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    result = {"board_id": board_id, "since": since, "revision": revision}
+    if since < compacted_revision or since > revision:
+        return {**result, "full_resync": True}
+    if since == revision:
+        return result
+
+    upserts, deletes = get_changes_since(db, board_id, since)
+
+    if upserts.get("idea"):
+        result["ideas"] = (
+            db.query(Idea)
+            .options(joinedload(Idea.tags))
+            .filter(Idea.id.in_(upserts["idea"]))
+            .order_by(Idea.created_at, Idea.id)
+            .all()
+        )
+    if upserts.get("group"):
+        groups = db.execute(
+            select(*GROUP_RETURNING)
+            .where(IdeaGroup.id.in_(upserts["group"]))
+            .order_by(IdeaGroup.created_at, IdeaGroup.id)
+        ).mappings()
+        result["groups"] = [group_from_row(row) for row in groups]
+    if upserts.get("connection"):
+        result["connections"] = (
+            db.query(IdeaConnection)
+            .filter(IdeaConnection.id.in_(upserts["connection"]))
+            .order_by(IdeaConnection.created_at, IdeaConnection.id)
+            .all()
+        )
+
+    # A tombstoned idea takes its tag links with it
+    deleted_ideas = set(deletes.get("idea", []))
+    linked_ids = [i for i in upserts.get("idea_tags", []) if i not in deleted_ideas]
+    if linked_ids:
+        links: dict[int, list[int]] = {idea_id: [] for idea_id in linked_ids}
+        rows = db.query(idea_tags.c.idea_id, idea_tags.c.tag_id).filter(
+            idea_tags.c.idea_id.in_(linked_ids)
+        )
+        for idea_id, tag_id in rows:
+            links[idea_id].append(tag_id)
+        result["idea_tags"] = [
+            {"idea_id": idea_id, "tag_ids": tag_ids}
+            for idea_id, tag_ids in links.items()
+        ]
+
+    result["deleted"] = {
+        "ideas": deletes.get("idea", []),
+        "groups": deletes.get("group", []),
+        "connections": deletes.get("connection", []),
+    }
+    return result
+
+
+@router.post("/{board_id}/auto-group", response_model=AutoGroupResponse)
+async def auto_group_board(
+    board_id: int, request: AutoGroupRequest, db: Session = Depends(get_db)
+):
+    """Propose groups from idea text and layout, optionally creating them"""
+    if metadata_service.get_board_meta(db, board_id) is None:
+        raise HTTPException(status_code=404, detail="Board not found")
+
+    filters = [Idea.board_id == board_id]
+    if request.only_ungrouped:
+        filters.append(Idea.group_id.is_(None))
+    ideas = db.execute(
+        select(
+            Idea.id,
+            Idea.title,
+            Idea.description,
+            Idea.position_x,
+            Idea.position_y,
+            Idea.width,
+            Idea.height,
+        )
+        .where(*filters)
+        .order_by(Idea.id)
+    ).mappings()
+    # CPU-bound on big boards, so kept off the event loop
+    clusters = await run_in_threadpool(
+        clustering_service.propose_groups,
+        [dict(idea) for idea in ideas],
+        k=request.k,
+        text_weight=request.text_weight,
+        position_weight=request.position_weight,
+        min_size=request.min_size,
+        seed=request.seed,
+    )
+    groups = [vars(cluster) for cluster in clusters]
+    if not request.apply or not groups:
+        return {"groups": groups, "applied": False}
+
+    # One multi-row INSERT for the groups, one UPDATE per group for members
+    group_ids = db.scalars(
+        insert(GROUPS).returning(GROUPS.c.id, sort_by_parameter_order=True),
+        [
+            {key: value for key, value in group.items() if key != "idea_ids"}
+            | {"board_id": board_id}
+            for group in groups
+        ],
+    ).all()
+    idea_ids, left = [], set()
+    for group, group_id in zip(groups, group_ids):
+        group["id"] = group_id
+        moved, left_groups = assign_ideas(db, group["idea_ids"], group_id, board_id)
+        idea_ids += moved
+        left |= left_groups
+    record_board_changes(
+        db, board_id, upserts={"group": [*group_ids, *left], "idea": idea_ids}
+    )
+    summary_service.note_changes(db, board_id, edits=len(group_ids))
+    db.commit()
+    return {"groups": groups, "applied": True}
+
+
+@router.post("/{board_id}/layout/auto", response_model=AutoLayoutResponse)
+async def auto_layout_board(
+    board_id: int, request: AutoLayoutRequest, db: Session = Depends(get_db)
+):
+    """Compute new idea positions for a board, optionally saving them"""
+    if metadata_service.get_board_meta(db, board_id) is None:
+        raise HTTPException(status_code=404, detail="Board not found")
+
+    ideas = [
+        dict(row)
+        for row in db.execute(
+            select(
+                Idea.id,
+                Idea.group_id,
+                Idea.position_x,
+                Idea.position_y,
+                Idea.width,
+                Idea.height,
+            )
+            .where(Idea.board_id == board_id)
+            # Reading order, so a grid keeps what was top-left at the top left
+            .order_by(Idea.position_y, Idea.position_x, Idea.id)
+        ).mappings()
+    ]
+    connections, groups = [], {}
+    if request.algorithm == "force":
+        source, target = aliased(Idea), aliased(Idea)
+        connections = db.execute(
+            select(IdeaConnection.source_id, IdeaConnection.target_id)
+            .join(source, source.id == IdeaConnection.source_id)
+            .join(target, target.id == IdeaConnection.target_id)
+            .where(source.board_id == board_id, target.board_id == board_id)
+        ).all()
+    elif request.algorithm == "groups":
+        groups = {
+            group_id: (width or 400.0, height or 300.0)
+            for group_id, width, height in db.execute(
+                select(IdeaGroup.id, IdeaGroup.width, IdeaGroup.height).where(
+                    IdeaGroup.board_id == board_id
+                )
+            )
+        }
+
+    # CPU-bound on big boards, so kept off the event loop
+    layout = await run_in_threadpool(
+        layout_service.layout_board,
+        request.algorithm,
+        ideas,
+        connections,
+        groups,
+        gap=request.gap,
+        iterations=request.iterations,
+        seed=request.seed,
+    )
+    idea_positions = [
+        {"id": idea["id"], "position_x": float(x), "position_y": float(y)}
+        for idea, (x, y) in zip(ideas, layout.positions.tolist())
+    ]
+    group_placements = [
+        {
+            "id": group_id,
+            "position_x": float(x),
+            "position_y": float(y),
+            "width": float(width),
+            "height": float(height),
+        }
+        for group_id, (x, y, width, height) in layout.groups.items()
+    ]
+    if request.apply and idea_positions:
+        update_rows(db, Idea.__table__, idea_positions)
+        update_rows(db, GROUPS, group_placements)
+        record_board_changes(
+            db,
+            board_id,
+            upserts={
+                "idea": [idea["id"] for idea in ideas],
+                "group": list(layout.groups),
+            },
+        )
+        # One rearrangement of the board, however many ideas it moved
+        summary_service.note_changes(db, board_id, edits=1)
+        db.commit()
+    return {
+        "ideas": idea_positions,
+        "groups": group_placements,
+        "applied": request.apply and bool(idea_positions),
+    }
 
 
 @router.patch("/{board_id}", response_model=BoardResponse)
@@ -56,28 +347,50 @@ async def update_board(
     board_id: int, board_update: BoardUpdate, db: Session = Depends(get_db)
 ):
     """Update a board"""
-    board = db.query(Board).filter(Board.id == board_id).first()
-    if not board:
+    values = board_update.model_dump(exclude_none=True)
+    if values:
+        # The revision bump rides along in the same statement
+        values["revision"] = BOARDS.c.revision + 1
+    row = update_returning(db, BOARDS, board_id, values, BOARD_COLUMNS)
+    if not row:
         raise HTTPException(status_code=404, detail="Board not found")
 
-    if board_update.name is not None:
-        board.name = board_update.name
-    if board_update.description is not None:
-        board.description = board_update.description
-    if board_update.color is not None:
-        board.color = board_update.color
-
     db.commit()
-    db.refresh(board)
-    return board_to_response(board)
+    metadata_service.invalidate_board(board_id)
+    return row
 
 
 @router.delete("/{board_id}")
 async def delete_board(board_id: int, db: Session = Depends(get_db)):
     """Delete a board and all its ideas"""
-    board = db.query(Board).filter(Board.id == board_id).first()
-    if not board:
+    # Connections drawn from ideas on other boards into this one go with the
+    # cascade; those boards need to hear about it
+    source, target = aliased(Idea), aliased(Idea)
+    incoming = db.execute(
+        select(source.board_id, IdeaConnection.id)
+        .join(source, source.id == IdeaConnection.source_id)
+        .join(target, target.id == IdeaConnection.target_id)
+        .where(
+            target.board_id == board_id,
+            source.board_id.is_distinct_from(board_id),
+        )
+    ).all()
+
+    # Ideas, groups, tag links, connections and the change log all go by
+    # ON DELETE CASCADE in the same statement
+    deleted = db.scalar(
+        delete(BOARDS).where(BOARDS.c.id == board_id).returning(BOARDS.c.id)
+    )
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Board not found")
-    db.delete(board)
+
+    connections_by_board: dict[int, list[int]] = {}
+    for other_board_id, connection_id in incoming:
+        connections_by_board.setdefault(other_board_id, []).append(connection_id)
+    for other_board_id, connection_ids in connections_by_board.items():
+        record_board_changes(db, other_board_id, deletes={"connection": connection_ids})
+
     db.commit()
+    metadata_service.invalidate_board(board_id)
+    ranking_service.forget_board_ranking(board_id)
     return {"message": "Board deleted"}
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import delete, literal_column, select
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.db import get_db, insert_returning, update_returning
 from app.models.connection import IdeaConnection
 from app.models.idea import Idea
 from app.schemas.connection import (
@@ -9,9 +10,22 @@ from app.schemas.connection import (
     ConnectionResponse,
     ConnectionUpdate,
 )
+from app.serialization import json_response, response_columns
+from app.services.revision_service import record_board_changes
 
 router = APIRouter(prefix="/connections", tags=["connections"])
 
+CONNECTIONS = IdeaConnection.__table__
+CONNECTION_COLUMNS = response_columns(CONNECTIONS, ConnectionResponse)
+# A connection belongs to its source idea's board; the parent column is spelled
+# out for SQLite's unqualified RETURNING (see aggregated_ids)
+SOURCE_BOARD_ID = (
+    select(Idea.board_id)
+    .where(Idea.id == literal_column("idea_connections.source_id"))
+    .scalar_subquery()
+    .label("board_id")
+)
+
 
 @router.get("", response_model=list[ConnectionResponse])
 async def get_connections(
@@ -21,15 +35,18 @@ async def get_connections(
     db: Session = Depends(get_db),
 ):
     """Get all connections, optionally filtered by board"""
-    query = db.query(IdeaConnection)
+    query = select(*CONNECTION_COLUMNS)
 
     if board_id is not None:
         # Filter connections where source idea belongs to the board
-        query = query.join(Idea, IdeaConnection.source_id == Idea.id).filter(
+        query = query.join(Idea, IdeaConnection.source_id == Idea.id).where(
             Idea.board_id == board_id
         )
 
-    return query.order_by(IdeaConnection.created_at).all()
+    rows = db.execute(
+        query.order_by(IdeaConnection.created_at, IdeaConnection.id)
+    ).mappings()
+    return json_response([dict(row) for row in rows])
 
 
 @router.post("", response_model=ConnectionResponse)
@@ -60,17 +77,10 @@ async def create_connection(
             status_code=400, detail="Connection between these ideas already exists"
         )
 
-    db_connection = IdeaConnection(
-        source_id=connection.source_id,
-        target_id=connection.target_id,
-        label=connection.label,
-        connection_type=connection.connection_type,
-    )
-
-    db.add(db_connection)
+    row = insert_returning(db, CONNECTIONS, connection.model_dump(), CONNECTION_COLUMNS)
+    record_board_changes(db, source.board_id, upserts={"connection": [row["id"]]})
     db.commit()
-    db.refresh(db_connection)
-    return db_connection
+    return row
 
 
 @router.get("/{connection_id}", response_model=ConnectionResponse)
@@ -89,30 +99,34 @@ async def update_connection(
     connection_id: int, update: ConnectionUpdate, db: Session = Depends(get_db)
 ):
     """Update a connection's label or type"""
-    connection = (
-        db.query(IdeaConnection).filter(IdeaConnection.id == connection_id).first()
+    row = update_returning(
+        db,
+        CONNECTIONS,
+        connection_id,
+        update.model_dump(exclude_none=True),
+        [*CONNECTION_COLUMNS, SOURCE_BOARD_ID],
     )
-    if not connection:
+    if not row:
         raise HTTPException(status_code=404, detail="Connection not found")
 
-    if update.label is not None:
-        connection.label = update.label
-    if update.connection_type is not None:
-        connection.connection_type = update.connection_type
-
+    connection = dict(row)
+    record_board_changes(
+        db, connection.pop("board_id"), upserts={"connection": [connection_id]}
+    )
     db.commit()
-    db.refresh(connection)
     return connection
 
 
 @router.delete("/{connection_id}")
 async def delete_connection(connection_id: int, db: Session = Depends(get_db)):
     """Delete a connection"""
-    connection = (
-        db.query(IdeaConnection).filter(IdeaConnection.id == connection_id).first()
-    )
-    if not connection:
+    deleted = db.execute(
+        delete(CONNECTIONS)
+        .where(CONNECTIONS.c.id == connection_id)
+        .returning(SOURCE_BOARD_ID)
+    ).first()
+    if not deleted:
         raise HTTPException(status_code=404, detail="Connection not found")
-    db.delete(connection)
+    record_board_changes(db, deleted.board_id, deletes={"connection": [connection_id]})
     db.commit()
     return {"message": "Connection deleted"}
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import RowMapping, delete, select, update
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.db import get_db, insert_returning, update_returning
+from app.etag import board_etag, etag_matches, not_modified
 from app.models.group import IdeaGroup
 from app.models.idea import Idea
 from app.schemas.group import (
@@ -12,77 +14,167 @@ from app.schemas.group import (
     GroupUpdatePosition,
     GroupUpdateSize,
 )
+from app.serialization import aggregated_ids, json_response, response_columns, split_ids
+from app.services.revision_service import get_board_revision, record_board_changes
 
 router = APIRouter(prefix="/groups", tags=["groups"])
 
+GROUPS = IdeaGroup.__table__
+IDEAS = Idea.__table__
+GROUP_COLUMNS = response_columns(GROUPS, GroupResponse)
+# Writes read back the row and its member ids in the same statement
+GROUP_RETURNING = response_columns(
+    GROUPS,
+    GroupResponse,
+    idea_ids=aggregated_ids(IDEAS.c.id, IDEAS.c.group_id, GROUPS.c.id),
+)
+
+
+def group_from_row(row: RowMapping) -> dict:
+    """Convert a returned group row to a response"""
+    return {**row, "idea_ids": split_ids(row["idea_ids"])}
+
+
+def apply_group_update(db: Session, group_id: int, values: dict) -> dict:
+    """Update a group in one UPDATE ... RETURNING and record it on its board"""
+    row = update_returning(db, GROUPS, group_id, values, GROUP_RETURNING)
+    if not row:
+        raise HTTPException(status_code=404, detail="Group not found")
+    record_board_changes(db, row["board_id"], upserts={"group": [group_id]})
+    db.commit()
+    return group_from_row(row)
+
+
+def load_group(db: Session, group_id: int) -> dict:
+    """Get a group with its member ids in one query, or raise 404"""
+    row = (
+        db.execute(select(*GROUP_RETURNING).where(GROUPS.c.id == group_id))
+        .mappings()
+        .first()
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return group_from_row(row)
+
+
+def move_member_ideas(db: Session, group_id: int, x: float, y: float) -> list[int]:
+    """Shift a group's ideas by the distance from its stored position to (x, y).
+
+    One UPDATE reading the old position through a subquery, so it must run
+    before the group itself is moved. Returns the ids moved.
+    """
+    old_x = select(GROUPS.c.position_x).where(GROUPS.c.id == group_id)
+    old_y = select(GROUPS.c.position_y).where(GROUPS.c.id == group_id)
+    return list(
+        db.scalars(
+            update(IDEAS)
+            .where(IDEAS.c.group_id == group_id)
+            .values(
+                position_x=IDEAS.c.position_x + (x - old_x.scalar_subquery()),
+                position_y=IDEAS.c.position_y + (y - old_y.scalar_subquery()),
+            )
+            .returning(IDEAS.c.id)
+        )
+    )
 
-def group_to_response(group: IdeaGroup) -> GroupResponse:
-    """Convert group model to response with idea_ids"""
-    return GroupResponse(
-        id=group.id,
-        name=group.name,
-        color=group.color,
-        board_id=group.board_id,
-        position_x=group.position_x,
-        position_y=group.position_y,
-        width=group.width,
-        height=group.height,
-        is_collapsed=group.is_collapsed,
-        created_at=group.created_at,
-        idea_ids=[idea.id for idea in group.ideas],
+
+def move_ideas(
+    db: Session, filters: list, group_id: int | None
+) -> tuple[list[int], set[int]]:
+    """Move the ideas matching filters into a group, or out of any with None.
+
+    Returns the ids moved and the groups they left, which changed too. The
+    rows are locked while their old groups are read, so a concurrent move
+    can't slip in before the UPDATE.
+    """
+    previous = db.execute(
+        select(IDEAS.c.id, IDEAS.c.group_id)
+        .where(*filters, IDEAS.c.group_id.is_distinct_from(group_id))
+        .with_for_update()
+    ).all()
+    moved = [idea_id for idea_id, _ in previous]
+    if moved:
+        db.execute(update(IDEAS).where(IDEAS.c.id.in_(moved)).values(group_id=group_id))
+    return moved, {old for _, old in previous if old is not None}
+
+
+def assign_ideas(
+    db: Session, idea_ids: list[int], group_id: int | None, board_id: int | None
+) -> tuple[list[int], set[int]]:
+    """Move ideas by id, ignoring any that aren't on the group's board"""
+    return move_ideas(
+        db, [IDEAS.c.id.in_(idea_ids), IDEAS.c.board_id == board_id], group_id
     )
 
 
 @router.get("", response_model=list[GroupResponse])
 async def get_groups(
+    request: Request,
     board_id: int | None = Query(None, description="Filter by board ID"),
     db: Session = Depends(get_db),
 ):
     """Get all groups, optionally filtered by board"""
-    query = db.query(IdeaGroup)
-
+    headers = {}
+    filters = []
     if board_id is not None:
-        query = query.filter(IdeaGroup.board_id == board_id)
+        revision = get_board_revision(db, board_id)
+        if revision is not None:
+            etag = board_etag(board_id, revision)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+            headers["ETag"] = etag
+        filters.append(IdeaGroup.board_id == board_id)
+
+    rows = (
+        db.execute(
+            select(*GROUP_COLUMNS)
+            .where(*filters)
+            .order_by(IdeaGroup.created_at, IdeaGroup.id)
+        )
+        .mappings()
+        .all()
+    )
 
-    groups = query.order_by(IdeaGroup.created_at).all()
-    return [group_to_response(g) for g in groups]
+    # Member ids for all listed groups in one query
+    members: dict[int, list[int]] = {}
+    member_rows = db.execute(
+        select(Idea.group_id, Idea.id)
+        .join(IdeaGroup, IdeaGroup.id == Idea.group_id)
+        .where(*filters)
+        .order_by(Idea.id)
+    )
+    for group_id, idea_id in member_rows:
+        members.setdefault(group_id, []).append(idea_id)
+
+    groups = [{**row, "idea_ids": members.get(row["id"], [])} for row in rows]
+    return json_response(groups, headers)
 
 
 @router.post("", response_model=GroupResponse)
 async def create_group(group: GroupCreate, db: Session = Depends(get_db)):
     """Create a new group with optional initial ideas"""
-    db_group = IdeaGroup(
-        name=group.name,
-        color=group.color,
-        board_id=group.board_id,
-        position_x=group.position_x,
-        position_y=group.position_y,
-        width=group.width,
-        height=group.height,
+    row = insert_returning(
+        db, GROUPS, group.model_dump(exclude={"idea_ids"}), GROUP_COLUMNS
     )
 
-    db.add(db_group)
-    db.commit()
-    db.refresh(db_group)
-
     # Add ideas to group if specified
-    if group.idea_ids:
-        ideas = db.query(Idea).filter(Idea.id.in_(group.idea_ids)).all()
-        for idea in ideas:
-            idea.group_id = db_group.id
-        db.commit()
-        db.refresh(db_group)
+    idea_ids, left = (
+        assign_ideas(db, group.idea_ids, row["id"], group.board_id)
+        if group.idea_ids
+        else ([], set())
+    )
 
-    return group_to_response(db_group)
+    record_board_changes(
+        db, group.board_id, upserts={"group": [row["id"], *left], "idea": idea_ids}
+    )
+    db.commit()
+    return {**row, "idea_ids": idea_ids}
 
 
 @router.get("/{group_id}", response_model=GroupResponse)
 async def get_group(group_id: int, db: Session = Depends(get_db)):
     """Get a specific group by ID"""
-    group = db.query(IdeaGroup).filter(IdeaGroup.id == group_id).first()
-    if not group:
-        raise HTTPException(status_code=404, detail="Group not found")
-    return group_to_response(group)
+    return load_group(db, group_id)
 
 
 @router.patch("/{group_id}", response_model=GroupResponse)
@@ -90,44 +182,34 @@ async def update_group(
     group_id: int, update: GroupUpdate, db: Session = Depends(get_db)
 ):
     """Update a group's properties"""
-    group = db.query(IdeaGroup).filter(IdeaGroup.id == group_id).first()
-    if not group:
-        raise HTTPException(status_code=404, detail="Group not found")
-
-    if update.name is not None:
-        group.name = update.name
-    if update.color is not None:
-        group.color = update.color
-    if update.position_x is not None:
-        group.position_x = update.position_x
-    if update.position_y is not None:
-        group.position_y = update.position_y
-    if update.width is not None:
-        group.width = update.width
-    if update.height is not None:
-        group.height = update.height
-    if update.is_collapsed is not None:
-        group.is_collapsed = update.is_collapsed
-
-    db.commit()
-    db.refresh(group)
-    return group_to_response(group)
+    return apply_group_update(db, group_id, update.model_dump(exclude_none=True))
 
 
 @router.patch("/{group_id}/position", response_model=GroupResponse)
 async def update_group_position(
     group_id: int, position: GroupUpdatePosition, db: Session = Depends(get_db)
 ):
-    """Update group position after drag"""
-    group = db.query(IdeaGroup).filter(IdeaGroup.id == group_id).first()
-    if not group:
+    """Update group position after drag, optionally carrying its ideas along"""
+    if not position.move_ideas:
+        return apply_group_update(
+            db, group_id, position.model_dump(exclude={"move_ideas"})
+        )
+
+    moved = move_member_ideas(db, group_id, position.position_x, position.position_y)
+    row = update_returning(
+        db,
+        GROUPS,
+        group_id,
+        position.model_dump(exclude={"move_ideas"}),
+        GROUP_RETURNING,
+    )
+    if not row:
         raise HTTPException(status_code=404, detail="Group not found")
-
-    group.position_x = position.position_x
-    group.position_y = position.position_y
+    record_board_changes(
+        db, row["board_id"], upserts={"group": [group_id], "idea": moved}
+    )
     db.commit()
-    db.refresh(group)
-    return group_to_response(group)
+    return group_from_row(row)
 
 
 @router.patch("/{group_id}/size", response_model=GroupResponse)
@@ -135,15 +217,7 @@ async def update_group_size(
     group_id: int, size: GroupUpdateSize, db: Session = Depends(get_db)
 ):
     """Update group size after resize"""
-    group = db.query(IdeaGroup).filter(IdeaGroup.id == group_id).first()
-    if not group:
-        raise HTTPException(status_code=404, detail="Group not found")
-
-    group.width = size.width
-    group.height = size.height
-    db.commit()
-    db.refresh(group)
-    return group_to_response(group)
+    return apply_group_update(db, group_id, size.model_dump())
 
 
 @router.post("/{group_id}/ideas", response_model=GroupResponse)
@@ -151,17 +225,47 @@ async def add_ideas_to_group(
     group_id: int, ideas_update: GroupAddIdeas, db: Session = Depends(get_db)
 ):
     """Add ideas to a group"""
-    group = db.query(IdeaGroup).filter(IdeaGroup.id == group_id).first()
-    if not group:
-        raise HTTPException(status_code=404, detail="Group not found")
+    group = load_group(db, group_id)
 
-    ideas = db.query(Idea).filter(Idea.id.in_(ideas_update.idea_ids)).all()
-    for idea in ideas:
-        idea.group_id = group_id
+    idea_ids, left = assign_ideas(
+        db, ideas_update.idea_ids, group_id, group["board_id"]
+    )
+    record_board_changes(
+        db, group["board_id"], upserts={"group": [group_id, *left], "idea": idea_ids}
+    )
 
     db.commit()
-    db.refresh(group)
-    return group_to_response(group)
+    group["idea_ids"] = sorted(set(group["idea_ids"]) | set(idea_ids))
+    return group
+
+
+@router.post("/{group_id}/ideas/contained", response_model=GroupResponse)
+async def add_contained_ideas_to_group(group_id: int, db: Session = Depends(get_db)):
+    """Add every idea on the group's board whose center lies inside the group"""
+    group = load_group(db, group_id)
+
+    center_x = IDEAS.c.position_x + IDEAS.c.width / 2
+    center_y = IDEAS.c.position_y + IDEAS.c.height / 2
+    idea_ids, left = move_ideas(
+        db,
+        [
+            IDEAS.c.board_id == group["board_id"],
+            center_x.between(group["position_x"], group["position_x"] + group["width"]),
+            center_y.between(
+                group["position_y"], group["position_y"] + group["height"]
+            ),
+        ],
+        group_id,
+    )
+    if idea_ids:
+        record_board_changes(
+            db,
+            group["board_id"],
+            upserts={"group": [group_id, *left], "idea": idea_ids},
+        )
+    db.commit()
+    group["idea_ids"] = sorted(set(group["idea_ids"]) | set(idea_ids))
+    return group
 
 
 @router.delete("/{group_id}/ideas/{idea_id}", response_model=GroupResponse)
@@ -169,31 +273,40 @@ async def remove_idea_from_group(
     group_id: int, idea_id: int, db: Session = Depends(get_db)
 ):
     """Remove an idea from a group"""
-    group = db.query(IdeaGroup).filter(IdeaGroup.id == group_id).first()
-    if not group:
-        raise HTTPException(status_code=404, detail="Group not found")
-
-    idea = db.query(Idea).filter(Idea.id == idea_id, Idea.group_id == group_id).first()
-    if not idea:
+    group = load_group(db, group_id)
+    if idea_id not in group["idea_ids"]:
         raise HTTPException(status_code=404, detail="Idea not found in this group")
 
-    idea.group_id = None
+    assign_ideas(db, [idea_id], None, group["board_id"])
+    record_board_changes(
+        db, group["board_id"], upserts={"group": [group_id], "idea": [idea_id]}
+    )
     db.commit()
-    db.refresh(group)
-    return group_to_response(group)
+    group["idea_ids"].remove(idea_id)
+    return group
 
 
 @router.delete("/{group_id}")
 async def delete_group(group_id: int, db: Session = Depends(get_db)):
     """Delete a group (ideas are kept but unassigned)"""
-    group = db.query(IdeaGroup).filter(IdeaGroup.id == group_id).first()
+    # ON DELETE SET NULL would unassign the ideas too, but doing it here
+    # returns their ids for the change log
+    idea_ids = list(
+        db.scalars(
+            update(IDEAS)
+            .where(IDEAS.c.group_id == group_id)
+            .values(group_id=None)
+            .returning(IDEAS.c.id)
+        )
+    )
+    group = db.execute(
+        delete(GROUPS).where(GROUPS.c.id == group_id).returning(GROUPS.c.board_id)
+    ).first()
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
 
-    # Unassign ideas from group
-    for idea in group.ideas:
-        idea.group_id = None
-
-    db.delete(group)
+    record_board_changes(
+        db, group.board_id, upserts={"idea": idea_ids}, deletes={"group": [group_id]}
+    )
     db.commit()
     return {"message": "Group deleted"}
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import RowMapping, delete, insert, literal, select
+from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.config import settings
+from app.db import get_db, insert_returning, update_returning
+from app.etag import board_etag, etag_matches, not_modified
+from app.models.connection import IdeaConnection
 from app.models.idea import Idea
-from app.models.tag import Tag
+from app.models.tag import Tag, idea_tags
 from app.schemas.idea import (
     IdeaCreate,
     IdeaResponse,
@@ -11,54 +15,215 @@ from app.schemas.idea import (
     IdeaUpdatePosition,
     IdeaUpdateSize,
     IdeaUpdateTags,
+    TrendingIdeaResponse,
 )
+from app.serialization import aggregated_ids, json_response, response_columns, split_ids
+from app.services import metadata_service, ranking_service, summary_service
+from app.services.revision_service import get_board_revision, record_board_changes
 
 router = APIRouter(prefix="/ideas", tags=["ideas"])
 
+IDEAS = Idea.__table__
+IDEA_COLUMNS = response_columns(IDEAS, IdeaResponse)
+# Writes read back the row and its tag ids in the same statement
+IDEA_RETURNING = [
+    *IDEA_COLUMNS,
+    aggregated_ids(idea_tags.c.tag_id, idea_tags.c.idea_id, IDEAS.c.id).label(
+        "tag_ids"
+    ),
+]
+
+
+def idea_from_row(db: Session, row: RowMapping) -> dict:
+    """Convert a returned idea row to a response, resolving tags via the cache"""
+    idea = dict(row)
+    tag_ids = split_ids(idea.pop("tag_ids", None))
+    tags_by_id = metadata_service.get_tags_by_id(db, tag_ids) if tag_ids else {}
+    idea["tags"] = [tags_by_id[tag_id] for tag_id in tag_ids if tag_id in tags_by_id]
+    return idea
+
+
+def apply_idea_update(
+    db: Session, idea_id: int, values: dict, edits: int = 0, votes: int = 0
+) -> dict:
+    """Update an idea in one UPDATE ... RETURNING and record it on its board.
+
+    edits and votes are counted against the board's stored AI summary.
+    """
+    row = update_returning(db, IDEAS, idea_id, values, IDEA_RETURNING)
+    if not row:
+        raise HTTPException(status_code=404, detail="Idea not found")
+    record_board_changes(db, row["board_id"], upserts={"idea": [idea_id]})
+    if edits or votes:
+        summary_service.note_changes(db, row["board_id"], edits=edits, votes=votes)
+    if votes:
+        ranking_service.record_vote(db, idea_id, row["board_id"], votes)
+    db.commit()
+    if votes:
+        ranking_service.note_votes(row["board_id"], idea_id, row["votes"])
+    return idea_from_row(db, row)
+
+
+def ideas_with_tags(db: Session, rows, link_rows=None) -> list[dict]:
+    """Add tags to listed idea rows.
+
+    link_rows are the (idea id, tag id) pairs of the listed ideas, read by id
+    when not given; tag details come from the cache.
+    """
+    if link_rows is None:
+        link_rows = db.execute(
+            select(idea_tags.c.idea_id, idea_tags.c.tag_id).where(
+                idea_tags.c.idea_id.in_([row["id"] for row in rows])
+            )
+        )
+    links: dict[int, list[int]] = {}
+    for idea_id, tag_id in link_rows:
+        links.setdefault(idea_id, []).append(tag_id)
+
+    tags_by_id = {}
+    if links:
+        linked_tag_ids = list({tag_id for ids in links.values() for tag_id in ids})
+        tags_by_id = metadata_service.get_tags_by_id(db, linked_tag_ids)
+
+    ideas = []
+    for row in rows:
+        idea = dict(row)
+        idea["tags"] = [
+            tags_by_id[tag_id]
+            for tag_id in links.get(idea["id"], ())
+            if tag_id in tags_by_id
+        ]
+        ideas.append(idea)
+    return ideas
+
+
+def link_idea_tags(db: Session, idea_id: int, tag_ids: list[int]) -> list[dict]:
+    """Link tags to an idea, skipping unknown tags, and return the tags linked"""
+    tags_by_id = metadata_service.get_tags_by_id(db, tag_ids)
+    tag_ids = [tag_id for tag_id in dict.fromkeys(tag_ids) if tag_id in tags_by_id]
+    if tag_ids:
+        # Select from tags so a tag deleted since it was cached is skipped
+        db.execute(
+            insert(idea_tags).from_select(
+                ["idea_id", "tag_id"],
+                select(literal(idea_id), Tag.id).where(Tag.id.in_(tag_ids)),
+            )
+        )
+    return [tags_by_id[tag_id] for tag_id in tag_ids]
+
 
 @router.get("", response_model=list[IdeaResponse])
 async def get_ideas(
+    request: Request,
     board_id: int | None = Query(None, description="Filter by board ID"),
     tag_ids: list[int] | None = Query(None, description="Filter by tag IDs"),
     db: Session = Depends(get_db),
 ):
     """Get all ideas, optionally filtered by board and/or tags"""
-    query = db.query(Idea).options(joinedload(Idea.tags))
+    headers = {}
+    if board_id is not None:
+        revision = get_board_revision(db, board_id)
+        if revision is not None:
+            etag = board_etag(board_id, revision)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+            headers["ETag"] = etag
 
+    filters = []
     if board_id is not None:
-        query = query.filter(Idea.board_id == board_id)
+        filters.append(Idea.board_id == board_id)
 
     if tag_ids:
         # Filter ideas that have ALL specified tags
         for tag_id in tag_ids:
-            query = query.filter(Idea.tags.any(Tag.id == tag_id))
+            filters.append(Idea.tags.any(Tag.id == tag_id))
+
+    rows = (
+        db.execute(
+            select(*IDEA_COLUMNS).where(*filters).order_by(Idea.created_at, Idea.id)
+        )
+        .mappings()
+        .all()
+    )
+
+    # Tag links for the same ideas in one query, tag details from the cache
+    link_rows = db.execute(
+        select(idea_tags.c.idea_id, idea_tags.c.tag_id)
+        .join(Idea, Idea.id == idea_tags.c.idea_id)
+        .where(*filters)
+    )
+    return json_response(ideas_with_tags(db, rows, link_rows), headers)
 
-    return query.order_by(Idea.created_at).all()
+
+@router.get("/top", response_model=list[IdeaResponse])
+async def get_top_ideas(
+    board_id: int | None = Query(None, description="Only ideas on this board"),
+    tag_id: int | None = Query(None, description="Only ideas with this tag"),
+    k: int = Query(20, ge=1, le=ranking_service.MAX_TOP),
+    db: Session = Depends(get_db),
+):
+    """Get the k most voted ideas, across boards or on one, optionally by tag"""
+    if board_id is not None and tag_id is None:
+        idea_ids = ranking_service.top_idea_ids(db, board_id, k)
+        rows = db.execute(
+            select(*IDEA_COLUMNS)
+            .where(Idea.id.in_(idea_ids))
+            .order_by(Idea.votes.desc(), Idea.id)
+        ).mappings()
+    else:
+        filters = []
+        if board_id is not None:
+            filters.append(Idea.board_id == board_id)
+        if tag_id is not None:
+            filters.append(
+                Idea.id.in_(
+                    select(idea_tags.c.idea_id).where(idea_tags.c.tag_id == tag_id)
+                )
+            )
+        rows = db.execute(
+            select(*IDEA_COLUMNS)
+            .where(*filters)
+            .order_by(Idea.votes.desc(), Idea.id)
+            .limit(k)
+        ).mappings()
+    return json_response(ideas_with_tags(db, rows.all()))
+
+
+@router.get("/trending", response_model=list[TrendingIdeaResponse])
+async def get_trending_ideas(
+    board_id: int | None = Query(None, description="Only ideas on this board"),
+    window_minutes: int = Query(60, ge=1, le=settings.vote_count_retention_hours * 60),
+    k: int = Query(20, ge=1, le=ranking_service.MAX_TOP),
+    db: Session = Depends(get_db),
+):
+    """Get the k ideas with the most votes in the last window_minutes"""
+    recent = dict(ranking_service.trending_idea_votes(db, board_id, window_minutes, k))
+    rows = db.execute(select(*IDEA_COLUMNS).where(Idea.id.in_(recent))).mappings().all()
+    ideas = ideas_with_tags(db, rows)
+    for idea in ideas:
+        idea["recent_votes"] = recent[idea["id"]]
+    ideas.sort(key=lambda idea: (-idea["recent_votes"], idea["id"]))
+    return json_response(ideas)
 
 
 @router.post("", response_model=IdeaResponse)
 async def create_idea(idea: IdeaCreate, db: Session = Depends(get_db)):
     """Create a new idea"""
-    db_idea = Idea(
-        title=idea.title,
-        description=idea.description,
-        color=idea.color,
-        position_x=idea.position_x,
-        position_y=idea.position_y,
-        width=idea.width,
-        height=idea.height,
-        rotation=idea.rotation,
-        board_id=idea.board_id,
+    row = insert_returning(
+        db, IDEAS, idea.model_dump(exclude={"tag_ids"}), IDEA_COLUMNS
     )
+    db_idea = {**row, "tags": []}
 
     # Add tags if specified
+    changed = {"idea": [row["id"]]}
     if idea.tag_ids:
-        tags = db.query(Tag).filter(Tag.id.in_(idea.tag_ids)).all()
-        db_idea.tags = tags
+        db_idea["tags"] = link_idea_tags(db, row["id"], idea.tag_ids)
+        changed["idea_tags"] = [row["id"]]
 
-    db.add(db_idea)
+    record_board_changes(db, idea.board_id, upserts=changed)
+    summary_service.note_changes(db, idea.board_id, edits=1)
     db.commit()
-    db.refresh(db_idea)
+    ranking_service.note_votes(idea.board_id, row["id"], row["votes"] or 0)
     return db_idea
 
 
@@ -67,14 +232,7 @@ async def update_idea_position(
     idea_id: int, position: IdeaUpdatePosition, db: Session = Depends(get_db)
 ):
     """Update idea position after drag"""
-    idea = db.query(Idea).filter(Idea.id == idea_id).first()
-    if not idea:
-        raise HTTPException(status_code=404, detail="Idea not found")
-    idea.position_x = position.position_x
-    idea.position_y = position.position_y
-    db.commit()
-    db.refresh(idea)
-    return idea
+    return apply_idea_update(db, idea_id, position.model_dump())
 
 
 @router.patch("/{idea_id}/size", response_model=IdeaResponse)
@@ -82,14 +240,7 @@ async def update_idea_size(
     idea_id: int, size: IdeaUpdateSize, db: Session = Depends(get_db)
 ):
     """Update idea size after resize"""
-    idea = db.query(Idea).filter(Idea.id == idea_id).first()
-    if not idea:
-        raise HTTPException(status_code=404, detail="Idea not found")
-    idea.width = size.width
-    idea.height = size.height
-    db.commit()
-    db.refresh(idea)
-    return idea
+    return apply_idea_update(db, idea_id, size.model_dump())
 
 
 @router.patch("/{idea_id}/content", response_model=IdeaResponse)
@@ -97,36 +248,51 @@ async def update_idea_content(
     idea_id: int, content: IdeaUpdateContent, db: Session = Depends(get_db)
 ):
     """Update idea title and description"""
-    idea = db.query(Idea).filter(Idea.id == idea_id).first()
-    if not idea:
-        raise HTTPException(status_code=404, detail="Idea not found")
-    idea.title = content.title
-    idea.description = content.description
-    db.commit()
-    db.refresh(idea)
-    return idea
+    return apply_idea_update(db, idea_id, content.model_dump(), edits=1)
 
 
 @router.post("/{idea_id}/vote", response_model=IdeaResponse)
 async def vote_idea(idea_id: int, db: Session = Depends(get_db)):
     """Increment vote count for an idea"""
-    idea = db.query(Idea).filter(Idea.id == idea_id).first()
-    if not idea:
-        raise HTTPException(status_code=404, detail="Idea not found")
-    idea.votes += 1
-    db.commit()
-    db.refresh(idea)
-    return idea
+    # Incrementing in SQL also keeps concurrent votes from overwriting each other
+    return apply_idea_update(db, idea_id, {"votes": IDEAS.c.votes + 1}, votes=1)
 
 
 @router.delete("/{idea_id}")
 async def delete_idea(idea_id: int, db: Session = Depends(get_db)):
     """Delete an idea"""
-    idea = db.query(Idea).filter(Idea.id == idea_id).first()
-    if not idea:
+    # Connections go with the idea via ON DELETE CASCADE; tombstone them too,
+    # each on the board of its source idea
+    connections = db.execute(
+        select(Idea.board_id, IdeaConnection.id)
+        .join(Idea, Idea.id == IdeaConnection.source_id)
+        .where(
+            (IdeaConnection.source_id == idea_id)
+            | (IdeaConnection.target_id == idea_id)
+        )
+    ).all()
+    deleted = db.execute(
+        delete(IDEAS).where(IDEAS.c.id == idea_id).returning(IDEAS.c.board_id)
+    ).first()
+    if not deleted:
         raise HTTPException(status_code=404, detail="Idea not found")
-    db.delete(idea)
+
+    connections_by_board: dict[int, list[int]] = {}
+    for board_id, connection_id in connections:
+        connections_by_board.setdefault(board_id, []).append(connection_id)
+    record_board_changes(
+        db,
+        deleted.board_id,
+        deletes={
+            "idea": [idea_id],
+            "connection": connections_by_board.pop(deleted.board_id, []),
+        },
+    )
+    for other_board_id, connection_ids in connections_by_board.items():
+        record_board_changes(db, other_board_id, deletes={"connection": connection_ids})
+    summary_service.note_changes(db, deleted.board_id, edits=1)
     db.commit()
+    ranking_service.forget_board_ranking(deleted.board_id)
     return {"message": "Idea deleted"}
 
 
@@ -136,15 +302,17 @@ async def update_idea_tags(
 ):
     """Update idea's tags"""
     idea = (
-        db.query(Idea).options(joinedload(Idea.tags)).filter(Idea.id == idea_id).first()
+        db.execute(select(*IDEA_COLUMNS).where(IDEAS.c.id == idea_id))
+        .mappings()
+        .first()
     )
     if not idea:
         raise HTTPException(status_code=404, detail="Idea not found")
 
     # Replace tags with new ones
-    tags = db.query(Tag).filter(Tag.id.in_(tags_update.tag_ids)).all()
-    idea.tags = tags
+    db.execute(delete(idea_tags).where(idea_tags.c.idea_id == idea_id))
+    tags = link_idea_tags(db, idea_id, tags_update.tag_ids)
+    record_board_changes(db, idea["board_id"], upserts={"idea_tags": [idea_id]})
 
     db.commit()
-    db.refresh(idea)
-    return idea
+    return {**idea, "tags": tags}
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.db import get_db
+from app.schemas.snapshot import (
+    SnapshotCreate,
+    SnapshotResponse,
+    SnapshotRestoreResponse,
+)
+from app.services import metadata_service, snapshot_service
+
+router = APIRouter(prefix="/boards", tags=["snapshots"])
+
+
+@router.get("/{board_id}/snapshots", response_model=list[SnapshotResponse])
+async def get_snapshots(board_id: int, db: Session = Depends(get_db)):
+    """Get a board's snapshots, newest first"""
+    if metadata_service.get_board_meta(db, board_id) is None:
+        raise HTTPException(status_code=404, detail="Board not found")
+    return snapshot_service.list_snapshots(db, board_id)
+
+
+@router.post("/{board_id}/snapshots", response_model=SnapshotResponse)
+async def create_snapshot(
+    board_id: int, snapshot: SnapshotCreate, db: Session = Depends(get_db)
+):
+    """Save a snapshot of a board's ideas, groups, connections and tags"""
+    # Encoding is CPU-bound on big boards, so kept off the event loop
+    taken = await run_in_threadpool(
+        snapshot_service.take_snapshot, db, board_id, "manual", snapshot.label
+    )
+    if taken is None:
+        raise HTTPException(status_code=404, detail="Board not found")
+    db.commit()
+    return taken[0]
+
+
+@router.post(
+    "/{board_id}/snapshots/{snapshot_id}/restore",
+    response_model=SnapshotRestoreResponse,
+)
+async def restore_snapshot(
+    board_id: int, snapshot_id: int, db: Session = Depends(get_db)
+):
+    """Put a board back the way a snapshot saw it"""
+    restored = await run_in_threadpool(
+        snapshot_service.restore_snapshot, db, board_id, snapshot_id
+    )
+    if restored is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return restored
@@ -1,17 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import Select, delete, literal, literal_column, select
 from sqlalchemy.orm import Session
 
-from app.db import get_db
-from app.models.tag import Tag
-from app.schemas.tag import TagCreate, TagResponse
+from app.db import get_db, insert_ignoring_conflicts, insert_returning
+from app.etag import etag_matches, not_modified, tags_etag
+from app.models.idea import Idea
+from app.models.tag import Tag, idea_tags
+from app.schemas.tag import (
+    TagCreate,
+    TagIdeasResult,
+    TagIdeasSelection,
+    TagResponse,
+)
+from app.serialization import json_response
+from app.services import metadata_service, summary_service
+from app.services.metadata_service import TAG_COLUMNS
+from app.services.revision_service import (
+    bump_tags_revision,
+    get_tags_version,
+    record_board_changes,
+)
 
 router = APIRouter(prefix="/tags", tags=["tags"])
 
+# Board of the idea a link row belongs to, so RETURNING yields what the change
+# log needs; spelled out for SQLite's unqualified RETURNING (see aggregated_ids)
+LINK_BOARD_ID = (
+    select(Idea.board_id)
+    .where(Idea.id == literal_column("idea_tags.idea_id"))
+    .scalar_subquery()
+    .label("board_id")
+)
+
+
+def selected_ideas(selection: TagIdeasSelection) -> Select:
+    """Select the ids of ideas matching every given selector"""
+    query = select(Idea.id)
+    if selection.idea_ids is not None:
+        query = query.where(Idea.id.in_(selection.idea_ids))
+    if selection.board_id is not None:
+        query = query.where(Idea.board_id == selection.board_id)
+    if selection.group_id is not None:
+        query = query.where(Idea.group_id == selection.group_id)
+    return query
+
+
+def record_link_changes(db: Session, rows) -> list[int]:
+    """Log changed idea_tags per board and return the changed idea ids"""
+    ideas_by_board: dict[int, list[int]] = {}
+    for idea_id, board_id in rows:
+        ideas_by_board.setdefault(board_id, []).append(idea_id)
+    for board_id, idea_ids in ideas_by_board.items():
+        record_board_changes(db, board_id, upserts={"idea_tags": idea_ids})
+        summary_service.note_changes(db, board_id, edits=len(idea_ids))
+    return sorted(
+        idea_id for idea_ids in ideas_by_board.values() for idea_id in idea_ids
+    )
+
+
+def require_tag(db: Session, tag_id: int):
+    if tag_id not in metadata_service.get_tags_by_id(db, [tag_id]):
+        raise HTTPException(status_code=404, detail="Tag not found")
+
 
 @router.get("", response_model=list[TagResponse])
-async def get_tags(db: Session = Depends(get_db)):
+async def get_tags(request: Request, db: Session = Depends(get_db)):
     """Get all tags"""
-    return db.query(Tag).order_by(Tag.name).all()
+    version = get_tags_version(db)
+    etag = tags_etag(version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return json_response(metadata_service.get_tags(db, version), {"ETag": etag})
 
 
 @router.post("", response_model=TagResponse)
@@ -22,22 +81,66 @@ async def create_tag(tag: TagCreate, db: Session = Depends(get_db)):
     if existing:
         raise HTTPException(status_code=400, detail="Tag with this name already exists")
 
-    db_tag = Tag(
-        name=tag.name,
-        color=tag.color,
-    )
-    db.add(db_tag)
+    row = insert_returning(db, Tag.__table__, tag.model_dump(), TAG_COLUMNS)
+    bump_tags_revision(db)
     db.commit()
-    db.refresh(db_tag)
-    return db_tag
+    metadata_service.invalidate_tags()
+    return row
 
 
 @router.delete("/{tag_id}")
 async def delete_tag(tag_id: int, db: Session = Depends(get_db)):
     """Delete a tag"""
-    tag = db.query(Tag).filter(Tag.id == tag_id).first()
-    if not tag:
+    # Ideas carry their tags, so every board with a tagged idea changes. The
+    # links would go by ON DELETE CASCADE, but deleting them here returns the
+    # ideas the change log needs.
+    rows = db.execute(
+        delete(idea_tags)
+        .where(idea_tags.c.tag_id == tag_id)
+        .returning(idea_tags.c.idea_id, LINK_BOARD_ID)
+    ).all()
+    deleted = db.execute(delete(Tag).where(Tag.id == tag_id).returning(Tag.id)).first()
+    if not deleted:
         raise HTTPException(status_code=404, detail="Tag not found")
-    db.delete(tag)
+    record_link_changes(db, rows)
+    bump_tags_revision(db)
+
     db.commit()
+    metadata_service.invalidate_tags()
     return {"message": "Tag deleted"}
+
+
+@router.post("/{tag_id}/ideas", response_model=TagIdeasResult)
+async def add_tag_to_ideas(
+    tag_id: int, selection: TagIdeasSelection, db: Session = Depends(get_db)
+):
+    """Tag many ideas at once; ideas that already have the tag are left alone"""
+    require_tag(db, tag_id)
+    ideas = selected_ideas(selection).add_columns(literal(tag_id))
+    rows = db.execute(
+        insert_ignoring_conflicts(db, idea_tags)
+        .from_select(["idea_id", "tag_id"], ideas)
+        .returning(idea_tags.c.idea_id, LINK_BOARD_ID)
+    ).all()
+    idea_ids = record_link_changes(db, rows)
+    db.commit()
+    return {"tag_id": tag_id, "idea_ids": idea_ids}
+
+
+@router.delete("/{tag_id}/ideas", response_model=TagIdeasResult)
+async def remove_tag_from_ideas(
+    tag_id: int, selection: TagIdeasSelection, db: Session = Depends(get_db)
+):
+    """Untag many ideas at once"""
+    require_tag(db, tag_id)
+    rows = db.execute(
+        delete(idea_tags)
+        .where(
+            idea_tags.c.tag_id == tag_id,
+            idea_tags.c.idea_id.in_(selected_ideas(selection)),
+        )
+        .returning(idea_tags.c.idea_id, LINK_BOARD_ID)
+    ).all()
+    idea_ids = record_link_changes(db, rows)
+    db.commit()
+    return {"tag_id": tag_id, "idea_ids": idea_ids}
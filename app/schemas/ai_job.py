@@ -0,0 +1,70 @@
+import ipaddress
+from datetime import datetime
+from typing import Any, Literal
+
+from pydantic import BaseModel, HttpUrl, field_validator, model_validator
+
+from app.config import settings
+
+AIJobKind = Literal["summarize", "suggest", "categorize"]
+AIJobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+def callback_host_allowed(host: str) -> bool:
+    """Whether job callbacks may go to a host name or address.
+
+    With an allowlist configured only its hosts pass. Otherwise names pass
+    here, and their addresses are checked again when the callback is sent.
+    """
+    host = host.strip("[]").lower()
+    if settings.ai_job_callback_allowed_hosts:
+        return host in settings.ai_job_callback_allowed_hosts
+    if host == "localhost" or host.endswith(".localhost"):
+        return False
+    try:
+        return ipaddress.ip_address(host).is_global
+    except ValueError:
+        return True
+
+
+class AIJobCreate(BaseModel):
+    """A board for summarize and suggest jobs, an idea's text for categorize"""
+
+    kind: AIJobKind
+    board_id: int | None = None
+    title: str | None = None
+    description: str | None = None
+    # Receives a POST with the finished job; http or https only
+    callback_url: HttpUrl | None = None
+
+    @field_validator("callback_url")
+    @classmethod
+    def check_callback_host(cls, url: HttpUrl | None):
+        if url is not None and not callback_host_allowed(url.host or ""):
+            raise ValueError("callback_url must point at a public host")
+        return url
+
+    @model_validator(mode="after")
+    def check_inputs(self):
+        if self.kind == "categorize" and not self.title:
+            raise ValueError("categorize jobs need a title")
+        if self.kind != "categorize" and self.board_id is None:
+            raise ValueError(f"{self.kind} jobs need a board_id")
+        return self
+
+
+class AIJobResponse(BaseModel):
+    id: int
+    kind: AIJobKind
+    status: AIJobStatus
+    board_id: int | None
+    # Shaped like the matching synchronous /ai response once succeeded
+    result: dict[str, Any] | None
+    error: str | None
+    attempts: int
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    class Config:
+        from_attributes = True
@@ -1,6 +1,7 @@
 from datetime import datetime
+from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class BoardBase(BaseModel):
@@ -19,11 +20,53 @@ class BoardUpdate(BaseModel):
     color: str | None = None
 
 
+class BoardClone(BaseModel):
+    # Defaults to "Copy of <name>"; description and color default to the
+    # original's
+    name: str | None = None
+    description: str | None = None
+    color: str | None = None
+    # Templates usually start fresh, so votes are reset unless asked
+    keep_votes: bool = False
+
+
 class BoardResponse(BoardBase):
     id: int
     created_at: datetime
     updated_at: datetime
     idea_count: int = 0
+    revision: int = 0
 
     class Config:
         from_attributes = True
+
+
+class AutoLayoutRequest(BaseModel):
+    # grid: reading order on equal cells; force: pulls connected ideas
+    # together; groups: packs each group's ideas inside it, then the groups
+    algorithm: Literal["grid", "force", "groups"] = "grid"
+    gap: float = Field(40.0, ge=0, le=1000)
+    iterations: int = Field(100, ge=1, le=500)
+    # Save the new positions instead of just returning them
+    apply: bool = False
+    seed: int = 0
+
+
+class IdeaPosition(BaseModel):
+    id: int
+    position_x: float
+    position_y: float
+
+
+class GroupPlacement(BaseModel):
+    id: int
+    position_x: float
+    position_y: float
+    width: float
+    height: float
+
+
+class AutoLayoutResponse(BaseModel):
+    ideas: list[IdeaPosition]
+    groups: list[GroupPlacement] = []
+    applied: bool
@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+
+from app.schemas.connection import ConnectionResponse
+from app.schemas.group import GroupResponse
+from app.schemas.idea import IdeaResponse
+
+
+class IdeaTagLinks(BaseModel):
+    idea_id: int
+    tag_ids: list[int]
+
+
+class DeletedEntities(BaseModel):
+    ideas: list[int] = []
+    groups: list[int] = []
+    connections: list[int] = []
+
+
+class BoardChangesResponse(BaseModel):
+    board_id: int
+    since: int
+    revision: int
+    # True when the change log no longer reaches back to `since`; refetch the board
+    full_resync: bool = False
+    ideas: list[IdeaResponse] = []
+    groups: list[GroupResponse] = []
+    connections: list[ConnectionResponse] = []
+    idea_tags: list[IdeaTagLinks] = []
+    deleted: DeletedEntities = DeletedEntities()
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class GroupBase(BaseModel):
@@ -30,6 +30,8 @@ class GroupUpdate(BaseModel):
 class GroupUpdatePosition(BaseModel):
     position_x: float
     position_y: float
+    # Translate member ideas by the same delta as the group
+    move_ideas: bool = False
 
 
 class GroupUpdateSize(BaseModel):
@@ -54,3 +56,33 @@ class GroupResponse(GroupBase):
 
     class Config:
         from_attributes = True
+
+
+class AutoGroupRequest(BaseModel):
+    # Defaults to about sqrt(ideas / 2) clusters
+    k: int | None = Field(None, ge=1, le=500)
+    # How much sharing words counts against sitting close together
+    text_weight: float = Field(1.0, ge=0)
+    position_weight: float = Field(1.0, ge=0)
+    min_size: int = Field(2, ge=1)
+    # Leave ideas that are already in a group alone
+    only_ungrouped: bool = True
+    # Create the proposed groups instead of just returning them
+    apply: bool = False
+    seed: int = 0
+
+
+class ProposedGroup(BaseModel):
+    id: int | None = None
+    name: str
+    color: str
+    position_x: float
+    position_y: float
+    width: float
+    height: float
+    idea_ids: list[int]
+
+
+class AutoGroupResponse(BaseModel):
+    groups: list[ProposedGroup]
+    applied: bool
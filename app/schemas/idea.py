@@ -55,3 +55,8 @@ class IdeaResponse(IdeaBase):
 
     class Config:
         from_attributes = True
+
+
+class TrendingIdeaResponse(IdeaResponse):
+    # Votes cast within the requested window
+    recent_votes: int
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class SnapshotCreate(BaseModel):
+    label: str | None = Field(None, max_length=100)
+
+
+class SnapshotResponse(BaseModel):
+    id: int
+    board_id: int
+    revision: int
+    # manual, periodic, or restore for the copy taken before a restore
+    kind: str
+    label: str | None = None
+    idea_count: int
+    group_count: int
+    connection_count: int
+    # Compressed size of what changed since the previous snapshot
+    size_bytes: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SnapshotRestoreResponse(BaseModel):
+    snapshot_id: int
+    # Snapshot of the board as it was just before the restore
+    backup_snapshot_id: int
+    revision: int
+    # Rows written or removed per entity type: group, idea, connection
+    upserted: dict[str, int]
+    deleted: dict[str, int]
+    # Ideas whose tags were put back
+    relinked_ideas: int
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 
 
 class TagBase(BaseModel):
@@ -18,3 +18,23 @@ class TagResponse(TagBase):
 
     class Config:
         from_attributes = True
+
+
+class TagIdeasSelection(BaseModel):
+    """Ideas to tag or untag: explicit ids, a board or group filter, or both"""
+
+    idea_ids: list[int] | None = None
+    board_id: int | None = None
+    group_id: int | None = None
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if self.idea_ids is None and self.board_id is None and self.group_id is None:
+            raise ValueError("Provide idea_ids, board_id or group_id")
+        return self
+
+
+class TagIdeasResult(BaseModel):
+    tag_id: int
+    # Only the ideas whose tags actually changed
+    idea_ids: list[int]
@@ -0,0 +1,144 @@
+from sqlalchemy.orm import Session
+
+from app.models.board import Board as BoardModel
+from app.models.idea import Idea as IdeaModel
+from app.models.item import Item as ItemModel
+from app.models.tag import Tag as TagModel
+
+
+def seed_database(db: Session):
+    """Seed the database with sample items if empty"""
+    if db.query(ItemModel).count() == 0:
+        sample_items = [
+            ItemModel(
+                name="Widget", description="A useful widget for your desk", price=9.99
+            ),
+            ItemModel(
+                name="Gadget", description="A fancy gadget with buttons", price=19.99
+            ),
+            ItemModel(
+                name="Gizmo",
+                description="An amazing gizmo that does things",
+                price=29.99,
+            ),
+        ]
+        db.add_all(sample_items)
+        db.commit()
+        print("Database seeded with sample items")
+
+
+def seed_boards_and_tags(db: Session):
+    """Seed the database with sample boards and tags if empty"""
+    if db.query(BoardModel).count() == 0:
+        sample_boards = [
+            BoardModel(
+                name="Hackathon Ideas",
+                description="Ideas for our hackathon project",
+                color="#3b82f6",
+            ),
+            BoardModel(
+                name="Future Features",
+                description="Features to consider for future releases",
+                color="#22c55e",
+            ),
+        ]
+        db.add_all(sample_boards)
+        db.commit()
+        print("Database seeded with sample boards")
+
+    if db.query(TagModel).count() == 0:
+        sample_tags = [
+            TagModel(name="ai", color="#8b5cf6"),
+            TagModel(name="ux", color="#ec4899"),
+            TagModel(name="backend", color="#3b82f6"),
+            TagModel(name="frontend", color="#22c55e"),
+            TagModel(name="priority", color="#ef4444"),
+        ]
+        db.add_all(sample_tags)
+        db.commit()
+        print("Database seeded with sample tags")
+
+
+def seed_ideas(db: Session):
+    """Seed the database with sample ideas if empty"""
+    if db.query(IdeaModel).count() == 0:
+        # Get the first board to assign ideas to
+        board = db.query(BoardModel).first()
+        board_id = board.id if board else None
+
+        # Get some tags
+        ai_tag = db.query(TagModel).filter(TagModel.name == "ai").first()
+        ux_tag = db.query(TagModel).filter(TagModel.name == "ux").first()
+        backend_tag = db.query(TagModel).filter(TagModel.name == "backend").first()
+        priority_tag = db.query(TagModel).filter(TagModel.name == "priority").first()
+
+        sample_ideas = [
+            IdeaModel(
+                title="AI-powered code review",
+                description="Use LLMs to automatically review pull requests",
+                color="yellow",
+                position_x=100,
+                position_y=100,
+                votes=5,
+                board_id=board_id,
+            ),
+            IdeaModel(
+                title="Smart home dashboard",
+                description="Central control for all IoT devices",
+                color="blue",
+                position_x=350,
+                position_y=150,
+                votes=3,
+                board_id=board_id,
+            ),
+            IdeaModel(
+                title="Team mood tracker",
+                description="Daily check-ins with emoji reactions",
+                color="pink",
+                position_x=600,
+                position_y=100,
+                votes=7,
+                board_id=board_id,
+            ),
+            IdeaModel(
+                title="Carbon footprint calculator",
+                description="Track environmental impact of daily activities",
+                color="green",
+                position_x=150,
+                position_y=350,
+                votes=2,
+                board_id=board_id,
+            ),
+            IdeaModel(
+                title="Habit gamification app",
+                description="Turn daily habits into RPG quests",
+                color="purple",
+                position_x=450,
+                position_y=400,
+                votes=4,
+                board_id=board_id,
+            ),
+        ]
+        db.add_all(sample_ideas)
+        db.commit()
+
+        # Add tags to some ideas
+        ideas = db.query(IdeaModel).all()
+        if ai_tag and len(ideas) > 0:
+            ideas[0].tags.append(ai_tag)
+        if backend_tag and len(ideas) > 0:
+            ideas[0].tags.append(backend_tag)
+        if ux_tag and len(ideas) > 1:
+            ideas[1].tags.append(ux_tag)
+        if priority_tag and len(ideas) > 2:
+            ideas[2].tags.append(priority_tag)
+        db.commit()
+
+        print("Database seeded with sample ideas")
+
+
+def seed_all(db: Session):
+    """Seed every table that is still empty"""
+    seed_database(db)
+    seed_boards_and_tags(db)
+    seed_ideas(db)
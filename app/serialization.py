@@ -0,0 +1,61 @@
+from collections.abc import Mapping
+
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+from sqlalchemy import ColumnElement, String, Table, cast, func, literal_column, select
+
+
+def response_columns(
+    table: Table, schema: type[BaseModel], **expressions: ColumnElement
+) -> list[ColumnElement]:
+    """Build a select list that yields rows shaped like a response schema.
+
+    Columns come out in the schema's field order, with computed fields such as
+    counts passed in as keyword expressions, so a selected row converts
+    straight to the dict the schema would have produced.
+    """
+    columns = []
+    for name in schema.model_fields:
+        if name in expressions:
+            columns.append(expressions[name].label(name))
+        elif name in table.c:
+            columns.append(table.c[name])
+    return columns
+
+
+def json_response(
+    items: list[dict], headers: Mapping[str, str] | None = None
+) -> Response:
+    """Encode plain row dicts straight to JSON, bypassing response_model validation.
+
+    Rows come from our own columns, so re-validating every attribute of every
+    row only repeats work the database already did. The route keeps its
+    response_model, so the OpenAPI schema is unchanged.
+    """
+    return Response(
+        content=to_json(items), media_type="application/json", headers=headers
+    )
+
+
+def aggregated_ids(
+    column: ColumnElement, foreign_key: ColumnElement, parent: ColumnElement
+) -> ColumnElement:
+    """Correlated subquery collecting ids linked to a parent row into one string.
+
+    Lets a RETURNING clause carry a row's links (tag ids, member ids) so the
+    response needs no second query. Decode with split_ids.
+    """
+    # SQLite renders RETURNING columns without their table, which would turn
+    # the correlation into a self-comparison; spell the parent column out
+    parent_column = literal_column(f"{parent.table.name}.{parent.name}")
+    return (
+        select(func.aggregate_strings(cast(column, String), ","))
+        .where(foreign_key == parent_column)
+        .scalar_subquery()
+    )
+
+
+def split_ids(value: str | None) -> list[int]:
+    """Decode an aggregated_ids value"""
+    return [int(part) for part in value.split(",")] if value else []
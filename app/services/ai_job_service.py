@@ -0,0 +1,327 @@
+import asyncio
+import ipaddress
+import socket
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+
+import httpx
+from sqlalchemy import RowMapping, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal, insert_returning
+from app.models.ai_job import AIJob
+from app.models.idea import Idea
+from app.schemas.ai_job import AIJobCreate, AIJobResponse, callback_host_allowed
+from app.serialization import response_columns
+from app.services import ai_service, metadata_service, summary_service
+
+JOB_COLUMNS = response_columns(AIJob.__table__, AIJobResponse)
+
+# Set by enqueue_job so idle workers in this process pick work up immediately
+# instead of at their next poll
+_new_jobs: asyncio.Event | None = None
+
+
+class JobInputError(Exception):
+    """The job can never succeed, e.g. its board is gone; not retried"""
+
+
+def _utcnow() -> datetime:
+    # Stored naive, in UTC, like created_at
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def add_job(db: Session, job: AIJobCreate) -> RowMapping:
+    """Insert a queued job in the caller's transaction"""
+    return insert_returning(
+        db,
+        AIJob.__table__,
+        {
+            "kind": job.kind,
+            "status": "queued",
+            "board_id": job.board_id,
+            "payload": job.model_dump(exclude={"kind", "callback_url"}),
+            "callback_url": str(job.callback_url) if job.callback_url else None,
+        },
+        JOB_COLUMNS,
+    )
+
+
+def wake_workers():
+    if _new_jobs is not None:
+        _new_jobs.set()
+
+
+def enqueue_job(db: Session, job: AIJobCreate) -> RowMapping:
+    """Store a queued job and wake this process's workers"""
+    row = add_job(db, job)
+    db.commit()
+    wake_workers()
+    return row
+
+
+def get_job(db: Session, job_id: int) -> RowMapping | None:
+    return db.execute(select(*JOB_COLUMNS).where(AIJob.id == job_id)).mappings().first()
+
+
+def claim_next_job(db: Session) -> RowMapping | None:
+    """Mark the oldest queued job running and return it, or None if there is none.
+
+    The status check in the UPDATE makes the claim safe when several workers
+    race for the same row: only one of them matches it.
+    """
+    oldest = (
+        select(AIJob.id)
+        .where(AIJob.status == "queued")
+        .order_by(AIJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    row = (
+        db.execute(
+            update(AIJob)
+            .where(AIJob.id == oldest, AIJob.status == "queued")
+            .values(
+                status="running",
+                started_at=_utcnow(),
+                attempts=AIJob.attempts + 1,
+            )
+            .returning(*JOB_COLUMNS, AIJob.payload, AIJob.callback_url)
+        )
+        .mappings()
+        .first()
+    )
+    db.commit()
+    return row
+
+
+def requeue_stale_jobs(db: Session) -> int:
+    """Requeue running jobs whose worker died, e.g. in a restart.
+
+    Jobs that have used all their attempts are failed instead, so one that
+    reliably crashes its worker doesn't loop forever. Returns how many were
+    requeued.
+    """
+    cutoff = _utcnow() - timedelta(seconds=settings.ai_job_timeout_seconds)
+    stale = [AIJob.status == "running", AIJob.started_at < cutoff]
+    failed = (
+        db.execute(
+            update(AIJob)
+            .where(*stale, AIJob.attempts >= settings.ai_job_max_attempts)
+            .values(
+                status="failed",
+                error="Worker stopped while running the job",
+                finished_at=_utcnow(),
+            )
+            .returning(*JOB_COLUMNS, AIJob.callback_url)
+        )
+        .mappings()
+        .all()
+    )
+    requeued = db.execute(update(AIJob).where(*stale).values(status="queued")).rowcount
+    db.commit()
+    for job in failed:
+        if job["callback_url"]:
+            send_callback(job["callback_url"], job)
+    return requeued
+
+
+def _board_ideas(db: Session, board_id: int, *columns) -> list[dict]:
+    rows = db.execute(select(*columns).where(Idea.board_id == board_id)).mappings()
+    return [dict(row) for row in rows]
+
+
+def prepare_job(db: Session, kind: str, payload: dict) -> Callable[[], dict]:
+    """Read what a job needs from the database and return the model call to make"""
+    if kind == "categorize":
+        tags = [tag["name"] for tag in metadata_service.get_tags(db)]
+        return lambda: {
+            "suggested_tags": ai_service.auto_categorize_idea(
+                payload["title"], payload.get("description"), tags
+            )
+        }
+
+    board = metadata_service.get_board_meta(db, payload["board_id"])
+    if board is None:
+        raise JobInputError("Board not found")
+    if kind == "summarize":
+        board_id = payload["board_id"]
+        seen = summary_service.pending_changes(db, board_id)
+        ideas = _board_ideas(db, board_id, Idea.title, Idea.description, Idea.votes)
+
+        def summarize():
+            result = ai_service.summarize_board(board["name"], ideas)
+            # Committed by finish_job together with the job's result, or
+            # dropped with it if the job was deleted meanwhile
+            summary_service.store_summary(db, board_id, result, seen)
+            return result
+
+        return summarize
+    ideas = _board_ideas(db, payload["board_id"], Idea.title, Idea.description)
+    return lambda: {
+        "suggestions": ai_service.get_idea_suggestions(board["name"], ideas)
+    }
+
+
+def finish_job(
+    db: Session,
+    job_id: int,
+    result: dict | None = None,
+    error: str | None = None,
+    retry: bool = False,
+) -> RowMapping | None:
+    """Store a job's outcome; a failure with retry set goes back in the queue.
+
+    Returns None if the job is gone, deleted with its board while it ran; then
+    nothing the job staged in the transaction, like its summary, is kept.
+    """
+    if error is None:
+        values = {
+            "status": "succeeded",
+            "result": result,
+            "error": None,
+            "finished_at": _utcnow(),
+        }
+    elif retry:
+        values = {"status": "queued", "error": error}
+    else:
+        values = {"status": "failed", "error": error, "finished_at": _utcnow()}
+    row = (
+        db.execute(
+            update(AIJob)
+            .where(AIJob.id == job_id)
+            .values(**values)
+            .returning(*JOB_COLUMNS)
+        )
+        .mappings()
+        .first()
+    )
+    if row is None:
+        db.rollback()
+        return None
+    db.commit()
+    return row
+
+
+def _resolves_to_public_addresses(host: str) -> bool:
+    """Whether every address a callback host resolves to is public"""
+    if settings.ai_job_callback_allowed_hosts:
+        return True
+    try:
+        addresses = socket.getaddrinfo(host.strip("[]"), None)
+    except OSError:
+        return False
+    return all(
+        ipaddress.ip_address(address[4][0].split("%")[0]).is_global
+        for address in addresses
+    )
+
+
+def send_callback(url: str, job: RowMapping):
+    """POST a finished job to its callback URL; failures are logged, not retried"""
+    body = AIJobResponse.model_validate(dict(job)).model_dump(mode="json")
+    try:
+        host = httpx.URL(url).host
+        # Checked again here: a name accepted with the job may since resolve
+        # somewhere internal
+        if not callback_host_allowed(host) or not _resolves_to_public_addresses(host):
+            print(f"AI job {job['id']} callback to {url} refused: not a public host")
+            return
+        httpx.post(
+            url, json=body, timeout=settings.ai_job_callback_timeout_seconds
+        ).raise_for_status()
+    except (httpx.HTTPError, httpx.InvalidURL) as e:
+        print(f"AI job {job['id']} callback to {url} failed: {e}")
+
+
+def process_next_job() -> bool:
+    """Run one queued job to completion, returning False if the queue was empty"""
+    db = SessionLocal()
+    try:
+        job = claim_next_job(db)
+        if job is None:
+            requeue_stale_jobs(db)
+            return False
+
+        try:
+            call_model = prepare_job(db, job["kind"], job["payload"])
+            # Hand the connection back to the pool for the slow model call
+            db.commit()
+            finished = finish_job(db, job["id"], result=call_model())
+        except JobInputError as e:
+            finished = finish_job(db, job["id"], error=str(e))
+        except Exception as e:
+            db.rollback()
+            finished = finish_job(
+                db,
+                job["id"],
+                error=f"AI service error: {e}",
+                retry=job["attempts"] < settings.ai_job_max_attempts,
+            )
+        if finished is None:
+            print(f"AI job {job['id']} was deleted while it ran")
+        elif job["callback_url"] and finished["status"] != "queued":
+            send_callback(job["callback_url"], finished)
+        return True
+    finally:
+        db.close()
+
+
+def schedule_summary_refreshes(db: Session) -> int:
+    """Queue a summarize job for every stale summary that is due a refresh"""
+    scheduled = 0
+    for board_id, previous_job_id in summary_service.due_for_refresh(db):
+        job = add_job(db, AIJobCreate(kind="summarize", board_id=board_id))
+        if summary_service.set_refresh_job(db, board_id, job["id"], previous_job_id):
+            db.commit()
+            scheduled += 1
+        else:
+            db.rollback()
+    if scheduled:
+        wake_workers()
+    return scheduled
+
+
+def _schedule_once() -> int:
+    db = SessionLocal()
+    try:
+        return schedule_summary_refreshes(db)
+    finally:
+        db.close()
+
+
+async def run_summary_refresher(interval_seconds: float):
+    """Regenerate stale board summaries in the background, forever"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(_schedule_once)
+        except Exception as e:
+            print(f"Summary refresh scheduling failed: {e}")
+
+
+async def _work(poll_interval: float):
+    while True:
+        try:
+            if await asyncio.to_thread(process_next_job):
+                continue
+        except Exception as e:
+            print(f"AI job worker error: {e}")
+        _new_jobs.clear()
+        try:
+            await asyncio.wait_for(_new_jobs.wait(), poll_interval)
+        except TimeoutError:
+            pass
+
+
+async def run_ai_job_workers(workers: int, poll_interval: float):
+    """Process queued AI jobs with a fixed number of concurrent workers.
+
+    Jobs live in the database, so work queued before a restart, or by another
+    process, is picked up on the next poll.
+    """
+    global _new_jobs
+    _new_jobs = asyncio.Event()
+    await asyncio.gather(*(_work(poll_interval) for _ in range(workers)))
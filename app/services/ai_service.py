@@ -1,53 +1,241 @@
-import anthropic
+import threading
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, Field, ValidationError
 
 from app.config import settings
+from app.metrics import metric_collectors
+
+if TYPE_CHECKING:
+    import anthropic
+
+MODEL = "claude-sonnet-4-20250514"
+
+
+class IdeaSuggestionsAnswer(BaseModel):
+    suggestions: list[str] = Field(
+        description="Exactly 3 new idea titles, max 50 characters each"
+    )
+
+
+class BoardSummaryAnswer(BaseModel):
+    summary: str = Field(description="2-3 sentences on the board's focus")
+    themes: list[str] = Field(description="2-4 main themes, just keywords")
+    top_priority: str | None = Field(
+        description="Title of the highest priority idea, based on votes and impact"
+    )
+
+
+class TagSuggestionsAnswer(BaseModel):
+    tags: list[str] = Field(description="1-3 short tag names (1-2 words each)")
+
+
+class AIOutputError(Exception):
+    """The model's answer still failed validation after every allowed attempt"""
+
+
+# Usage fields reported by the Messages API, by metric label
+TOKEN_KINDS = {
+    "input": "input_tokens",
+    "output": "output_tokens",
+    "cache_read": "cache_read_input_tokens",
+    "cache_write": "cache_creation_input_tokens",
+}
+
+
+class OutputStats:
+    """Counts of structured output calls and the tokens they used, per tool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: dict[str, int] = {}
+        self.invalid: dict[str, int] = {}
+        self.exhausted: dict[str, int] = {}
+        self.tokens: dict[tuple[str, str], int] = {}
+
+    def count(self, counter: dict[str, int], tool: str):
+        with self._lock:
+            counter[tool] = counter.get(tool, 0) + 1
+
+    def add_usage(self, tool: str, usage):
+        with self._lock:
+            for kind, field in TOKEN_KINDS.items():
+                key = (tool, kind)
+                self.tokens[key] = self.tokens.get(key, 0) + (
+                    getattr(usage, field, None) or 0
+                )
+
+    def render(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for name, help_text, counter in (
+                ("ai_output_calls_total", "Structured output calls.", self.calls),
+                (
+                    "ai_output_invalid_total",
+                    "Answers that failed validation and were retried or dropped.",
+                    self.invalid,
+                ),
+                (
+                    "ai_output_exhausted_total",
+                    "Calls that ran out of attempts without a valid answer.",
+                    self.exhausted,
+                ),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for tool, count in sorted(counter.items()):
+                    lines.append(f'{name}{{tool="{tool}"}} {count}')
+            lines += [
+                "# HELP ai_tokens_total Tokens billed, including prompt cache "
+                "reads and writes.",
+                "# TYPE ai_tokens_total counter",
+            ]
+            for (tool, kind), count in sorted(self.tokens.items()):
+                lines.append(f'ai_tokens_total{{tool="{tool}",kind="{kind}"}} {count}')
+        return lines
 
 
-def get_client() -> anthropic.Anthropic:
+output_stats = OutputStats()
+metric_collectors.append(output_stats.render)
+
+
+def get_client() -> "anthropic.Anthropic":
     """Get Anthropic client"""
     if not settings.anthropic_api_key:
         raise ValueError("ANTHROPIC_API_KEY is not set")
-    return anthropic.Anthropic(api_key=settings.anthropic_api_key)
+    # Imported here so workers don't pay for the SDK until an AI route is hit
+    import anthropic
 
+    return anthropic.Anthropic(
+        api_key=settings.anthropic_api_key,
+        base_url=settings.anthropic_base_url or None,
+    )
+
+
+SYSTEM_PROMPT = """You are the assistant of a collaborative brainstorming board app.
+Boards hold ideas (sticky notes) with a title, an optional description and a
+vote count. You help teams brainstorm new ideas, summarize boards and tag
+ideas. Always answer by calling the tool you are asked to use, filling in
+every field of its input."""
+
+
+def _tool(name: str, description: str, answer: type[BaseModel]) -> dict:
+    return {
+        "name": name,
+        "description": description,
+        "input_schema": answer.model_json_schema(),
+    }
+
+
+# Every call sends every tool and picks one with tool_choice, so the tools and
+# system prompt form one identical prefix that all calls share in the cache
+TOOLS = [
+    _tool("suggest_ideas", "Record new idea suggestions", IdeaSuggestionsAnswer),
+    _tool("summarize_board", "Record the summary of a board", BoardSummaryAnswer),
+    _tool("suggest_tags", "Record tag suggestions for an idea", TagSuggestionsAnswer),
+]
+CACHED = {"cache_control": {"type": "ephemeral"}}
+SYSTEM = [{"type": "text", "text": SYSTEM_PROMPT, **CACHED}]
 
-def get_idea_suggestions(board_name: str, existing_ideas: list[dict]) -> list[str]:
-    """Generate idea suggestions for a board based on existing ideas"""
-    client = get_client()
 
-    existing_ideas_text = (
+def cacheable(text: str) -> dict:
+    """A content block that ends a cached prompt prefix"""
+    return {"type": "text", "text": text, **CACHED}
+
+
+def board_context(board_name: str, ideas: list[dict]) -> str:
+    """The board's ideas, rendered identically for every call about the board.
+
+    Votes change far more often than the ideas themselves, so they are left
+    out here and sent after the cached prefix by vote_counts.
+    """
+    ideas_text = (
         "\n".join(
-            [
-                f"- {idea['title']}: {idea.get('description', 'No description')}"
-                for idea in existing_ideas
-            ]
+            f"{number}. {idea['title']}: {idea.get('description') or 'No description'}"
+            for number, idea in enumerate(ideas, 1)
         )
-        if existing_ideas
+        if ideas
         else "No ideas yet."
     )
+    return f'Board "{board_name}" has these ideas:\n{ideas_text}'
 
-    message = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=500,
-        messages=[
-            {
-                "role": "user",
-                "content": f"""You are helping brainstorm ideas for a board called "{board_name}".
 
-Here are the existing ideas on this board:
-{existing_ideas_text}
+def vote_counts(ideas: list[dict]) -> list[dict]:
+    """Current votes per idea number, as an uncached block; none without votes"""
+    if not ideas or any(idea.get("votes") is None for idea in ideas):
+        return []
+    votes = "\n".join(
+        f"{number}. {idea['votes']} votes" for number, idea in enumerate(ideas, 1)
+    )
+    return [{"type": "text", "text": f"Current votes per idea:\n{votes}"}]
+
+
+def structured_call[T: BaseModel](
+    client: "anthropic.Anthropic",
+    content: list[dict],
+    output: type[T],
+    tool: str,
+    max_tokens: int,
+) -> T:
+    """Ask for an answer through a forced tool call and validate it as `output`.
+
+    The tool's input schema is the model's JSON schema, so the answer arrives
+    as JSON rather than free text. Only answers that fail validation are
+    retried, up to ai_output_max_attempts in total; API errors propagate.
+
+    The system prompt and tools are a cached prefix shared by every call;
+    content should put its stable part first, marked with cacheable(), and
+    the part that varies per call last.
+    """
+    output_stats.count(output_stats.calls, tool)
+    for _attempt in range(settings.ai_output_max_attempts):
+        message = client.messages.create(
+            model=MODEL,
+            max_tokens=max_tokens,
+            system=SYSTEM,
+            tools=TOOLS,
+            tool_choice={"type": "tool", "name": tool},
+            messages=[{"role": "user", "content": content}],
+        )
+        output_stats.add_usage(tool, message.usage)
+        answer = next(
+            (
+                block.input
+                for block in message.content
+                if block.type == "tool_use" and block.name == tool
+            ),
+            None,
+        )
+        try:
+            return output.model_validate(answer)
+        except ValidationError as e:
+            output_stats.count(output_stats.invalid, tool)
+            print(f"Invalid {tool} answer from the model: {e.error_count()} errors")
+    output_stats.count(output_stats.exhausted, tool)
+    raise AIOutputError(
+        f"No valid {tool} answer after {settings.ai_output_max_attempts} attempts"
+    )
+
 
-Generate exactly 3 new, creative idea suggestions that complement the existing ideas. Each suggestion should be a concise title (max 50 characters).
+def get_idea_suggestions(board_name: str, existing_ideas: list[dict]) -> list[str]:
+    """Generate idea suggestions for a board based on existing ideas"""
+    client = get_client()
 
-Respond with just the 3 ideas, one per line, no numbering or bullets.""",
-            }
+    answer = structured_call(
+        client,
+        [
+            cacheable(board_context(board_name, existing_ideas)),
+            {
+                "type": "text",
+                "text": "Generate exactly 3 new, creative idea suggestions that "
+                "complement the existing ideas. Each suggestion should be a "
+                "concise title (max 50 characters). Use the suggest_ideas tool.",
+            },
         ],
+        IdeaSuggestionsAnswer,
+        tool="suggest_ideas",
+        max_tokens=500,
     )
-
-    # Parse response into list of suggestions
-    response_text = message.content[0].text
-    suggestions = [
-        line.strip() for line in response_text.strip().split("\n") if line.strip()
-    ]
+    suggestions = [title.strip() for title in answer.suggestions if title.strip()]
     return suggestions[:3]
 
 
@@ -62,53 +250,25 @@ def summarize_board(board_name: str, ideas: list[dict]) -> dict:
             "top_priority": None,
         }
 
-    ideas_text = "\n".join(
+    answer = structured_call(
+        client,
         [
-            f"- {idea['title']} (votes: {idea.get('votes', 0)}): {idea.get('description', 'No description')}"
-            for idea in ideas
-        ]
-    )
-
-    message = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=500,
-        messages=[
+            cacheable(board_context(board_name, ideas)),
+            *vote_counts(ideas),
             {
-                "role": "user",
-                "content": f"""Analyze the ideas on this board called "{board_name}":
-
-{ideas_text}
-
-Provide:
+                "type": "text",
+                "text": """Analyze the ideas on this board and provide:
 1. A brief summary (2-3 sentences) of the board's focus
 2. The main themes (list 2-4 themes, just keywords)
 3. The highest priority idea based on votes and potential impact (just the title)
-
-Format your response exactly like this:
-SUMMARY: [your summary]
-THEMES: [theme1], [theme2], [theme3]
-TOP_PRIORITY: [idea title]""",
-            }
+Use the summarize_board tool.""",
+            },
         ],
+        BoardSummaryAnswer,
+        tool="summarize_board",
+        max_tokens=500,
     )
-
-    response_text = message.content[0].text
-
-    # Parse response
-    summary = ""
-    themes = []
-    top_priority = None
-
-    for line in response_text.strip().split("\n"):
-        if line.startswith("SUMMARY:"):
-            summary = line.replace("SUMMARY:", "").strip()
-        elif line.startswith("THEMES:"):
-            themes_text = line.replace("THEMES:", "").strip()
-            themes = [t.strip() for t in themes_text.split(",")]
-        elif line.startswith("TOP_PRIORITY:"):
-            top_priority = line.replace("TOP_PRIORITY:", "").strip()
-
-    return {"summary": summary, "themes": themes, "top_priority": top_priority}
+    return answer.model_dump()
 
 
 def auto_categorize_idea(
@@ -119,28 +279,22 @@ def auto_categorize_idea(
 
     existing_tags_text = ", ".join(existing_tags) if existing_tags else "None yet"
 
-    message = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=200,
-        messages=[
-            {
-                "role": "user",
-                "content": f"""Suggest tags for this idea:
-
-Title: {title}
-Description: {description or "No description"}
-
-Existing tags in the system: {existing_tags_text}
-
-Suggest 1-3 tags that would help categorize this idea. Prefer existing tags if they fit. If suggesting new tags, keep them short (1-2 words).
+    answer = structured_call(
+        client,
+        [
+            cacheable(
+                f"""Existing tags in the system: {existing_tags_text}
 
-Respond with just the tag names, comma-separated, nothing else.""",
-            }
+Suggest 1-3 tags that would help categorize the idea below. Prefer existing tags if they fit. If suggesting new tags, keep them short (1-2 words). Use the suggest_tags tool."""
+            ),
+            {
+                "type": "text",
+                "text": f"Title: {title}\nDescription: {description or 'No description'}",
+            },
         ],
+        TagSuggestionsAnswer,
+        tool="suggest_tags",
+        max_tokens=200,
     )
-
-    response_text = message.content[0].text
-    suggestions = [
-        tag.strip().lower() for tag in response_text.strip().split(",") if tag.strip()
-    ]
+    suggestions = [tag.strip().lower() for tag in answer.tags if tag.strip()]
     return suggestions[:3]
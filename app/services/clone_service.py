@@ -0,0 +1,124 @@
+from sqlalchemy import and_, insert, literal, select
+from sqlalchemy.orm import Session, aliased
+
+from app.models.board import Board
+from app.models.connection import IdeaConnection
+from app.models.group import IdeaGroup
+from app.models.idea import Idea
+from app.models.tag import idea_tags
+
+GROUP_FIELDS = ("name", "color", "position_x", "position_y", "width", "height")
+IDEA_FIELDS = (
+    "title",
+    "description",
+    "color",
+    "position_x",
+    "position_y",
+    "width",
+    "height",
+    "rotation",
+)
+
+
+def clone_board(
+    db: Session, board_id: int, values: dict, keep_votes: bool = False
+) -> int | None:
+    """Copy a board with its groups, ideas, tag links and connections.
+
+    Runs in the caller's transaction as one INSERT ... SELECT per table, so
+    nothing passes through Python however big the board is. Copies remember
+    the row they came from in cloned_from_id, which is how later statements
+    map old ids to new ones. Connections to ideas on other boards are not
+    copied. Returns the new board's id, or None if the board doesn't exist.
+    """
+    source = db.execute(
+        select(Board.name, Board.description, Board.color).where(Board.id == board_id)
+    ).first()
+    if source is None:
+        return None
+    new_board_id = db.scalar(
+        insert(Board)
+        .values(
+            name=values.get("name") or f"Copy of {source.name}",
+            description=values.get("description", source.description),
+            color=values.get("color") or source.color,
+        )
+        .returning(Board.id)
+    )
+
+    db.execute(
+        insert(IdeaGroup).from_select(
+            ["board_id", "cloned_from_id", "is_collapsed", *GROUP_FIELDS],
+            select(
+                literal(new_board_id),
+                IdeaGroup.id,
+                IdeaGroup.is_collapsed,
+                *(IdeaGroup.__table__.c[field] for field in GROUP_FIELDS),
+            ).where(IdeaGroup.board_id == board_id),
+        )
+    )
+
+    new_group = aliased(IdeaGroup)
+    db.execute(
+        insert(Idea).from_select(
+            ["board_id", "cloned_from_id", "group_id", "votes", *IDEA_FIELDS],
+            select(
+                literal(new_board_id),
+                Idea.id,
+                new_group.id,
+                Idea.votes if keep_votes else literal(0),
+                *(Idea.__table__.c[field] for field in IDEA_FIELDS),
+            )
+            .outerjoin(
+                new_group,
+                and_(
+                    new_group.board_id == new_board_id,
+                    new_group.cloned_from_id == Idea.group_id,
+                ),
+            )
+            .where(Idea.board_id == board_id),
+        )
+    )
+
+    # Tag links and connections start from the original board's ideas and
+    # find each copy through cloned_from_id
+    new_idea = aliased(Idea)
+    copy_of_original = and_(
+        new_idea.board_id == new_board_id, new_idea.cloned_from_id == Idea.id
+    )
+    db.execute(
+        insert(idea_tags).from_select(
+            ["idea_id", "tag_id"],
+            select(new_idea.id, idea_tags.c.tag_id)
+            .select_from(Idea)
+            .join(idea_tags, idea_tags.c.idea_id == Idea.id)
+            .join(new_idea, copy_of_original)
+            .where(Idea.board_id == board_id),
+        )
+    )
+
+    new_target = aliased(Idea)
+    db.execute(
+        insert(IdeaConnection).from_select(
+            ["source_id", "target_id", "label", "connection_type"],
+            select(
+                new_idea.id,
+                new_target.id,
+                IdeaConnection.label,
+                IdeaConnection.connection_type,
+            )
+            .select_from(Idea)
+            .join(IdeaConnection, IdeaConnection.source_id == Idea.id)
+            .join(new_idea, copy_of_original)
+            # Only targets on the same board have a copy to point at
+            .join(
+                new_target,
+                and_(
+                    new_target.board_id == new_board_id,
+                    new_target.cloned_from_id == IdeaConnection.target_id,
+                ),
+            )
+            .where(Idea.board_id == board_id),
+        )
+    )
+    return new_board_id
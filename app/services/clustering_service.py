@@ -0,0 +1,174 @@
+import re
+import zlib
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+import numpy as np
+
+TOKEN = re.compile(r"[a-z0-9]+")
+# Too common to say anything about an idea
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was we were will with our you your can should could would".split()
+)
+GROUP_COLORS = ("#3b82f6", "#22c55e", "#f59e0b", "#ef4444", "#a855f7", "#14b8a6")
+
+
+@dataclass
+class Cluster:
+    name: str
+    color: str
+    idea_ids: list[int]
+    # Bounding box of the member ideas, padded
+    position_x: float
+    position_y: float
+    width: float
+    height: float
+
+
+def tokenize(text: str) -> list[str]:
+    return [
+        token
+        for token in TOKEN.findall(text.lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    ]
+
+
+def text_features(
+    texts: list[str], dims: int = 256
+) -> tuple[np.ndarray, dict[int, Counter]]:
+    """Hashed TF-IDF vectors, L2-normalized, one row per text.
+
+    Feature hashing keeps this free of a fitted vocabulary; the returned map
+    from column to the tokens that hashed there is only used to name groups.
+    """
+    rows, cols = [], []
+    names: dict[int, Counter] = defaultdict(Counter)
+    for row, text in enumerate(texts):
+        for token in tokenize(text):
+            col = zlib.crc32(token.encode()) % dims
+            rows.append(row)
+            cols.append(col)
+            names[col][token] += 1
+
+    counts = np.zeros((len(texts), dims), dtype=np.float32)
+    np.add.at(counts, (np.array(rows, dtype=int), np.array(cols, dtype=int)), 1.0)
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1
+    features = counts * idf.astype(np.float32)
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    return features / np.where(norms == 0, 1, norms), names
+
+
+def _squared_distances(
+    points: np.ndarray, point_norms: np.ndarray, centers: np.ndarray
+) -> np.ndarray:
+    center_norms = np.einsum("ij,ij->i", centers, centers)
+    distances = point_norms[:, None] - 2 * points @ centers.T + center_norms[None, :]
+    return np.maximum(distances, 0)
+
+
+def kmeans(
+    points: np.ndarray, k: int, seed: int = 0, iterations: int = 50
+) -> np.ndarray:
+    """Lloyd's k-means with k-means++ seeding; returns a label per point"""
+    rng = np.random.default_rng(seed)
+    n = len(points)
+    point_norms = np.einsum("ij,ij->i", points, points)
+    centers = np.empty((k, points.shape[1]), dtype=points.dtype)
+    centers[0] = points[rng.integers(n)]
+    closest = _squared_distances(points, point_norms, centers[:1])[:, 0]
+    for i in range(1, k):
+        total = closest.sum(dtype=np.float64)
+        index = rng.choice(n, p=closest / total) if total > 0 else rng.integers(n)
+        centers[i] = points[index]
+        closest = np.minimum(
+            closest, _squared_distances(points, point_norms, centers[i : i + 1])[:, 0]
+        )
+
+    labels = np.full(n, -1)
+    for _ in range(iterations):
+        new_labels = _squared_distances(points, point_norms, centers).argmin(axis=1)
+        moved = np.count_nonzero(new_labels != labels)
+        labels = new_labels
+        # A handful of points swapping back and forth is converged enough
+        if moved <= n // 1000:
+            break
+        # Per-cluster sums as one matrix product with the one-hot assignment
+        membership = np.zeros((k, n), dtype=points.dtype)
+        membership[labels, np.arange(n)] = 1
+        sums = membership @ points
+        sizes = membership.sum(axis=1)[:, None]
+        # Empty clusters keep their previous center
+        centers = np.where(sizes > 0, sums / np.maximum(sizes, 1), centers)
+    return labels
+
+
+def propose_groups(
+    ideas: list[dict],
+    k: int | None = None,
+    text_weight: float = 1.0,
+    position_weight: float = 1.0,
+    min_size: int = 2,
+    padding: float = 40.0,
+    seed: int = 0,
+) -> list[Cluster]:
+    """Cluster ideas by their text and canvas position into proposed groups.
+
+    Each idea needs id, title, description, position_x, position_y, width and
+    height. Text features are unit vectors and positions are standardized, so
+    the weights trade off "says the same thing" against "sits close by".
+    Clusters smaller than min_size are dropped.
+    """
+    if len(ideas) < max(min_size, 2):
+        return []
+    if k is None:
+        k = round(np.sqrt(len(ideas) / 2))
+    k = max(1, min(k, len(ideas)))
+
+    text, names = text_features(
+        [f"{idea['title']} {idea.get('description') or ''}" for idea in ideas]
+    )
+    boxes = np.array(
+        [
+            (idea["position_x"], idea["position_y"], idea["width"], idea["height"])
+            for idea in ideas
+        ],
+        dtype=float,
+    )
+    centers = boxes[:, :2] + boxes[:, 2:] / 2
+    spread = centers.std(axis=0)
+    positions = (centers - centers.mean(axis=0)) / np.where(spread == 0, 1, spread)
+    points = np.hstack(
+        [text * text_weight, (positions * position_weight).astype(np.float32)]
+    )
+
+    labels = kmeans(points, k, seed)
+    ids = np.array([idea["id"] for idea in ideas])
+    clusters = []
+    for label in range(k):
+        members = np.flatnonzero(labels == label)
+        if len(members) < min_size:
+            continue
+        left, top = boxes[members, :2].min(axis=0) - padding
+        right, bottom = (boxes[members, :2] + boxes[members, 2:]).max(axis=0) + padding
+        clusters.append(
+            Cluster(
+                name=_cluster_name(text[members], names)
+                or f"Group {len(clusters) + 1}",
+                color=GROUP_COLORS[len(clusters) % len(GROUP_COLORS)],
+                idea_ids=ids[members].tolist(),
+                position_x=float(left),
+                position_y=float(top),
+                width=float(right - left),
+                height=float(bottom - top),
+            )
+        )
+    return clusters
+
+
+def _cluster_name(member_text: np.ndarray, names: dict[int, Counter]) -> str:
+    """The most frequent tokens of the cluster's two heaviest text features"""
+    weights = member_text.sum(axis=0)
+    top = [col for col in np.argsort(weights)[::-1][:2] if weights[col] > 0]
+    return " / ".join(names[col].most_common(1)[0][0] for col in top).capitalize()
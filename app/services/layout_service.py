@@ -0,0 +1,219 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+# Ideas saved before width/height had defaults
+DEFAULT_SIZE = (200.0, 150.0)
+
+
+@dataclass
+class Layout:
+    # Top-left corners, one row per idea in the order they were given
+    positions: np.ndarray
+    # group id -> (x, y, width, height), for layouts that move groups
+    groups: dict[int, tuple[float, float, float, float]]
+
+
+def idea_arrays(ideas: list[dict]) -> tuple[np.ndarray, np.ndarray]:
+    """Top-left corners and sizes of ideas as (n, 2) arrays"""
+    positions = np.array(
+        [(idea["position_x"] or 0.0, idea["position_y"] or 0.0) for idea in ideas],
+        dtype=float,
+    ).reshape(-1, 2)
+    sizes = np.array(
+        [
+            (idea["width"] or DEFAULT_SIZE[0], idea["height"] or DEFAULT_SIZE[1])
+            for idea in ideas
+        ],
+        dtype=float,
+    ).reshape(-1, 2)
+    return positions, sizes
+
+
+def grid_layout(sizes: np.ndarray, gap: float = 40.0) -> np.ndarray:
+    """Lay ideas out in reading order on a grid of equal cells, roughly square"""
+    n = len(sizes)
+    if n == 0:
+        return np.zeros((0, 2))
+    cell = sizes.max(axis=0) + gap
+    columns = max(1, math.ceil(math.sqrt(n * cell[1] / cell[0])))
+    index = np.arange(n)
+    return np.column_stack([index % columns, index // columns]) * cell
+
+
+def force_layout(
+    positions: np.ndarray,
+    sizes: np.ndarray,
+    edges: np.ndarray,
+    gap: float = 40.0,
+    iterations: int = 100,
+    samples: int = 256,
+    seed: int = 0,
+) -> np.ndarray:
+    """Fruchterman-Reingold layout of ideas and their connections.
+
+    Starts from the current positions so the board keeps its rough shape,
+    with a weak pull towards the middle holding unconnected ideas in.
+    On boards with more than `samples` ideas each iteration repels every idea
+    from the same random sample of others, scaled up to stand in for all of
+    them, which keeps an iteration O(n * samples) rather than O(n^2).
+    """
+    n = len(positions)
+    if n < 2:
+        return positions.copy()
+    rng = np.random.default_rng(seed)
+    ideal = float(np.hypot(*sizes.max(axis=0))) + gap
+    centers = positions + sizes / 2
+    # Coincident ideas would have no direction to be pushed apart in
+    centers += rng.normal(0, ideal / 100, centers.shape)
+    # Separate contiguous coordinates keep the (n, samples) arithmetic fast
+    x, y = centers.T.astype(np.float32)
+    sources, targets = edges[:, 0], edges[:, 1]
+
+    # Start hot enough to cross the board, cool linearly to nothing
+    extent = max(float(np.ptp(centers, axis=0).max()), ideal * math.sqrt(n))
+    for step in range(iterations):
+        temperature = extent / 10 * (1 - step / iterations)
+
+        if n <= samples:
+            others = np.arange(n)
+            scale = ideal * ideal
+        else:
+            others = rng.choice(n, samples, replace=False)
+            scale = ideal * ideal * (n - 1) / samples
+        dx = x[:, None] - x[others]
+        dy = y[:, None] - y[others]
+        weight = dx * dx
+        weight += dy * dy
+        np.maximum(weight, 1.0, out=weight)
+        np.reciprocal(weight, out=weight)
+        # |f| = ideal^2 / d away from each sampled idea; an idea's own delta
+        # is zero, so sampling it adds nothing
+        force_x = np.einsum("ij,ij->i", dx, weight) * scale
+        force_y = np.einsum("ij,ij->i", dy, weight) * scale
+
+        # |f| = d^2 / ideal along each edge, pulling both ends together
+        pull_x = x[targets] - x[sources]
+        pull_y = y[targets] - y[sources]
+        length = np.hypot(pull_x, pull_y) / ideal
+        pull_x *= length
+        pull_y *= length
+        force_x += np.bincount(sources, pull_x, minlength=n)
+        force_x -= np.bincount(targets, pull_x, minlength=n)
+        force_y += np.bincount(sources, pull_y, minlength=n)
+        force_y -= np.bincount(targets, pull_y, minlength=n)
+
+        # |f| = d towards the middle, so ideas without connections settle
+        # around the rest instead of being pushed out forever
+        force_x += x.mean() - x
+        force_y += y.mean() - y
+
+        length = np.hypot(force_x, force_y)
+        step_length = np.minimum(length, temperature) / np.maximum(length, 1e-9)
+        x += force_x * step_length
+        y += force_y * step_length
+
+    centers = np.column_stack([x, y]).astype(float)
+    result = centers - sizes / 2
+    # Keep the layout where the board was
+    return result - result.min(axis=0) + positions.min(axis=0)
+
+
+def group_layout(
+    sizes: np.ndarray,
+    labels: np.ndarray,
+    groups: dict[int, tuple[float, float]],
+    gap: float = 40.0,
+    padding: float = 40.0,
+) -> Layout:
+    """Pack each group's ideas on a grid inside it, then shelf-pack the groups.
+
+    `labels` is each idea's group id, -1 for ungrouped ideas, which are packed
+    together as one more block. `groups` maps every group on the board to its
+    current (width, height); empty groups keep their size and are packed too.
+    """
+    n = len(sizes)
+    cell = (sizes.max(axis=0) if n else np.array(DEFAULT_SIZE)) + gap
+    blocks = sorted(set(groups) | set(labels.tolist()))
+    block_of = np.searchsorted(blocks, labels)
+    members = np.bincount(block_of, minlength=len(blocks))
+    # Rank of each idea within its block, keeping the given order
+    order = np.argsort(block_of, kind="stable")
+    starts = np.concatenate([[0], np.cumsum(members)[:-1]])
+    rank = np.empty(n, dtype=int)
+    rank[order] = np.arange(n) - np.repeat(starts, members)
+    columns = np.maximum(1, np.ceil(np.sqrt(members * cell[1] / cell[0]))).astype(int)
+    rows = np.ceil(members / columns).astype(int)
+
+    block_sizes = np.column_stack([columns, rows]) * cell - gap + 2 * padding
+    for i, block in enumerate(blocks):
+        if members[i] == 0:
+            block_sizes[i] = groups[block]
+
+    # Shelves as wide as a square holding every block, tallest blocks first
+    shelf_width = math.sqrt(float((block_sizes + gap).prod(axis=1).sum()))
+    corners = np.zeros((len(blocks), 2))
+    x = y = shelf_height = 0.0
+    for i in np.argsort(-block_sizes[:, 1], kind="stable"):
+        width, height = block_sizes[i]
+        if x > 0 and x + width > shelf_width:
+            x, y, shelf_height = 0.0, y + shelf_height + gap, 0.0
+        corners[i] = (x, y)
+        x += width + gap
+        shelf_height = max(shelf_height, height)
+
+    cells = np.column_stack([rank % columns[block_of], rank // columns[block_of]])
+    positions = corners[block_of] + padding + cells * cell
+    return Layout(
+        positions=positions,
+        groups={
+            block: (*corners[i], *block_sizes[i])
+            for i, block in enumerate(blocks)
+            if block in groups
+        },
+    )
+
+
+def layout_board(
+    algorithm: str,
+    ideas: list[dict],
+    connections: list[tuple[int, int]],
+    groups: dict[int, tuple[float, float]],
+    gap: float = 40.0,
+    iterations: int = 100,
+    seed: int = 0,
+) -> Layout:
+    """Compute new positions for a board's ideas with the named algorithm.
+
+    Ideas need id, group_id, position_x, position_y, width and height; grid
+    keeps them in the order given. The result starts at the top-left corner
+    of the ideas' current bounding box, so the board doesn't jump.
+    """
+    positions, sizes = idea_arrays(ideas)
+    if not ideas:
+        return Layout(positions=positions, groups={})
+    origin = positions.min(axis=0)
+    if algorithm == "grid":
+        return Layout(positions=grid_layout(sizes, gap) + origin, groups={})
+    if algorithm == "force":
+        ids = np.array([idea["id"] for idea in ideas])
+        sorter = np.argsort(ids)
+        edges = sorter[
+            np.searchsorted(ids, np.array(connections, dtype=int), sorter=sorter)
+        ].reshape(-1, 2)
+        return Layout(
+            positions=force_layout(positions, sizes, edges, gap, iterations, seed=seed),
+            groups={},
+        )
+
+    labels = np.array(
+        [-1 if idea["group_id"] is None else idea["group_id"] for idea in ideas]
+    )
+    layout = group_layout(sizes, labels, groups, gap)
+    layout.positions += origin
+    layout.groups = {
+        group_id: (x + origin[0], y + origin[1], width, height)
+        for group_id, (x, y, width, height) in layout.groups.items()
+    }
+    return layout
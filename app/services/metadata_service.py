@@ -0,0 +1,89 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.cache import TTLCache
+from app.config import settings
+from app.db import reads_replica
+from app.models.board import Board
+from app.models.tag import Tag
+from app.schemas.tag import TagResponse
+from app.serialization import response_columns
+from app.services.revision_service import get_tags_version
+
+TAG_COLUMNS = response_columns(Tag.__table__, TagResponse)
+
+tag_cache = TTLCache("tags", max_entries=1, ttl_seconds=settings.cache_ttl_seconds)
+board_cache = TTLCache(
+    "boards",
+    max_entries=settings.cache_max_entries,
+    ttl_seconds=settings.cache_ttl_seconds,
+)
+
+
+def _load_tags(db: Session) -> dict:
+    # Version first: a tag written in between makes the rows newer than the
+    # version, so the next request with the newer version reloads
+    version = get_tags_version(db)
+    rows = db.execute(select(*TAG_COLUMNS).order_by(Tag.name)).mappings()
+    return {"version": version, "tags": [dict(row) for row in rows]}
+
+
+def get_tags(db: Session, version: str | None = None) -> list[dict]:
+    """Get all tags ordered by name.
+
+    Passing the current database version (see get_tags_version) reloads the
+    list if another worker changed tags since it was cached.
+    """
+    cached = tag_cache.get_or_load(
+        "all", lambda: _load_tags(db), store=not reads_replica(db)
+    )
+    if version is not None and cached["version"] != version:
+        tag_cache.invalidate("all", publish=False)
+        cached = tag_cache.get_or_load(
+            "all", lambda: _load_tags(db), store=not reads_replica(db)
+        )
+    return cached["tags"]
+
+
+def get_tags_by_id(db: Session, tag_ids: list[int] | None = None) -> dict[int, dict]:
+    """Get tags keyed by id, reloading once if any requested id is unknown"""
+    tags = {tag["id"]: tag for tag in get_tags(db)}
+    if tag_ids and any(tag_id not in tags for tag_id in tag_ids):
+        tag_cache.invalidate("all", publish=False)
+        tags = {tag["id"]: tag for tag in get_tags(db)}
+    return tags
+
+
+def invalidate_tags():
+    tag_cache.invalidate("all")
+
+
+def _load_board(db: Session, board_id: int) -> dict | None:
+    board = (
+        db.query(
+            Board.id,
+            Board.name,
+            Board.description,
+            Board.color,
+            Board.created_at,
+            Board.updated_at,
+        )
+        .filter(Board.id == board_id)
+        .first()
+    )
+    return board._asdict() if board else None
+
+
+def get_board_meta(db: Session, board_id: int) -> dict | None:
+    """Get a board's name, description, color and timestamps, or None if missing.
+
+    The revision is deliberately left out: it changes on every write, so
+    callers read it fresh.
+    """
+    return board_cache.get_or_load(
+        board_id, lambda: _load_board(db, board_id), store=not reads_replica(db)
+    )
+
+
+def invalidate_board(board_id: int):
+    board_cache.invalidate(board_id)
@@ -0,0 +1,129 @@
+import asyncio
+import bisect
+import time
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.cache import TTLCache
+from app.config import settings
+from app.db import SessionLocal, dialect_insert, reads_replica
+from app.models.idea import Idea
+from app.models.vote import IdeaVoteCount
+
+# Largest k served, and how much of each board's ranking is kept in memory
+MAX_TOP = 100
+
+VOTE_COUNTS = IdeaVoteCount.__table__
+
+# board id -> up to MAX_TOP (-votes, idea id), sorted, so the best come first
+# and ties go to the older idea
+rankings = TTLCache(
+    "top_ideas",
+    max_entries=settings.cache_max_entries,
+    ttl_seconds=settings.top_ideas_cache_ttl_seconds,
+)
+
+
+def _current_minute() -> int:
+    return int(time.time() // 60)
+
+
+def _load_ranking(db: Session, board_id: int) -> list[tuple[int, int]]:
+    rows = db.execute(
+        select(Idea.votes, Idea.id)
+        .where(Idea.board_id == board_id)
+        .order_by(Idea.votes.desc(), Idea.id)
+        .limit(MAX_TOP)
+    )
+    return [(-(votes or 0), idea_id) for votes, idea_id in rows]
+
+
+def top_idea_ids(db: Session, board_id: int, k: int) -> list[int]:
+    """Ids of a board's k most voted ideas, best first"""
+    ranking = rankings.get_or_load(
+        board_id, lambda: _load_ranking(db, board_id), store=not reads_replica(db)
+    )
+    return [idea_id for _, idea_id in ranking[:k]]
+
+
+def note_votes(board_id: int | None, idea_id: int, votes: int):
+    """Move an idea to its new vote count in a cached ranking, once committed.
+
+    Only ever called with an idea's count going up (or a new idea at zero), so
+    an idea outside a full ranking can only enter it, pushing the last one out.
+    """
+    found, ranking = rankings.get(board_id)
+    if not found:
+        return
+    entry = (-votes, idea_id)
+    others = [ranked for ranked in ranking if ranked[1] != idea_id]
+    if len(others) == MAX_TOP and entry > others[-1]:
+        return
+    bisect.insort(others, entry)
+    rankings.set(board_id, others[:MAX_TOP])
+
+
+def forget_board_ranking(board_id: int | None):
+    """Drop a board's cached ranking, e.g. after an idea left the board"""
+    rankings.invalidate(board_id)
+
+
+def record_vote(db: Session, idea_id: int, board_id: int | None, votes: int = 1):
+    """Count a vote in the current minute's bucket, in the caller's transaction"""
+    statement = dialect_insert(db, VOTE_COUNTS).values(
+        idea_id=idea_id, minute=_current_minute(), board_id=board_id, votes=votes
+    )
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[VOTE_COUNTS.c.idea_id, VOTE_COUNTS.c.minute],
+            set_={"votes": VOTE_COUNTS.c.votes + statement.excluded.votes},
+        )
+    )
+
+
+def trending_idea_votes(
+    db: Session, board_id: int | None, window_minutes: int, k: int
+) -> list[tuple[int, int]]:
+    """(idea id, votes) of the k ideas voted for most in the last window_minutes"""
+    recent = func.sum(VOTE_COUNTS.c.votes).label("recent_votes")
+    filters = [VOTE_COUNTS.c.minute > _current_minute() - window_minutes]
+    if board_id is not None:
+        filters.append(VOTE_COUNTS.c.board_id == board_id)
+    return [
+        (idea_id, votes)
+        for idea_id, votes in db.execute(
+            select(VOTE_COUNTS.c.idea_id, recent)
+            .where(*filters)
+            .group_by(VOTE_COUNTS.c.idea_id)
+            .order_by(recent.desc(), VOTE_COUNTS.c.idea_id)
+            .limit(k)
+        )
+    ]
+
+
+def purge_vote_counts(db: Session) -> int:
+    """Delete vote counts older than the retention window, returning how many"""
+    cutoff = _current_minute() - settings.vote_count_retention_hours * 60
+    removed = db.execute(delete(VOTE_COUNTS).where(VOTE_COUNTS.c.minute <= cutoff))
+    db.commit()
+    return removed.rowcount
+
+
+def _purge_once() -> int:
+    db = SessionLocal()
+    try:
+        return purge_vote_counts(db)
+    finally:
+        db.close()
+
+
+async def run_vote_count_purge(interval_seconds: float):
+    """Purge expired vote counts forever, sleeping between runs"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            removed = await asyncio.to_thread(_purge_once)
+            print(f"Vote count purge removed {removed} rows")
+        except Exception as e:
+            print(f"Vote count purge failed: {e}")
@@ -0,0 +1,187 @@
+import asyncio
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app.config import settings
+from app.db import SessionLocal, dialect_insert
+from app.models.board import Board
+from app.models.change import BoardChange, RevisionCounter
+
+COUNTERS = RevisionCounter.__table__
+TAGS_COUNTER = "tags"
+
+
+def bump_board_revision(db: Session, board_id: int | None) -> int | None:
+    """Increment a board's revision counter and return the new value.
+
+    Runs inside the caller's transaction, so the bump commits together with the
+    write it describes. Ideas without a board have nothing to bump.
+    """
+    if board_id is None:
+        return None
+    return db.execute(
+        update(Board)
+        .where(Board.id == board_id)
+        # Keep updated_at for real board edits rather than every child write
+        .values(revision=Board.revision + 1, updated_at=Board.updated_at)
+        .returning(Board.revision)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+
+
+def record_board_changes(
+    db: Session,
+    board_id: int | None,
+    upserts: dict[str, Iterable[int]] | None = None,
+    deletes: dict[str, Iterable[int]] | None = None,
+) -> int | None:
+    """Bump a board's revision and append the changed entities to its change log.
+
+    Both mappings are keyed by entity type (idea, group, connection or
+    idea_tags) and hold the ids created/updated or deleted by this write.
+    """
+    revision = bump_board_revision(db, board_id)
+    if revision is None:
+        return None
+
+    rows = []
+    for operation, entities in (("upsert", upserts), ("delete", deletes)):
+        for entity_type, entity_ids in (entities or {}).items():
+            for entity_id in set(entity_ids):
+                rows.append(
+                    {
+                        "board_id": board_id,
+                        "revision": revision,
+                        "entity_type": entity_type,
+                        "entity_id": entity_id,
+                        "operation": operation,
+                    }
+                )
+    if rows:
+        db.execute(insert(BoardChange), rows)
+    return revision
+
+
+def get_board_revision(db: Session, board_id: int) -> int | None:
+    """Get a board's current revision, or None if the board does not exist"""
+    return db.query(Board.revision).filter(Board.id == board_id).scalar()
+
+
+def bump_tags_revision(db: Session) -> int:
+    """Increment the tag list's revision, in the caller's transaction"""
+    statement = dialect_insert(db, COUNTERS).values(name=TAGS_COUNTER, revision=1)
+    return db.scalar(
+        statement.on_conflict_do_update(
+            index_elements=[COUNTERS.c.name],
+            set_={"revision": COUNTERS.c.revision + 1},
+        ).returning(COUNTERS.c.revision)
+    )
+
+
+def get_tags_version(db: Session) -> str:
+    """Get a version string for the tag list, bumped by every tag write.
+
+    A stored counter rather than anything derived from the rows, which SQLite
+    can bring back by reusing the id of a deleted tag.
+    """
+    revision = db.scalar(
+        select(COUNTERS.c.revision).where(COUNTERS.c.name == TAGS_COUNTER)
+    )
+    return str(revision or 0)
+
+
+def get_changes_since(
+    db: Session, board_id: int, since: int
+) -> tuple[dict[str, list[int]], dict[str, list[int]]]:
+    """Collapse a board's change log after a revision into upserted and deleted ids.
+
+    Only the latest operation per entity counts, so an idea created and then
+    deleted after `since` is reported once, as a tombstone.
+    """
+    rows = (
+        db.query(BoardChange.entity_type, BoardChange.entity_id, BoardChange.operation)
+        .filter(BoardChange.board_id == board_id, BoardChange.revision > since)
+        .order_by(BoardChange.revision, BoardChange.id)
+        .all()
+    )
+
+    latest: dict[tuple[str, int], str] = {}
+    for entity_type, entity_id, operation in rows:
+        latest[(entity_type, entity_id)] = operation
+
+    upserts: dict[str, list[int]] = {}
+    deletes: dict[str, list[int]] = {}
+    for (entity_type, entity_id), operation in latest.items():
+        target = upserts if operation == "upsert" else deletes
+        target.setdefault(entity_type, []).append(entity_id)
+    return upserts, deletes
+
+
+def compact_change_log(db: Session, retention: timedelta) -> int:
+    """Compact the change log, returning the number of entries removed.
+
+    Entries superseded by a later change to the same entity are dropped without
+    losing information. Entries older than the retention window are pruned and
+    the board's compacted_revision raised, so clients that were further behind
+    are told to resync in full.
+    """
+    newer = aliased(BoardChange)
+    superseded = db.execute(
+        delete(BoardChange)
+        .where(
+            select(newer.id)
+            .where(
+                newer.board_id == BoardChange.board_id,
+                newer.entity_type == BoardChange.entity_type,
+                newer.entity_id == BoardChange.entity_id,
+                newer.revision > BoardChange.revision,
+            )
+            .exists()
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    # created_at is stored naive, in UTC
+    cutoff = datetime.now(UTC).replace(tzinfo=None) - retention
+    expired = BoardChange.created_at < cutoff
+    pruned_revision = (
+        select(func.max(BoardChange.revision))
+        .where(BoardChange.board_id == Board.id, expired)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(Board)
+        .where(Board.id.in_(select(BoardChange.board_id).where(expired)))
+        .values(compacted_revision=pruned_revision, updated_at=Board.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    pruned = db.execute(
+        delete(BoardChange).where(expired).execution_options(synchronize_session=False)
+    ).rowcount
+
+    db.commit()
+    return superseded + pruned
+
+
+def _compact_once() -> int:
+    db = SessionLocal()
+    try:
+        return compact_change_log(
+            db, timedelta(days=settings.change_log_retention_days)
+        )
+    finally:
+        db.close()
+
+
+async def run_change_log_compaction(interval_seconds: float):
+    """Compact the change log forever, sleeping between runs"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            removed = await asyncio.to_thread(_compact_once)
+            print(f"Change log compaction removed {removed} entries")
+        except Exception as e:
+            print(f"Change log compaction failed: {e}")
@@ -0,0 +1,562 @@
+import asyncio
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    Float,
+    Integer,
+    delete,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session, aliased
+
+from app import columnar
+from app.config import settings
+from app.db import (
+    SessionLocal,
+    insert_many_returning_ids,
+    insert_returning,
+    update_rows,
+)
+from app.models.board import Board
+from app.models.connection import IdeaConnection
+from app.models.group import IdeaGroup
+from app.models.idea import Idea
+from app.models.snapshot import BoardSnapshot
+from app.models.tag import Tag, idea_tags
+from app.services import ranking_service, summary_service
+from app.services.revision_service import get_board_revision, record_board_changes
+
+SNAPSHOTS = BoardSnapshot.__table__
+SNAPSHOT_COLUMNS = [
+    SNAPSHOTS.c[name]
+    for name in (
+        "id",
+        "board_id",
+        "revision",
+        "kind",
+        "label",
+        "idea_count",
+        "group_count",
+        "connection_count",
+        "size_bytes",
+        "created_at",
+    )
+]
+
+# What a snapshot keeps of each row, besides its id and board
+TABLE_FIELDS = {
+    "groups": (
+        IdeaGroup.__table__,
+        (
+            "name",
+            "color",
+            "position_x",
+            "position_y",
+            "width",
+            "height",
+            "is_collapsed",
+            "cloned_from_id",
+            "created_at",
+        ),
+    ),
+    "ideas": (
+        Idea.__table__,
+        (
+            "title",
+            "description",
+            "color",
+            "position_x",
+            "position_y",
+            "width",
+            "height",
+            "rotation",
+            "votes",
+            "group_id",
+            "cloned_from_id",
+            "created_at",
+        ),
+    ),
+    "connections": (
+        IdeaConnection.__table__,
+        ("source_id", "target_id", "label", "connection_type", "created_at"),
+    ),
+}
+TAG_LINK_COLUMNS = [("idea_id", "id"), ("tag_id", "int")]
+
+# Rows per IN list, well under SQLite's limit on bound parameters
+CHUNK_SIZE = 10_000
+
+
+def _kind(column_type) -> str:
+    for sql_type, kind in (
+        (Boolean, "bool"),
+        (Integer, "int"),
+        (Float, "float"),
+        (DateTime, "datetime"),
+    ):
+        if isinstance(column_type, sql_type):
+            return kind
+    return "str"
+
+
+COLUMNS = {
+    name: [("id", "id")] + [(column, _kind(table.c[column].type)) for column in fields]
+    for name, (table, fields) in TABLE_FIELDS.items()
+}
+
+
+@dataclass
+class BoardState:
+    # id -> row values in TABLE_FIELDS order, per table
+    groups: dict[int, tuple] = field(default_factory=dict)
+    ideas: dict[int, tuple] = field(default_factory=dict)
+    connections: dict[int, tuple] = field(default_factory=dict)
+    # (idea id, tag id)
+    tag_links: set[tuple[int, int]] = field(default_factory=set)
+
+
+def _chunks(ids: list[int]):
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start : start + CHUNK_SIZE]
+
+
+def capture_state(db: Session, board_id: int) -> BoardState:
+    """Read a board's groups, ideas, connections and tag links"""
+    state = BoardState()
+    for name, (table, fields) in TABLE_FIELDS.items():
+        statement = select(table.c.id, *(table.c[column] for column in fields))
+        if table is IdeaConnection.__table__:
+            # Connections belong to the board of the idea they start from
+            statement = statement.join(Idea, Idea.id == table.c.source_id).where(
+                Idea.board_id == board_id
+            )
+        else:
+            statement = statement.where(table.c.board_id == board_id)
+        getattr(state, name).update(
+            (row[0], tuple(row[1:])) for row in db.execute(statement)
+        )
+    # Plain tuples: Row objects compare far slower when sorted
+    state.tag_links = {
+        (idea_id, tag_id)
+        for idea_id, tag_id in db.execute(
+            select(idea_tags.c.idea_id, idea_tags.c.tag_id)
+            .join(Idea, Idea.id == idea_tags.c.idea_id)
+            .where(Idea.board_id == board_id)
+        )
+    }
+    return state
+
+
+def encode_delta(base: BoardState, state: BoardState) -> bytes:
+    """The rows that differ between two states, compressed.
+
+    Stores new and changed rows whole, the ids of deleted rows, and tag links
+    added and removed. Against an empty base this is the whole state.
+    """
+    arrays = {}
+    for name in TABLE_FIELDS:
+        before, after = getattr(base, name), getattr(state, name)
+        changed = [
+            (row_id, *row)
+            for row_id, row in sorted(after.items())
+            if before.get(row_id) != row
+        ]
+        deleted = [(row_id,) for row_id in sorted(before.keys() - after.keys())]
+        arrays.update(columnar.encode_rows(name, COLUMNS[name], changed))
+        arrays.update(columnar.encode_rows(f"{name}.deleted", [("id", "id")], deleted))
+    for name, links in (
+        ("tag_links.added", state.tag_links - base.tag_links),
+        ("tag_links.removed", base.tag_links - state.tag_links),
+    ):
+        arrays.update(columnar.encode_rows(name, TAG_LINK_COLUMNS, sorted(links)))
+    return columnar.pack(arrays)
+
+
+def apply_delta(base: BoardState, data: bytes) -> BoardState:
+    """The state encode_delta was given, rebuilt from its base and output"""
+    arrays = columnar.unpack(data)
+    state = BoardState()
+    for name in TABLE_FIELDS:
+        rows = dict(getattr(base, name))
+        for (row_id,) in columnar.decode_rows(
+            f"{name}.deleted", [("id", "id")], arrays
+        ):
+            del rows[row_id]
+        rows.update(
+            (row[0], row[1:])
+            for row in columnar.decode_rows(name, COLUMNS[name], arrays)
+        )
+        setattr(state, name, rows)
+    added = columnar.decode_rows("tag_links.added", TAG_LINK_COLUMNS, arrays)
+    removed = columnar.decode_rows("tag_links.removed", TAG_LINK_COLUMNS, arrays)
+    state.tag_links = (base.tag_links - set(removed)) | set(added)
+    return state
+
+
+def load_state(db: Session, snapshot_id: int) -> BoardState:
+    """Rebuild the board as a snapshot saw it, from its full copy forward"""
+    chain = []
+    while snapshot_id is not None:
+        snapshot_id, data = db.execute(
+            select(SNAPSHOTS.c.base_id, SNAPSHOTS.c.data).where(
+                SNAPSHOTS.c.id == snapshot_id
+            )
+        ).one()
+        chain.append(data)
+    state = BoardState()
+    for data in reversed(chain):
+        state = apply_delta(state, data)
+    return state
+
+
+def take_snapshot(
+    db: Session, board_id: int, kind: str, label: str | None = None
+) -> tuple[dict, BoardState] | None:
+    """Store a board's current state, in the caller's transaction.
+
+    The snapshot is a delta against the board's latest one, except every
+    snapshot_keyframe_interval snapshots, which store the whole board.
+    Returns the snapshot row and the state it saved, or None if the board
+    doesn't exist.
+    """
+    revision = get_board_revision(db, board_id)
+    if revision is None:
+        return None
+    latest = db.execute(
+        select(SNAPSHOTS.c.id, SNAPSHOTS.c.depth)
+        .where(SNAPSHOTS.c.board_id == board_id)
+        .order_by(SNAPSHOTS.c.id.desc())
+        .limit(1)
+    ).first()
+    state = capture_state(db, board_id)
+    if latest is not None and latest.depth + 1 < settings.snapshot_keyframe_interval:
+        base_id, depth, base = latest.id, latest.depth + 1, load_state(db, latest.id)
+    else:
+        base_id, depth, base = None, 0, BoardState()
+    data = encode_delta(base, state)
+    row = insert_returning(
+        db,
+        SNAPSHOTS,
+        {
+            "board_id": board_id,
+            "base_id": base_id,
+            "depth": depth,
+            "revision": revision,
+            "kind": kind,
+            "label": label,
+            "idea_count": len(state.ideas),
+            "group_count": len(state.groups),
+            "connection_count": len(state.connections),
+            "size_bytes": len(data),
+            "data": data,
+        },
+        SNAPSHOT_COLUMNS,
+    )
+    # Periodic snapshots skip the board until it changes again
+    db.execute(
+        update(Board)
+        .where(Board.id == board_id, Board.snapshot_revision < revision)
+        .values(snapshot_revision=revision, updated_at=Board.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    return dict(row), state
+
+
+def list_snapshots(db: Session, board_id: int) -> list[dict]:
+    """A board's snapshots, newest first, without their data"""
+    return [
+        dict(row)
+        for row in db.execute(
+            select(*SNAPSHOT_COLUMNS)
+            .where(SNAPSHOTS.c.board_id == board_id)
+            .order_by(SNAPSHOTS.c.id.desc())
+        ).mappings()
+    ]
+
+
+def _remap(
+    rows: dict[int, tuple], fields: tuple, references: dict[str, dict[int, int]]
+) -> dict[int, tuple]:
+    """Point references at the new ids of rows that were restored"""
+    positions = {fields.index(name): ids for name, ids in references.items() if ids}
+    if not positions:
+        return rows
+    remapped = {}
+    for row_id, row in rows.items():
+        row = list(row)
+        for position, ids in positions.items():
+            row[position] = ids.get(row[position], row[position])
+        remapped[row_id] = tuple(row)
+    return remapped
+
+
+def _sync_rows(
+    db: Session,
+    board_id: int,
+    name: str,
+    current: dict[int, tuple],
+    target: dict[int, tuple],
+) -> tuple[dict[int, int], list[int], list[int]]:
+    """Make a table's rows on the board match the target, in bulk.
+
+    Inserts the rows the board lost, updates rows whose values differ and
+    deletes rows the target doesn't have, in that order so a restored row
+    can't be handed the id of one deleted here. Restored rows get new ids,
+    since the old ones may have been reused. Returns old id -> new id, and
+    the ids upserted and deleted.
+    """
+    table, fields = TABLE_FIELDS[name]
+    restored = [row_id for row_id in target if row_id not in current]
+    owner = {} if name == "connections" else {"board_id": board_id}
+    new_ids = insert_many_returning_ids(
+        db, table, [owner | dict(zip(fields, target[row_id])) for row_id in restored]
+    )
+
+    # created_at never changes, and datetimes don't travel as JSON
+    updated = [
+        row_id
+        for row_id, row in target.items()
+        if row_id in current and current[row_id] != row
+    ]
+    update_rows(
+        db,
+        table,
+        [
+            {"id": row_id}
+            | {
+                column: value
+                for column, value in zip(fields, target[row_id])
+                if column != "created_at"
+            }
+            for row_id in updated
+        ],
+    )
+
+    deleted = sorted(current.keys() - target.keys())
+    for ids in _chunks(deleted):
+        db.execute(delete(table).where(table.c.id.in_(ids)))
+    return dict(zip(restored, new_ids)), updated + new_ids, deleted
+
+
+def restore_snapshot(db: Session, board_id: int, snapshot_id: int) -> dict | None:
+    """Put a board back the way a snapshot saw it, and commit.
+
+    Saves the current state as a "restore" snapshot first, so the restore can
+    itself be undone. Only rows that differ are written, a statement or two
+    per table. Rows deleted since come back with new ids; connections to
+    ideas on other boards that no longer exist, and links to deleted tags,
+    are left out. Returns None if the board has no such snapshot.
+    """
+    found = db.scalar(
+        select(SNAPSHOTS.c.id).where(
+            SNAPSHOTS.c.id == snapshot_id, SNAPSHOTS.c.board_id == board_id
+        )
+    )
+    if found is None:
+        return None
+    target = load_state(db, snapshot_id)
+    backup, current = take_snapshot(
+        db, board_id, "restore", label=f"Before restoring snapshot {snapshot_id}"
+    )
+
+    upserts, deletes = {}, {}
+    group_ids, upserts["group"], deletes["group"] = _sync_rows(
+        db, board_id, "groups", current.groups, target.groups
+    )
+
+    target_ideas = _remap(
+        target.ideas, TABLE_FIELDS["ideas"][1], {"group_id": group_ids}
+    )
+    # Connections from other boards into ideas deleted here go with the
+    # cascade; those boards need to hear about it
+    source = aliased(Idea)
+    incoming = []
+    for ids in _chunks(sorted(current.ideas.keys() - target_ideas.keys())):
+        incoming += db.execute(
+            select(source.board_id, IdeaConnection.id)
+            .join(source, source.id == IdeaConnection.source_id)
+            .where(
+                IdeaConnection.target_id.in_(ids),
+                source.board_id.is_distinct_from(board_id),
+            )
+        ).all()
+    idea_ids, upserts["idea"], deletes["idea"] = _sync_rows(
+        db, board_id, "ideas", current.ideas, target_ideas
+    )
+
+    connection_fields = TABLE_FIELDS["connections"][1]
+    target_connections = _remap(
+        target.connections,
+        connection_fields,
+        {"source_id": idea_ids, "target_id": idea_ids},
+    )
+    target_index = connection_fields.index("target_id")
+    board_ideas = set(current.ideas) | set(idea_ids.values())
+    elsewhere = sorted(
+        {row[target_index] for row in target_connections.values()} - board_ideas
+    )
+    existing = set()
+    for ids in _chunks(elsewhere):
+        existing.update(db.scalars(select(Idea.id).where(Idea.id.in_(ids))))
+    target_connections = {
+        row_id: row
+        for row_id, row in target_connections.items()
+        if row[target_index] in board_ideas or row[target_index] in existing
+    }
+    _, upserts["connection"], deletes["connection"] = _sync_rows(
+        db, board_id, "connections", current.connections, target_connections
+    )
+
+    tag_ids = set(db.scalars(select(Tag.id)))
+    target_links = {
+        (idea_ids.get(idea_id, idea_id), tag_id)
+        for idea_id, tag_id in target.tag_links
+        if tag_id in tag_ids
+    }
+    relinked = sorted(
+        {idea_id for idea_id, _ in current.tag_links ^ target_links}
+        - set(deletes["idea"])
+    )
+    for ids in _chunks(relinked):
+        db.execute(delete(idea_tags).where(idea_tags.c.idea_id.in_(ids)))
+    relinked_ids = set(relinked)
+    links = [
+        {"idea_id": idea_id, "tag_id": tag_id}
+        for idea_id, tag_id in sorted(target_links)
+        if idea_id in relinked_ids
+    ]
+    if links:
+        db.execute(insert(idea_tags), links)
+    upserts["idea_tags"] = relinked
+
+    revision = record_board_changes(db, board_id, upserts=upserts, deletes=deletes)
+    incoming_by_board: dict[int, list[int]] = {}
+    for other_board_id, connection_id in incoming:
+        incoming_by_board.setdefault(other_board_id, []).append(connection_id)
+    for other_board_id, connection_ids in incoming_by_board.items():
+        record_board_changes(db, other_board_id, deletes={"connection": connection_ids})
+    summary_service.note_changes(
+        db, board_id, edits=len(upserts["idea"]) + len(deletes["idea"])
+    )
+    db.commit()
+    ranking_service.forget_board_ranking(board_id)
+    return {
+        "snapshot_id": snapshot_id,
+        "backup_snapshot_id": backup["id"],
+        "revision": revision,
+        "upserted": {
+            entity: len(ids) for entity, ids in upserts.items() if entity != "idea_tags"
+        },
+        "deleted": {entity: len(ids) for entity, ids in deletes.items()},
+        "relinked_ideas": len(relinked),
+    }
+
+
+def boards_to_snapshot(db: Session) -> list[int]:
+    """Boards changed since their latest snapshot, or never snapshotted"""
+    return db.scalars(
+        select(Board.id)
+        .where(Board.revision > Board.snapshot_revision)
+        .order_by(Board.id)
+    ).all()
+
+
+def claim_snapshot(db: Session, board_id: int) -> int | None:
+    """Claim a board's next periodic snapshot, returning the revision claimed.
+
+    Only one caller wins a board at a given revision, so workers running the
+    periodic snapshots at the same time don't each store a copy. Returns None
+    if the board has no changes left to snapshot.
+    """
+    return db.scalar(
+        update(Board)
+        .where(Board.id == board_id, Board.revision > Board.snapshot_revision)
+        .values(snapshot_revision=Board.revision, updated_at=Board.updated_at)
+        .returning(Board.snapshot_revision)
+    )
+
+
+def release_snapshot_claim(db: Session, board_id: int, revision: int):
+    """Give back a claim whose snapshot failed, so the next run retries it"""
+    latest = (
+        select(func.max(SNAPSHOTS.c.revision))
+        .where(SNAPSHOTS.c.board_id == board_id)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(Board)
+        .where(Board.id == board_id, Board.snapshot_revision == revision)
+        .values(snapshot_revision=func.coalesce(latest, 0), updated_at=Board.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def prune_snapshots(db: Session, retention: timedelta) -> int:
+    """Delete snapshots older than the retention window, returning the count.
+
+    A delta needs every snapshot back to its chain's full copy, so snapshots
+    go a whole chain at a time: those before the newest full copy that is
+    itself older than the window. Each board keeps a snapshot from before it.
+    """
+    # created_at is stored naive, in UTC
+    cutoff = datetime.now(UTC).replace(tzinfo=None) - retention
+    keyframe = SNAPSHOTS.alias("keyframe")
+    oldest_kept = (
+        select(func.max(keyframe.c.id))
+        .where(
+            keyframe.c.board_id == SNAPSHOTS.c.board_id,
+            keyframe.c.base_id.is_(None),
+            keyframe.c.created_at < cutoff,
+        )
+        .scalar_subquery()
+    )
+    expired = SNAPSHOTS.c.id < oldest_kept
+    # Counted up front: deltas removed by the ON DELETE CASCADE from their
+    # base aren't in the DELETE's row count on every database
+    pruned = db.scalar(select(func.count()).where(expired))
+    db.execute(delete(SNAPSHOTS).where(expired))
+    db.commit()
+    return pruned
+
+
+def _snapshot_once() -> tuple[int, int]:
+    db = SessionLocal()
+    try:
+        taken = 0
+        for board_id in boards_to_snapshot(db):
+            # Committed on its own so the board row isn't locked while its
+            # snapshot is captured
+            revision = claim_snapshot(db, board_id)
+            db.commit()
+            if revision is None:
+                continue
+            try:
+                take_snapshot(db, board_id, "periodic")
+                db.commit()
+            except Exception:
+                db.rollback()
+                release_snapshot_claim(db, board_id, revision)
+                db.commit()
+                raise
+            taken += 1
+        pruned = prune_snapshots(db, timedelta(days=settings.snapshot_retention_days))
+        return taken, pruned
+    finally:
+        db.close()
+
+
+async def run_board_snapshots(interval_seconds: float):
+    """Snapshot changed boards forever, sleeping between runs"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            taken, pruned = await asyncio.to_thread(_snapshot_once)
+            print(f"Board snapshots taken: {taken}, pruned: {pruned}")
+        except Exception as e:
+            print(f"Board snapshots failed: {e}")
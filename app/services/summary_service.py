@@ -0,0 +1,160 @@
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import and_, case, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.ai_job import AIJob
+from app.models.board_summary import BoardSummary
+
+
+def _utcnow() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def stale_clause():
+    return or_(
+        BoardSummary.pending_edits >= settings.summary_stale_after_edits,
+        BoardSummary.pending_votes >= settings.summary_stale_after_votes,
+    )
+
+
+def note_changes(db: Session, board_id: int | None, edits: int = 0, votes: int = 0):
+    """Count summary-relevant writes against a board's stored summary.
+
+    Runs inside the caller's transaction. Boards without a stored summary have
+    nothing to go stale, so the UPDATE simply matches no row.
+    """
+    if board_id is None:
+        return
+    now = _utcnow()
+    db.execute(
+        update(BoardSummary)
+        .where(BoardSummary.board_id == board_id)
+        .values(
+            pending_edits=BoardSummary.pending_edits + edits,
+            pending_votes=BoardSummary.pending_votes + votes,
+            first_change_at=case(
+                (BoardSummary.first_change_at.is_(None), now),
+                else_=BoardSummary.first_change_at,
+            ),
+            last_change_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def get_summary(db: Session, board_id: int) -> dict | None:
+    """Get a board's stored summary with its stale flag and age, or None"""
+    row = (
+        db.execute(
+            select(
+                BoardSummary.summary,
+                BoardSummary.themes,
+                BoardSummary.top_priority,
+                BoardSummary.generated_at,
+                stale_clause().label("stale"),
+            ).where(BoardSummary.board_id == board_id)
+        )
+        .mappings()
+        .first()
+    )
+    if row is None:
+        return None
+    summary = dict(row)
+    summary["stale"] = bool(summary["stale"])
+    summary["age_seconds"] = (_utcnow() - row["generated_at"]).total_seconds()
+    return summary
+
+
+def pending_changes(db: Session, board_id: int) -> tuple[int, int]:
+    """Get the (edits, votes) counted since a board's summary was generated"""
+    row = db.execute(
+        select(BoardSummary.pending_edits, BoardSummary.pending_votes).where(
+            BoardSummary.board_id == board_id
+        )
+    ).first()
+    return (row[0], row[1]) if row else (0, 0)
+
+
+def store_summary(
+    db: Session, board_id: int, result: dict, seen: tuple[int, int] = (0, 0)
+) -> datetime:
+    """Save a freshly generated summary in the caller's transaction.
+
+    `seen` is what pending_changes returned when the board was read for the
+    model, so changes made while the model was running stay counted.
+    """
+    now = _utcnow()
+    content = {
+        "summary": result["summary"],
+        "themes": result["themes"],
+        "top_priority": result["top_priority"],
+        "generated_at": now,
+        "refresh_job_id": None,
+    }
+    edits = BoardSummary.pending_edits - seen[0]
+    votes = BoardSummary.pending_votes - seen[1]
+    updated = db.execute(
+        update(BoardSummary)
+        .where(BoardSummary.board_id == board_id)
+        .values(
+            **content,
+            pending_edits=edits,
+            pending_votes=votes,
+            first_change_at=case(
+                (and_(edits == 0, votes == 0), None),
+                else_=BoardSummary.first_change_at,
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not updated:
+        db.execute(insert(BoardSummary).values(board_id=board_id, **content))
+    return now
+
+
+def due_for_refresh(db: Session) -> list[tuple[int, int | None]]:
+    """(board id, previous refresh job id) of stale summaries past the debounce.
+
+    Boards with a refresh already queued or running are skipped; after a
+    failed refresh they are retried once max_delay has passed.
+    """
+    now = _utcnow()
+    quiet = now - timedelta(seconds=settings.summary_refresh_debounce_seconds)
+    overdue = now - timedelta(seconds=settings.summary_refresh_max_delay_seconds)
+    return [
+        (board_id, job_id)
+        for board_id, job_id in db.execute(
+            select(BoardSummary.board_id, BoardSummary.refresh_job_id)
+            .outerjoin(AIJob, AIJob.id == BoardSummary.refresh_job_id)
+            .where(
+                stale_clause(),
+                or_(
+                    BoardSummary.last_change_at <= quiet,
+                    BoardSummary.first_change_at <= overdue,
+                ),
+                or_(
+                    AIJob.id.is_(None),
+                    and_(AIJob.status == "failed", AIJob.finished_at <= overdue),
+                ),
+            )
+        )
+    ]
+
+
+def set_refresh_job(
+    db: Session, board_id: int, job_id: int, previous_job_id: int | None
+) -> bool:
+    """Point a summary at its refresh job, unless another process got there first"""
+    return bool(
+        db.execute(
+            update(BoardSummary)
+            .where(
+                BoardSummary.board_id == board_id,
+                BoardSummary.refresh_job_id.is_not_distinct_from(previous_job_id),
+            )
+            .values(refresh_job_id=job_id)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    )
@@ -0,0 +1,122 @@
+"""Time POST /boards/{id}/auto-group on a large board.
+
+Ideas are drawn from a handful of topics, each placed in its own region of the
+canvas with some overlap, so the clusters are there to be found. Reports the
+clustering alone and the whole request, with and without applying the groups.
+
+Run with: python -m benchmarks.bench_auto_group [--ideas 10000]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every model on Base.metadata)
+from app.db import Base, create_db_engine, get_db
+from app.main import app
+from app.models.board import Board
+from app.models.idea import Idea
+from app.services.clustering_service import propose_groups
+
+TOPICS = [
+    "invoice billing payment refund tax receipt",
+    "mobile offline sync battery notification",
+    "search filter sort results relevance",
+    "onboarding tutorial signup welcome tips",
+    "dark theme contrast font accessibility",
+    "export csv pdf report chart",
+    "login password sso security session",
+    "slack email webhook integration api",
+]
+
+
+def seed_board(engine, ideas: int, seed: int = 0) -> int:
+    rng = random.Random(seed)
+    with engine.begin() as connection:
+        board_id = connection.scalar(
+            insert(Board).values(name="Auto-group bench").returning(Board.id)
+        )
+        rows = []
+        for i in range(ideas):
+            topic = rng.randrange(len(TOPICS))
+            words = rng.sample(TOPICS[topic].split(), 3)
+            rows.append(
+                {
+                    "board_id": board_id,
+                    "title": " ".join(words[:2]).capitalize(),
+                    "description": f"We should look at {words[2]} ({i})",
+                    "position_x": (topic % 4) * 2500 + rng.gauss(0, 700),
+                    "position_y": (topic // 4) * 2500 + rng.gauss(0, 700),
+                }
+            )
+        connection.execute(insert(Idea), rows)
+    return board_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ideas", type=int, default=10_000)
+    parser.add_argument("--k", type=int, default=None)
+    args = parser.parse_args()
+
+    engine = create_db_engine(f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}")
+    Base.metadata.create_all(engine)
+    board_id = seed_board(engine, args.ideas)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as db:
+        ideas = [
+            dict(row)
+            for row in db.execute(
+                select(
+                    Idea.id,
+                    Idea.title,
+                    Idea.description,
+                    Idea.position_x,
+                    Idea.position_y,
+                    Idea.width,
+                    Idea.height,
+                ).where(Idea.board_id == board_id)
+            ).mappings()
+        ]
+
+    def bench_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = bench_db
+    client = TestClient(app)
+    print(f"auto-grouping a board with {args.ideas} ideas on SQLite")
+    try:
+        started = time.perf_counter()
+        groups = propose_groups(ideas, k=args.k)
+        elapsed = time.perf_counter() - started
+        print(
+            f"  {'clustering only':<20}{elapsed * 1000:10.1f} ms {len(groups):6d} groups"
+        )
+        for apply in (False, True):
+            started = time.perf_counter()
+            response = client.post(
+                f"/boards/{board_id}/auto-group", json={"k": args.k, "apply": apply}
+            )
+            elapsed = time.perf_counter() - started
+            assert response.status_code == 200, response.text
+            name = "propose + apply" if apply else "propose (request)"
+            count = len(response.json()["groups"])
+            print(f"  {name:<20}{elapsed * 1000:10.1f} ms {count:6d} groups")
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
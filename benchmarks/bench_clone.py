@@ -0,0 +1,148 @@
+"""Compare cloning a large board with POST /boards/{id}/clone against
+re-creating it through the per-row API, as template users had to.
+
+The per-row path copies the first --api-ideas ideas (one POST per group,
+idea and connection) and is scaled up to the whole board; running it in full
+takes minutes at 50k ideas. Only connections between copied ideas are made,
+so the estimate is a lower bound.
+
+Run with: python -m benchmarks.bench_clone [--ideas 50000] [--api-ideas 1000]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every model on Base.metadata)
+from app.db import Base, create_db_engine, get_db
+from app.main import app
+from app.models.connection import IdeaConnection
+from app.models.group import IdeaGroup
+from app.models.idea import Idea
+from app.models.tag import idea_tags
+from benchmarks.synthetic import BoardShape, seed_boards
+
+
+def copy_through_api(client: TestClient, db, board_id: int, ideas: int) -> int:
+    """Re-create a board's first ideas, their groups and connections one call at a time"""
+    new_board = client.post("/boards", json={"name": "API copy"}).json()["id"]
+    group_ids = {}
+    for group in db.execute(
+        select(IdeaGroup).where(IdeaGroup.board_id == board_id)
+    ).scalars():
+        group_ids[group.id] = client.post(
+            "/groups",
+            json={
+                "name": group.name,
+                "board_id": new_board,
+                "position_x": group.position_x,
+                "position_y": group.position_y,
+            },
+        ).json()["id"]
+
+    tags: dict[int, list[int]] = {}
+    for idea_id, tag_id in db.execute(select(idea_tags.c.idea_id, idea_tags.c.tag_id)):
+        tags.setdefault(idea_id, []).append(tag_id)
+    idea_ids = {}
+    for idea in db.execute(
+        select(Idea).where(Idea.board_id == board_id).order_by(Idea.id).limit(ideas)
+    ).scalars():
+        new_idea = client.post(
+            "/ideas",
+            json={
+                "title": idea.title,
+                "description": idea.description,
+                "position_x": idea.position_x,
+                "position_y": idea.position_y,
+                "board_id": new_board,
+                "tag_ids": tags.get(idea.id, []),
+            },
+        ).json()["id"]
+        idea_ids[idea.id] = new_idea
+        if idea.group_id is not None:
+            client.post(
+                f"/groups/{group_ids[idea.group_id]}/ideas",
+                json={"idea_ids": [new_idea]},
+            )
+
+    for source_id, target_id in db.execute(
+        select(IdeaConnection.source_id, IdeaConnection.target_id)
+    ):
+        if source_id in idea_ids and target_id in idea_ids:
+            client.post(
+                "/connections",
+                json={
+                    "source_id": idea_ids[source_id],
+                    "target_id": idea_ids[target_id],
+                },
+            )
+    return len(idea_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ideas", type=int, default=50_000)
+    parser.add_argument("--api-ideas", type=int, default=1_000)
+    args = parser.parse_args()
+
+    engine = create_db_engine(f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}")
+    Base.metadata.create_all(engine)
+    shape = BoardShape(
+        ideas=args.ideas, groups=20, connections=args.ideas // 2, tags_per_idea=2
+    )
+    (board,), _ = seed_boards(engine, 1, shape)
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    Session = sessionmaker(bind=engine)
+
+    def bench_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = bench_db
+    client = TestClient(app)
+    print(
+        f"cloning a board with {args.ideas} ideas, {shape.connections} connections "
+        f"and {shape.tags_per_idea} tags per idea on SQLite"
+    )
+    try:
+        statements.clear()
+        started = time.perf_counter()
+        response = client.post(f"/boards/{board.id}/clone", json={})
+        elapsed = time.perf_counter() - started
+        assert response.json()["idea_count"] == args.ideas, response.text
+        print(
+            f"  {'clone endpoint':<26}{elapsed * 1000:10.1f} ms "
+            f"{len(statements):8d} statements"
+        )
+
+        if args.api_ideas:
+            statements.clear()
+            with Session() as db:
+                started = time.perf_counter()
+                copied = copy_through_api(client, db, board.id, args.api_ideas)
+                elapsed = time.perf_counter() - started
+            scale = args.ideas / copied
+            print(
+                f"  {'per-row API (extrapolated)':<26}{elapsed * scale * 1000:10.1f} ms "
+                f"{round(len(statements) * scale):8d} statements"
+            )
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
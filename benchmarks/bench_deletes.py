@@ -0,0 +1,97 @@
+"""Compare deleting a large board row by row through the ORM with set-based deletes.
+
+The ORM path reproduces the old behaviour: cascade="all, delete-orphan" loaded
+every idea and its tag links before deleting them one by one. The set-based
+path is the current DELETE /boards/{id}, which leaves the children to
+ON DELETE CASCADE.
+
+Run with: python -m benchmarks.bench_deletes [--ideas 100000]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every model on Base.metadata)
+from app.db import Base, create_db_engine, get_db
+from app.main import app
+from app.models.board import Board
+from benchmarks.synthetic import BoardShape, seed_boards
+
+
+def fresh_board(shape: BoardShape):
+    """A new SQLite file holding one seeded board, with a statement counter"""
+    engine = create_db_engine(f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}")
+    Base.metadata.create_all(engine)
+    (board,), _ = seed_boards(engine, 1, shape)
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    return engine, board.id, statements
+
+
+def orm_cascade(engine, board_id: int):
+    # pysqlite only reports the last row count of an executemany, which the
+    # unit of work would take for a stale secondary delete
+    engine.dialect.supports_sane_multi_rowcount = False
+    with sessionmaker(bind=engine)() as db:
+        board = db.get(Board, board_id)
+        for idea in board.ideas:
+            # The old cascade loaded each idea's tag links to delete them
+            idea.tags
+            db.delete(idea)
+        db.delete(board)
+        db.commit()
+
+
+def set_based(engine, board_id: int):
+    Session = sessionmaker(bind=engine)
+
+    def bench_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = bench_db
+    try:
+        assert TestClient(app).delete(f"/boards/{board_id}").status_code == 200
+    finally:
+        app.dependency_overrides.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ideas", type=int, default=20_000)
+    parser.add_argument("--skip-orm", action="store_true", help="slow on big boards")
+    args = parser.parse_args()
+    shape = BoardShape(
+        ideas=args.ideas, groups=20, connections=args.ideas // 2, tags_per_idea=2
+    )
+
+    paths = {"set-based DELETE": set_based}
+    if not args.skip_orm:
+        paths = {"orm cascade (old)": orm_cascade, **paths}
+
+    print(f"deleting a board with {args.ideas} ideas on SQLite")
+    for name, delete_board in paths.items():
+        engine, board_id, statements = fresh_board(shape)
+        statements.clear()
+        started = time.perf_counter()
+        delete_board(engine, board_id)
+        elapsed = time.perf_counter() - started
+        print(f"  {name:<20}{elapsed * 1000:10.1f} ms {len(statements):8d} statements")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Time POST /boards/{id}/layout/auto on a large connected board.
+
+For each algorithm this reports the layout computation alone and the whole
+request with apply set, which saves every idea in a single UPDATE joined
+against the new positions sent as JSON. The last line is the per-row alternative: the same
+positions written with one UPDATE per idea.
+
+Run with: python -m benchmarks.bench_layout [--ideas 5000] [--connections 20000]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every model on Base.metadata)
+from app.db import Base, create_db_engine, get_db
+from app.main import app
+from app.models.connection import IdeaConnection
+from app.models.group import IdeaGroup
+from app.models.idea import Idea
+from app.services.layout_service import layout_board
+from benchmarks.synthetic import BoardShape, seed_boards
+
+
+def board_inputs(db, board_id: int):
+    ideas = [
+        dict(row)
+        for row in db.execute(
+            select(
+                Idea.id,
+                Idea.group_id,
+                Idea.position_x,
+                Idea.position_y,
+                Idea.width,
+                Idea.height,
+            )
+            .where(Idea.board_id == board_id)
+            .order_by(Idea.position_y, Idea.position_x, Idea.id)
+        ).mappings()
+    ]
+    connections = db.execute(
+        select(IdeaConnection.source_id, IdeaConnection.target_id)
+    ).all()
+    groups = {
+        group_id: (width, height)
+        for group_id, width, height in db.execute(
+            select(IdeaGroup.id, IdeaGroup.width, IdeaGroup.height)
+        )
+    }
+    return ideas, connections, groups
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ideas", type=int, default=5_000)
+    parser.add_argument("--connections", type=int, default=20_000)
+    args = parser.parse_args()
+
+    engine = create_db_engine(f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}")
+    Base.metadata.create_all(engine)
+    shape = BoardShape(ideas=args.ideas, groups=40, connections=args.connections)
+    (board,), _ = seed_boards(engine, 1, shape)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        ideas, connections, groups = board_inputs(db, board.id)
+
+    def bench_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = bench_db
+    client = TestClient(app)
+    print(
+        f"laying out a board with {args.ideas} ideas and "
+        f"{len(connections)} connections on SQLite"
+    )
+    try:
+        for algorithm in ("grid", "force", "groups"):
+            started = time.perf_counter()
+            layout = layout_board(algorithm, ideas, connections, groups)
+            computed = time.perf_counter() - started
+
+            started = time.perf_counter()
+            response = client.post(
+                f"/boards/{board.id}/layout/auto",
+                json={"algorithm": algorithm, "apply": True},
+            )
+            requested = time.perf_counter() - started
+            assert response.status_code == 200, response.text
+            print(
+                f"  {algorithm:<8} compute {computed * 1000:8.1f} ms"
+                f"   request + save {requested * 1000:8.1f} ms"
+            )
+
+        rows = [
+            {"idea_id": idea["id"], "x": float(x), "y": float(y)}
+            for idea, (x, y) in zip(ideas, layout.positions.tolist())
+        ]
+        with Session() as db:
+            started = time.perf_counter()
+            for row in rows:
+                db.execute(
+                    update(Idea)
+                    .where(Idea.id == bindparam("idea_id"))
+                    .values(position_x=bindparam("x"), position_y=bindparam("y")),
+                    row,
+                )
+            db.commit()
+            elapsed = time.perf_counter() - started
+        print(f"  save one UPDATE per idea {elapsed * 1000:8.1f} ms")
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Measure the per-request overhead of MetricsMiddleware and the query hooks.
+
+Drives the full app in-process (no network) for one endpoint, with and without
+the middleware and engine hooks, and reports the difference.
+
+Run with: python -m benchmarks.bench_metrics [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import metrics
+from app.db import Base, get_db
+from app.main import app
+from app.models.board import Board
+
+
+def build_engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Board), [{"name": f"Board {i}"} for i in range(50)])
+    return engine
+
+
+async def run(asgi_app, path: str, requests: int) -> float:
+    transport = httpx.ASGITransport(app=asgi_app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        for _ in range(50):
+            await client.get(path)
+        started = time.perf_counter()
+        for _ in range(requests):
+            await client.get(path)
+        return (time.perf_counter() - started) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--path", default="/boards")
+    args = parser.parse_args()
+
+    engine = build_engine()
+    Session = sessionmaker(bind=engine)
+
+    def bench_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = bench_db
+    middleware = list(app.user_middleware)
+
+    def set_instrumented(enabled: bool):
+        app.user_middleware = [
+            m for m in middleware if enabled or m.cls is not metrics.MetricsMiddleware
+        ]
+        # Rebuilt from user_middleware on the next request
+        app.middleware_stack = None
+        for name, hook in (
+            ("before_cursor_execute", metrics._before_cursor_execute),
+            ("after_cursor_execute", metrics._after_cursor_execute),
+        ):
+            if enabled and not event.contains(engine, name, hook):
+                event.listen(engine, name, hook)
+            elif not enabled and event.contains(engine, name, hook):
+                event.remove(engine, name, hook)
+
+    timings = {"bare": [], "instrumented": []}
+    for _ in range(args.rounds):
+        for name, enabled in (("bare", False), ("instrumented", True)):
+            set_instrumented(enabled)
+            timings[name].append(asyncio.run(run(app, args.path, args.requests)))
+    app.dependency_overrides.clear()
+
+    bare_best = min(timings["bare"])
+    instrumented_best = min(timings["instrumented"])
+    print(f"GET {args.path}, {args.requests} requests (best of {args.rounds})")
+    print(f"  bare          {bare_best * 1e6:8.1f} us/request")
+    print(f"  instrumented  {instrumented_best * 1e6:8.1f} us/request")
+    print(f"  overhead      {(instrumented_best / bare_best - 1) * 100:8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Drive concurrent requests through a small connection pool until it runs dry.
+
+Each request holds its pooled connection for --hold-ms (a stand-in for a slow
+query), so with more clients than pool_size + max_overflow the surplus waits
+up to --pool-timeout and is then shed with a 503 instead of queueing forever.
+
+Run with: python -m benchmarks.bench_pool [--clients 32] [--pool-size 4]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base, get_db
+from app.main import app
+from app.pool import TimedQueuePool, pool_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--max-overflow", type=int, default=2)
+    parser.add_argument("--pool-timeout", type=float, default=0.25)
+    parser.add_argument("--hold-ms", type=float, default=100)
+    args = parser.parse_args()
+
+    path = Path(tempfile.mkdtemp()) / "bench_pool.db"
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False},
+        poolclass=TimedQueuePool,
+        pool_size=args.pool_size,
+        max_overflow=args.max_overflow,
+        pool_timeout=args.pool_timeout,
+    )
+
+    @event.listens_for(engine, "connect")
+    def add_sleep(dbapi_connection, connection_record):
+        dbapi_connection.create_function("sleep", 1, time.sleep)
+
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    def slow_db():
+        db = Session()
+        try:
+            db.execute(text("SELECT sleep(:s)"), {"s": args.hold_ms / 1000})
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = slow_db
+    client = TestClient(app)
+
+    def request(_):
+        started = time.perf_counter()
+        status = client.get("/boards").status_code
+        return status, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as executor:
+        results = list(executor.map(request, range(args.requests)))
+    elapsed = time.perf_counter() - started
+    app.dependency_overrides.clear()
+
+    statuses = Counter(status for status, _ in results)
+    latencies = sorted(seconds for _, seconds in results)
+    stats = pool_stats(engine)
+    capacity = args.pool_size + args.max_overflow
+    print(
+        f"{args.requests} requests, {args.clients} clients, "
+        f"pool {args.pool_size}+{args.max_overflow}, hold {args.hold_ms:.0f} ms"
+    )
+    print(f"  throughput      {args.requests / elapsed:8.1f} req/s")
+    print(f"  statuses        {dict(sorted(statuses.items()))}")
+    print(f"  latency p50     {statistics.median(latencies) * 1000:8.1f} ms")
+    print(f"  latency p95     {latencies[int(len(latencies) * 0.95)] * 1000:8.1f} ms")
+    print(
+        f"  checkout wait   avg {stats['wait_seconds_avg'] * 1000:.1f} ms, "
+        f"max {stats['wait_seconds_max'] * 1000:.1f} ms"
+    )
+    print(f"  pool timeouts   {stats['timeouts']} (capacity {capacity})")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
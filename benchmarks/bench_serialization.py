@@ -0,0 +1,120 @@
+"""Compare response serialization paths for a large idea list.
+
+Run with: python -m benchmarks.bench_serialization [--ideas 10000]
+"""
+
+import argparse
+import json
+import time
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session, joinedload
+
+import app.models  # noqa: F401  (registers every model on Base.metadata)
+from app.db import Base
+from app.models.board import Board
+from app.models.idea import Idea
+from app.models.tag import Tag, idea_tags
+from app.schemas.idea import IdeaResponse
+from app.schemas.tag import TagResponse
+from app.serialization import json_response, response_columns
+
+
+def seed(db: Session, idea_count: int):
+    board = Board(name="Benchmark")
+    tags = [Tag(name=f"tag-{i}") for i in range(5)]
+    db.add(board)
+    db.add_all(tags)
+    db.flush()
+    db.execute(
+        insert(Idea),
+        [
+            {
+                "title": f"Idea {i}",
+                "description": "Lorem ipsum dolor sit amet " * 3,
+                "position_x": float(i % 100) * 220,
+                "position_y": float(i // 100) * 170,
+                "votes": i % 17,
+                "board_id": board.id,
+            }
+            for i in range(idea_count)
+        ],
+    )
+    idea_ids = db.scalars(select(Idea.id)).all()
+    db.execute(
+        insert(idea_tags),
+        [
+            {"idea_id": idea_id, "tag_id": tags[idea_id % len(tags)].id}
+            for idea_id in idea_ids
+        ],
+    )
+    db.commit()
+
+
+def best_of(repeats: int, fn) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ideas", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        seed(db, args.ideas)
+        orm_ideas = db.query(Idea).options(joinedload(Idea.tags)).all()
+        rows = db.execute(select(*response_columns(Idea.__table__, IdeaResponse)))
+        rows = rows.mappings().all()
+        links = dict(db.execute(select(idea_tags.c.idea_id, idea_tags.c.tag_id)).all())
+        tag_rows = db.execute(select(*response_columns(Tag.__table__, TagResponse)))
+        tags = {tag["id"]: dict(tag) for tag in tag_rows.mappings()}
+
+    adapter = TypeAdapter(list[IdeaResponse])
+
+    def orm_validation():
+        # What response_model does with ORM objects and from_attributes
+        validated = adapter.validate_python(orm_ideas, from_attributes=True)
+        return adapter.dump_json(validated)
+
+    def model_construct():
+        ideas = [
+            IdeaResponse.model_construct(
+                **row, tags=[TagResponse.model_construct(**tags[links[row["id"]]])]
+            )
+            for row in rows
+        ]
+        return adapter.dump_json(ideas)
+
+    def row_dicts():
+        # The path the list endpoints use
+        ideas = []
+        for row in rows:
+            idea = dict(row)
+            idea["tags"] = [tags[links[idea["id"]]]]
+            ideas.append(idea)
+        return json_response(ideas).body
+
+    assert json.loads(orm_validation()) == json.loads(row_dicts())
+    results = {
+        "orm + validation": best_of(args.repeats, orm_validation),
+        "model_construct": best_of(args.repeats, model_construct),
+        "row dicts + to_json": best_of(args.repeats, row_dicts),
+    }
+
+    baseline = results["orm + validation"]
+    print(f"serializing {args.ideas} ideas (best of {args.repeats})")
+    for name, seconds in results.items():
+        print(f"  {name:<22}{seconds * 1000:8.1f} ms  {baseline / seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
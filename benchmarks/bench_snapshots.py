@@ -0,0 +1,115 @@
+"""Measure board snapshots on a large board: stored size against the same rows
+as JSON, the size of a delta after a small edit, and restoring after half the
+board was deleted.
+
+Run with: python -m benchmarks.bench_snapshots [--ideas 50000] [--edited 500]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every model on Base.metadata)
+from app.db import Base, create_db_engine, get_db
+from app.main import app
+from app.models.idea import Idea
+from app.services import snapshot_service
+from benchmarks.synthetic import BoardShape, seed_boards
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ideas", type=int, default=50_000)
+    parser.add_argument("--edited", type=int, default=500)
+    args = parser.parse_args()
+
+    engine = create_db_engine(f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}")
+    Base.metadata.create_all(engine)
+    shape = BoardShape(
+        ideas=args.ideas, groups=20, connections=args.ideas // 2, tags_per_idea=2
+    )
+    (board,), _ = seed_boards(engine, 1, shape)
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    Session = sessionmaker(bind=engine)
+
+    def bench_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def timed(label: str, method: str, url: str, **kwargs) -> dict:
+        statements.clear()
+        started = time.perf_counter()
+        response = client.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - started
+        assert response.status_code == 200, response.text
+        print(f"  {label:<30}{elapsed * 1000:10.1f} ms {len(statements):6d} statements")
+        return response.json()
+
+    app.dependency_overrides[get_db] = bench_db
+    client = TestClient(app)
+    snapshots = f"/boards/{board.id}/snapshots"
+    print(
+        f"snapshots of a board with {args.ideas} ideas, {shape.connections} "
+        f"connections and {shape.tags_per_idea} tags per idea on SQLite"
+    )
+    try:
+        with Session() as db:
+            state = snapshot_service.capture_state(db, board.id)
+        as_json = len(
+            json.dumps(
+                {
+                    "groups": state.groups,
+                    "ideas": state.ideas,
+                    "connections": state.connections,
+                    "tag_links": sorted(state.tag_links),
+                },
+                default=str,
+            ).encode()
+        )
+
+        full = timed("full snapshot", "POST", snapshots, json={})
+        with Session() as db:
+            edited = db.scalars(
+                select(Idea.id).where(Idea.board_id == board.id).limit(args.edited)
+            ).all()
+            db.execute(
+                update(Idea)
+                .where(Idea.id.in_(edited))
+                .values(title=Idea.title + " (edited)", votes=Idea.votes + 1)
+            )
+            db.commit()
+        delta = timed(f"delta after {args.edited} edits", "POST", snapshots, json={})
+
+        with Session() as db:
+            db.execute(delete(Idea).where(Idea.board_id == board.id, Idea.id % 2 == 0))
+            db.commit()
+        restored = timed(
+            "restore after deleting half",
+            "POST",
+            f"{snapshots}/{full['id']}/restore",
+        )
+        print(f"  {'ideas restored':<30}{restored['upserted']['idea']:10d}")
+        print(f"  {'rows as JSON':<30}{as_json / 1024:10.1f} KiB")
+        print(f"  {'full snapshot':<30}{full['size_bytes'] / 1024:10.1f} KiB")
+        print(f"  {'delta snapshot':<30}{delta['size_bytes'] / 1024:10.1f} KiB")
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Measure worker startup: app import time and lifespan cost.
+
+Compares the current boot (no schema work, AI SDK imported lazily) with what
+every worker used to do: import the Anthropic SDK eagerly and run create_all
+plus the seed functions against an already-seeded database.
+
+Run with: python -m benchmarks.bench_startup [--repeats 5]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+IMPORT_SNIPPET = """
+import sys, time
+started = time.perf_counter()
+{imports}
+print(time.perf_counter() - started)
+"""
+
+
+def time_import(imports: str, repeats: int, env: dict) -> float:
+    """Median wall time of importing modules in a fresh interpreter"""
+    timings = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET.format(imports=imports)],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=env,
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def time_call(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    path = Path(tempfile.mkdtemp()) / "bench_startup.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    env = dict(os.environ)
+
+    results = {
+        "import app.main": time_import("import app.main", args.repeats, env),
+        "import app.main + anthropic (old eager import)": time_import(
+            "import app.main, anthropic", args.repeats, env
+        ),
+    }
+
+    # Imported only now so the engine picks up the temporary database
+    from app.cli import migrate
+    from app.db import Base, SessionLocal, engine
+    from app.main import app, lifespan
+    from app.seed import seed_all
+
+    migrate()
+    with SessionLocal() as db:
+        seed_all(db)
+
+    async def run_lifespan():
+        async with lifespan(app):
+            pass
+
+    def old_startup():
+        Base.metadata.create_all(bind=engine)
+        with SessionLocal() as db:
+            seed_all(db)
+
+    results["lifespan"] = time_call(lambda: asyncio.run(run_lifespan()), args.repeats)
+    results["create_all + seed checks (old lifespan)"] = time_call(
+        old_startup, args.repeats
+    )
+
+    print(f"worker startup on SQLite (median of {args.repeats})")
+    for name, seconds in results.items():
+        print(f"  {name:<48}{seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Minimal stand-in for the Anthropic Messages API.
+
+Answers POST /v1/messages after a fixed delay with a tool call or text shaped
+like what each ai_service prompt expects, so AI endpoints can be load tested without network
+access or cost. Point the app at it with ANTHROPIC_BASE_URL.
+
+Run standalone with: python -m benchmarks.fake_anthropic [--port 8090]
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TOOL_ANSWERS = {
+    "summarize_board": {
+        "summary": "A synthetic board used for load testing.",
+        "themes": ["performance", "reliability"],
+        "top_priority": "Idea 0",
+    },
+    "suggest_tags": {"tags": ["performance", "backend"]},
+    "suggest_ideas": {
+        "suggestions": ["Faster boards", "Smarter grouping", "Offline mode"]
+    },
+}
+
+
+def reply_text(prompt: str) -> str:
+    if "Analyze the ideas" in prompt:
+        return (
+            "SUMMARY: A synthetic board used for load testing.\n"
+            "THEMES: performance, reliability\n"
+            "TOP_PRIORITY: Idea 0"
+        )
+    if "Suggest tags" in prompt:
+        return "performance, backend"
+    return "Faster boards\nSmarter grouping\nOffline mode"
+
+
+def prompt_blocks(body: dict) -> list[dict]:
+    """Tools, system and message blocks in the order the API caches them"""
+    system = body.get("system") or []
+    if isinstance(system, str):
+        system = [{"type": "text", "text": system}]
+    blocks = [*body.get("tools", []), *system]
+    for message in body.get("messages", []):
+        content = message["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        blocks += content
+    return blocks
+
+
+def usage(body: dict, cached_prefixes: set[str]) -> dict:
+    """Token usage with prompt caching simulated at 4 characters per token.
+
+    The longest prefix ending in a cache_control block is read from the
+    cache if an earlier request wrote it, and written otherwise.
+    """
+    blocks = prompt_blocks(body)
+    total = sum(len(json.dumps(block)) for block in blocks) // 4
+    breakpoints = [i for i, block in enumerate(blocks) if "cache_control" in block]
+    read = write = 0
+    if breakpoints:
+        prefix = json.dumps(blocks[: breakpoints[-1] + 1])
+        if prefix in cached_prefixes:
+            read = len(prefix) // 4
+        else:
+            cached_prefixes.add(prefix)
+            write = len(prefix) // 4
+    return {
+        "input_tokens": max(total - read - write, 0),
+        "cache_creation_input_tokens": write,
+        "cache_read_input_tokens": read,
+        "output_tokens": 40,
+    }
+
+
+class FakeAnthropicHandler(BaseHTTPRequestHandler):
+    latency_seconds = 0.5
+    cached_prefixes: set[str] = set()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = json.dumps(body.get("messages", []))
+        time.sleep(self.latency_seconds)
+        tool_choice = body.get("tool_choice") or {}
+        if tool_choice.get("type") == "tool":
+            name = tool_choice["name"]
+            content = [
+                {
+                    "type": "tool_use",
+                    "id": "toolu_fake",
+                    "name": name,
+                    "input": TOOL_ANSWERS.get(name, {}),
+                }
+            ]
+        else:
+            content = [{"type": "text", "text": reply_text(prompt)}]
+        payload = json.dumps(
+            {
+                "id": "msg_fake",
+                "type": "message",
+                "role": "assistant",
+                "model": body.get("model", "fake"),
+                "content": content,
+                "stop_reason": "tool_use" if tool_choice else "end_turn",
+                "stop_sequence": None,
+                "usage": usage(body, self.cached_prefixes),
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_anthropic(
+    latency_seconds: float = 0.5, port: int = 0
+) -> ThreadingHTTPServer:
+    """Serve the fake API on a background thread; server.server_port has the port"""
+    handler = type(
+        "Handler",
+        (FakeAnthropicHandler,),
+        {"latency_seconds": latency_seconds, "cached_prefixes": set()},
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+    server = start_fake_anthropic(args.latency, args.port)
+    print(f"fake Anthropic API on http://127.0.0.1:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""Reproducible load test for the API.
+
+Seeds synthetic boards into a fresh database, starts the app under uvicorn
+with AI calls pointed at a fake model server, drives a weighted mix of
+realistic client scenarios from concurrent clients, and writes throughput,
+p50/p99 latency and SQL query counts per endpoint to a JSON file. Passing
+--baseline compares against an earlier run and exits non-zero on regressions.
+
+Run with: python -m benchmarks.load_test --output results.json
+          python -m benchmarks.load_test --baseline results.json
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+from sqlalchemy import create_engine
+
+from benchmarks.fake_anthropic import start_fake_anthropic
+from benchmarks.synthetic import BoardShape, SeededBoard, seed_boards
+
+DEFAULT_MIX = "board_load=30,drag_burst=25,vote=20,tag_filter=20,ai=5"
+DRAG_BURST_MOVES = 10
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    status: int
+    seconds: float
+    queries: int | None
+
+
+class Session:
+    """One simulated client: an HTTP connection, its RNG and its samples"""
+
+    def __init__(self, base_url: str, boards, tag_ids, seed: int):
+        self.http = httpx.Client(base_url=base_url, timeout=60)
+        self.rng = random.Random(seed)
+        self.boards: list[SeededBoard] = boards
+        self.tag_ids: list[int] = tag_ids
+        self.samples: list[Sample] = []
+
+    def call(self, method: str, endpoint: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.http.request(method, url, **kwargs)
+            status = response.status_code
+            match = QUERIES.search(response.headers.get("server-timing", ""))
+        except httpx.HTTPError:
+            status, match = 0, None
+        self.samples.append(
+            Sample(
+                f"{method} {endpoint}",
+                status,
+                time.perf_counter() - started,
+                int(match.group(1)) if match else None,
+            )
+        )
+
+    def board(self) -> SeededBoard:
+        return self.rng.choice(self.boards)
+
+
+def board_load(session: Session):
+    """What the frontend fetches when a board is opened"""
+    board = session.board()
+    session.call("GET", "/boards/{board_id}", f"/boards/{board.id}")
+    session.call("GET", "/ideas", "/ideas", params={"board_id": board.id})
+    session.call("GET", "/groups", "/groups", params={"board_id": board.id})
+    session.call("GET", "/connections", "/connections", params={"board_id": board.id})
+
+
+def drag_burst(session: Session):
+    """Position updates streamed while a note is dragged"""
+    idea_id = session.rng.choice(session.board().idea_ids)
+    x, y = session.rng.uniform(0, 4000), session.rng.uniform(0, 3000)
+    for step in range(DRAG_BURST_MOVES):
+        session.call(
+            "PATCH",
+            "/ideas/{idea_id}/position",
+            f"/ideas/{idea_id}/position",
+            json={"position_x": x + step * 5, "position_y": y + step * 3},
+        )
+
+
+def vote(session: Session):
+    idea_id = session.rng.choice(session.board().idea_ids)
+    session.call("POST", "/ideas/{idea_id}/vote", f"/ideas/{idea_id}/vote")
+
+
+def tag_filter(session: Session):
+    board = session.board()
+    session.call(
+        "GET",
+        "/ideas?tag_ids",
+        "/ideas",
+        params={"board_id": board.id, "tag_ids": session.rng.choice(session.tag_ids)},
+    )
+
+
+def ai(session: Session):
+    board = session.board()
+    if session.rng.random() < 0.5:
+        session.call(
+            "POST", "/ai/summarize", "/ai/summarize", json={"board_id": board.id}
+        )
+    else:
+        session.call(
+            "POST",
+            "/ai/categorize",
+            "/ai/categorize",
+            json={"title": "Cache board reads", "description": "Fewer queries"},
+        )
+
+
+SCENARIOS = {
+    "board_load": board_load,
+    "drag_burst": drag_burst,
+    "vote": vote,
+    "tag_filter": tag_filter,
+    "ai": ai,
+}
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, weight = part.split("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"unknown scenario {name!r}, pick from {list(SCENARIOS)}")
+        weights[name] = float(weight)
+    return weights
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_values) - 1, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: list[Sample], elapsed: float) -> dict:
+    by_endpoint: dict[str, list[Sample]] = {}
+    for sample in samples:
+        by_endpoint.setdefault(sample.endpoint, []).append(sample)
+    by_endpoint["TOTAL"] = samples
+
+    report = {}
+    for endpoint, group in sorted(by_endpoint.items()):
+        latencies = sorted(s.seconds for s in group)
+        queries = [s.queries for s in group if s.queries is not None]
+        report[endpoint] = {
+            "requests": len(group),
+            "errors": sum(1 for s in group if s.status == 0 or s.status >= 500),
+            "throughput_rps": round(len(group) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "queries_mean": round(sum(queries) / len(queries), 2) if queries else None,
+            "queries_max": max(queries) if queries else None,
+        }
+    return report
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Endpoints whose latency, throughput or query count got worse"""
+    regressions = []
+    for endpoint, now in current["endpoints"].items():
+        before = baseline["endpoints"].get(endpoint)
+        if before is None:
+            continue
+        for metric in ("p50_ms", "p99_ms"):
+            if now[metric] > before[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{endpoint}: {metric} {before[metric]} -> {now[metric]}"
+                )
+        if now["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{endpoint}: throughput_rps {before['throughput_rps']} -> "
+                f"{now['throughput_rps']}"
+            )
+        # Query counts are deterministic, so any increase is a regression
+        if (now["queries_max"] or 0) > (before["queries_max"] or 0):
+            regressions.append(
+                f"{endpoint}: queries_max {before['queries_max']} -> {now['queries_max']}"
+            )
+    return regressions
+
+
+def start_server(env: dict, port: int, workers: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.terminate()
+    raise SystemExit("server did not become healthy within 30 s")
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--database-url", help="defaults to a fresh SQLite file")
+    parser.add_argument("--boards", type=int, default=5)
+    parser.add_argument("--ideas", type=int, default=200, help="per board")
+    parser.add_argument("--groups", type=int, default=10, help="per board")
+    parser.add_argument("--connections", type=int, default=100, help="per board")
+    parser.add_argument("--tags", type=int, default=20)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20, help="seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ai-latency", type=float, default=0.5, help="seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=Path("load_test_results.json"))
+    parser.add_argument("--baseline", type=Path, help="earlier --output to compare")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    database_url = args.database_url or (
+        f"sqlite:///{Path(tempfile.mkdtemp()) / 'load_test.db'}"
+    )
+    fake_ai = start_fake_anthropic(args.ai_latency)
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "ANTHROPIC_API_KEY": "load-test",
+        "ANTHROPIC_BASE_URL": f"http://127.0.0.1:{fake_ai.server_port}",
+    }
+    subprocess.run([sys.executable, "-m", "app.cli", "migrate"], env=env, check=True)
+    engine = create_engine(database_url)
+    shape = BoardShape(args.ideas, args.groups, args.connections)
+    boards, tag_ids = seed_boards(engine, args.boards, shape, args.tags, args.seed)
+    engine.dispose()
+
+    server = start_server(env, args.port, args.workers)
+    base_url = f"http://127.0.0.1:{args.port}"
+    sessions = [
+        Session(base_url, boards, tag_ids, seed=args.seed * 1000 + i)
+        for i in range(args.clients)
+    ]
+    names, weights = list(mix), list(mix.values())
+    stop = time.monotonic() + args.duration
+
+    def drive(session: Session):
+        while time.monotonic() < stop:
+            SCENARIOS[session.rng.choices(names, weights)[0]](session)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=drive, args=(s,)) for s in sessions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    server.terminate()
+    server.wait()
+    fake_ai.shutdown()
+
+    results = {
+        "meta": {
+            "git_revision": git_revision(),
+            "database": database_url.split(":", 1)[0],
+            "boards": args.boards,
+            "shape": vars(shape),
+            "tags": args.tags,
+            "clients": args.clients,
+            "workers": args.workers,
+            "duration_seconds": round(elapsed, 2),
+            "mix": mix,
+            "ai_latency_seconds": args.ai_latency,
+            "seed": args.seed,
+        },
+        "endpoints": summarize([s for x in sessions for s in x.samples], elapsed),
+    }
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    print(
+        f"{'endpoint':<34}{'req':>7}{'err':>5}{'rps':>9}{'p50 ms':>9}"
+        f"{'p99 ms':>9}{'queries':>9}"
+    )
+    for endpoint, row in results["endpoints"].items():
+        print(
+            f"{endpoint:<34}{row['requests']:>7}{row['errors']:>5}"
+            f"{row['throughput_rps']:>9.1f}{row['p50_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+            f"{row['queries_mean'] if row['queries_mean'] is not None else '-':>9}"
+        )
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(
+            results, json.loads(args.baseline.read_text()), args.tolerance
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
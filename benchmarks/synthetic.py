@@ -0,0 +1,117 @@
+"""Seed synthetic boards for benchmarks and load tests"""
+
+import random
+from dataclasses import dataclass, field
+
+from sqlalchemy import Engine, insert, select
+
+from app.models.board import Board
+from app.models.connection import IdeaConnection
+from app.models.group import IdeaGroup
+from app.models.idea import Idea
+from app.models.tag import Tag, idea_tags
+
+
+@dataclass
+class BoardShape:
+    ideas: int = 200
+    groups: int = 10
+    connections: int = 100
+    tags_per_idea: int = 2
+
+
+@dataclass
+class SeededBoard:
+    id: int
+    idea_ids: list[int] = field(default_factory=list)
+    group_ids: list[int] = field(default_factory=list)
+
+
+def seed_boards(
+    engine: Engine,
+    boards: int,
+    shape: BoardShape,
+    tags: int = 20,
+    seed: int = 0,
+) -> tuple[list[SeededBoard], list[int]]:
+    """Insert boards of the given shape in bulk; returns the boards and tag ids.
+
+    Deterministic for a given seed, so runs against fresh databases compare.
+    """
+    rng = random.Random(seed)
+    seeded = []
+    with engine.begin() as connection:
+        tag_ids = list(
+            connection.scalars(
+                insert(Tag).returning(Tag.id),
+                [{"name": f"synthetic-{seed}-{i}"} for i in range(tags)],
+            )
+        )
+        for b in range(boards):
+            board_id = connection.scalar(
+                insert(Board).values(name=f"Synthetic board {b}").returning(Board.id)
+            )
+            board = SeededBoard(board_id)
+            board.group_ids = (
+                list(
+                    connection.scalars(
+                        insert(IdeaGroup).returning(IdeaGroup.id),
+                        [
+                            {
+                                "name": f"Group {g}",
+                                "board_id": board_id,
+                                "position_x": (g % 5) * 900.0,
+                                "position_y": (g // 5) * 700.0,
+                            }
+                            for g in range(shape.groups)
+                        ],
+                    )
+                )
+                if shape.groups
+                else []
+            )
+            connection.execute(
+                insert(Idea),
+                [
+                    {
+                        "title": f"Idea {i}",
+                        "description": "Synthetic idea for load testing",
+                        "position_x": rng.uniform(0, 4000),
+                        "position_y": rng.uniform(0, 3000),
+                        "votes": rng.randint(0, 20),
+                        "board_id": board_id,
+                        "group_id": (
+                            rng.choice(board.group_ids)
+                            if board.group_ids and rng.random() < 0.5
+                            else None
+                        ),
+                    }
+                    for i in range(shape.ideas)
+                ],
+            )
+            board.idea_ids = list(
+                connection.scalars(
+                    select(Idea.id).where(Idea.board_id == board_id).order_by(Idea.id)
+                )
+            )
+            links = {
+                (idea_id, tag_id)
+                for idea_id in board.idea_ids
+                for tag_id in rng.sample(tag_ids, min(shape.tags_per_idea, tags))
+            }
+            if links:
+                connection.execute(
+                    insert(idea_tags),
+                    [{"idea_id": i, "tag_id": t} for i, t in sorted(links)],
+                )
+            pairs = set()
+            while len(board.idea_ids) > 1 and len(pairs) < shape.connections:
+                source, target = rng.sample(board.idea_ids, 2)
+                pairs.add((source, target))
+            if pairs:
+                connection.execute(
+                    insert(IdeaConnection),
+                    [{"source_id": s, "target_id": t} for s, t in sorted(pairs)],
+                )
+            seeded.append(board)
+    return seeded, tag_ids
@@ -0,0 +1,148 @@
+"""Initial schema, matching what create_all produced before migrations
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: str | Sequence[str] | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "boards",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("description", sa.String(length=500), nullable=True),
+        sa.Column("color", sa.String(length=20), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=True
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_boards_id", "boards", ["id"], unique=False)
+
+    op.create_table(
+        "items",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_items_id", "items", ["id"], unique=False)
+
+    op.create_table(
+        "tags",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.Column("color", sa.String(length=20), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_index("ix_tags_id", "tags", ["id"], unique=False)
+
+    op.create_table(
+        "idea_groups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("color", sa.String(length=20), nullable=True),
+        sa.Column("board_id", sa.Integer(), nullable=True),
+        sa.Column("position_x", sa.Float(), nullable=True),
+        sa.Column("position_y", sa.Float(), nullable=True),
+        sa.Column("width", sa.Float(), nullable=True),
+        sa.Column("height", sa.Float(), nullable=True),
+        sa.Column("is_collapsed", sa.Boolean(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True
+        ),
+        sa.ForeignKeyConstraint(["board_id"], ["boards.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_idea_groups_id", "idea_groups", ["id"], unique=False)
+
+    op.create_table(
+        "ideas",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=100), nullable=False),
+        sa.Column("description", sa.String(length=500), nullable=True),
+        sa.Column("color", sa.String(length=20), nullable=True),
+        sa.Column("position_x", sa.Float(), nullable=True),
+        sa.Column("position_y", sa.Float(), nullable=True),
+        sa.Column("width", sa.Float(), nullable=True),
+        sa.Column("height", sa.Float(), nullable=True),
+        sa.Column("rotation", sa.Float(), nullable=True),
+        sa.Column("votes", sa.Integer(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True
+        ),
+        sa.Column("board_id", sa.Integer(), nullable=True),
+        sa.Column("group_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["board_id"],
+            ["boards.id"],
+        ),
+        sa.ForeignKeyConstraint(["group_id"], ["idea_groups.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_ideas_id", "ideas", ["id"], unique=False)
+
+    op.create_table(
+        "idea_connections",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("source_id", sa.Integer(), nullable=False),
+        sa.Column("target_id", sa.Integer(), nullable=False),
+        sa.Column("label", sa.String(length=50), nullable=True),
+        sa.Column("connection_type", sa.String(length=20), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True
+        ),
+        sa.CheckConstraint("source_id != target_id", name="check_no_self_connection"),
+        sa.ForeignKeyConstraint(["source_id"], ["ideas.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["target_id"], ["ideas.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_idea_connections_id", "idea_connections", ["id"], unique=False)
+
+    op.create_table(
+        "idea_tags",
+        sa.Column("idea_id", sa.Integer(), nullable=False),
+        sa.Column("tag_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["idea_id"], ["ideas.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["tag_id"], ["tags.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("idea_id", "tag_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("idea_tags")
+    op.drop_index("ix_idea_connections_id", table_name="idea_connections")
+    op.drop_table("idea_connections")
+    op.drop_index("ix_ideas_id", table_name="ideas")
+    op.drop_table("ideas")
+    op.drop_index("ix_idea_groups_id", table_name="idea_groups")
+    op.drop_table("idea_groups")
+    op.drop_index("ix_tags_id", table_name="tags")
+    op.drop_table("tags")
+    op.drop_index("ix_items_id", table_name="items")
+    op.drop_table("items")
+    op.drop_index("ix_boards_id", table_name="boards")
+    op.drop_table("boards")
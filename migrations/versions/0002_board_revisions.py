@@ -0,0 +1,63 @@
+"""Board revision counters and change log
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: str | Sequence[str] | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("boards") as batch_op:
+        batch_op.add_column(
+            sa.Column("revision", sa.Integer(), server_default="0", nullable=False)
+        )
+        batch_op.add_column(
+            sa.Column(
+                "compacted_revision", sa.Integer(), server_default="0", nullable=False
+            )
+        )
+
+    op.create_table(
+        "board_changes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("board_id", sa.Integer(), nullable=False),
+        sa.Column("revision", sa.Integer(), nullable=False),
+        sa.Column("entity_type", sa.String(length=20), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("operation", sa.String(length=10), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True
+        ),
+        sa.ForeignKeyConstraint(["board_id"], ["boards.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_board_changes_id", "board_changes", ["id"], unique=False)
+    op.create_index(
+        "ix_board_changes_board_revision",
+        "board_changes",
+        ["board_id", "revision"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_board_changes_board_revision", table_name="board_changes")
+    op.drop_index("ix_board_changes_id", table_name="board_changes")
+    op.drop_table("board_changes")
+    with op.batch_alter_table("boards") as batch_op:
+        batch_op.drop_column("compacted_revision")
+        batch_op.drop_column("revision")
@@ -0,0 +1,55 @@
+"""Cascade board deletes to ideas and index foreign keys
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: str | Sequence[str] | None = "0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Cascades look child rows up by these columns; without indexes every deleted
+# parent row means a scan of the child table
+FOREIGN_KEY_INDEXES = [
+    ("ix_ideas_board_id", "ideas", "board_id"),
+    ("ix_ideas_group_id", "ideas", "group_id"),
+    ("ix_idea_groups_board_id", "idea_groups", "board_id"),
+    ("ix_idea_connections_source_id", "idea_connections", "source_id"),
+    ("ix_idea_connections_target_id", "idea_connections", "target_id"),
+    ("ix_idea_tags_tag_id", "idea_tags", "tag_id"),
+]
+
+# The initial schema left this constraint unnamed; Postgres named it by its
+# default convention, and SQLite batch mode gets the same name applied
+BOARD_FK = "ideas_board_id_fkey"
+NAMING_CONVENTION = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+
+def _replace_board_fk(ondelete: str | None):
+    with op.batch_alter_table("ideas", naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(BOARD_FK, type_="foreignkey")
+        batch_op.create_foreign_key(
+            BOARD_FK, "boards", ["board_id"], ["id"], ondelete=ondelete
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _replace_board_fk("CASCADE")
+    for name, table, column in FOREIGN_KEY_INDEXES:
+        op.create_index(name, table, [column], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(FOREIGN_KEY_INDEXES):
+        op.drop_index(name, table_name=table)
+    _replace_board_fk(None)
@@ -0,0 +1,42 @@
+"""Stored board summaries
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: str | Sequence[str] | None = "0005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "board_summaries",
+        sa.Column("board_id", sa.Integer(), nullable=False),
+        sa.Column("summary", sa.Text(), nullable=False),
+        sa.Column("themes", sa.JSON(), nullable=False),
+        sa.Column("top_priority", sa.String(length=200), nullable=True),
+        sa.Column("generated_at", sa.DateTime(), nullable=False),
+        sa.Column("pending_edits", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("pending_votes", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("first_change_at", sa.DateTime(), nullable=True),
+        sa.Column("last_change_at", sa.DateTime(), nullable=True),
+        sa.Column("refresh_job_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["board_id"], ["boards.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("board_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("board_summaries")
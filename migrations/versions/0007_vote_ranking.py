@@ -0,0 +1,55 @@
+"""Vote ranking index and per-minute vote counts
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: str | Sequence[str] | None = "0006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_ideas_board_votes",
+        "ideas",
+        ["board_id", sa.text("votes DESC")],
+        unique=False,
+    )
+    op.create_table(
+        "idea_vote_counts",
+        sa.Column("idea_id", sa.Integer(), nullable=False),
+        sa.Column("minute", sa.Integer(), nullable=False),
+        sa.Column("board_id", sa.Integer(), nullable=True),
+        sa.Column("votes", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["board_id"], ["boards.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["idea_id"], ["ideas.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("idea_id", "minute"),
+    )
+    op.create_index(
+        "ix_idea_vote_counts_board_minute",
+        "idea_vote_counts",
+        ["board_id", "minute"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_idea_vote_counts_minute", "idea_vote_counts", ["minute"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_idea_vote_counts_minute", table_name="idea_vote_counts")
+    op.drop_index("ix_idea_vote_counts_board_minute", table_name="idea_vote_counts")
+    op.drop_table("idea_vote_counts")
+    op.drop_index("ix_ideas_board_votes", table_name="ideas")
@@ -0,0 +1,43 @@
+"""Track which idea or group a cloned one was copied from
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: str | Sequence[str] | None = "0007"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("ideas", sa.Column("cloned_from_id", sa.Integer(), nullable=True))
+    op.add_column(
+        "idea_groups", sa.Column("cloned_from_id", sa.Integer(), nullable=True)
+    )
+    op.create_index(
+        "ix_ideas_cloned_from",
+        "ideas",
+        ["cloned_from_id", "board_id"],
+        unique=False,
+        sqlite_where=sa.text("cloned_from_id IS NOT NULL"),
+        postgresql_where=sa.text("cloned_from_id IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_ideas_cloned_from", table_name="ideas")
+    with op.batch_alter_table("idea_groups") as batch_op:
+        batch_op.drop_column("cloned_from_id")
+    with op.batch_alter_table("ideas") as batch_op:
+        batch_op.drop_column("cloned_from_id")
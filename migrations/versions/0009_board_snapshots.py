@@ -0,0 +1,61 @@
+"""Board history snapshots
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: str | Sequence[str] | None = "0008"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "board_snapshots",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("board_id", sa.Integer(), nullable=False),
+        sa.Column("base_id", sa.Integer(), nullable=True),
+        sa.Column("depth", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("revision", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("label", sa.String(length=100), nullable=True),
+        sa.Column("idea_count", sa.Integer(), nullable=False),
+        sa.Column("group_count", sa.Integer(), nullable=False),
+        sa.Column("connection_count", sa.Integer(), nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True
+        ),
+        sa.ForeignKeyConstraint(
+            ["base_id"], ["board_snapshots.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["board_id"], ["boards.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_board_snapshots_board_id",
+        "board_snapshots",
+        ["board_id", "id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_board_snapshots_id"), "board_snapshots", ["id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_board_snapshots_id"), table_name="board_snapshots")
+    op.drop_index("ix_board_snapshots_board_id", table_name="board_snapshots")
+    op.drop_table("board_snapshots")
@@ -0,0 +1,43 @@
+"""Track each board's snapshotted revision
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: str | Sequence[str] | None = "0010"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("boards") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "snapshot_revision", sa.Integer(), server_default="0", nullable=False
+            )
+        )
+    op.execute(
+        """
+        UPDATE boards SET snapshot_revision = COALESCE(
+            (SELECT MAX(revision) FROM board_snapshots
+             WHERE board_snapshots.board_id = boards.id),
+            0
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("boards") as batch_op:
+        batch_op.drop_column("snapshot_revision")
@@ -0,0 +1,81 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.cache import clear_caches
+from app.db import Base, get_db
+from app.main import app
+from app.metrics import instrument_engine
+from app.rate_limit import clear_rate_limits
+from benchmarks.fake_anthropic import start_fake_anthropic
+
+pytest_plugins = ["tests.query_budget"]
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+instrument_engine(engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@event.listens_for(engine, "connect")
+def enable_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    clear_caches()
+    clear_rate_limits()
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def client(db):
+    def override_get_db():
+        session = TestingSessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def queries():
+    """Collect every SQL statement executed against the test database"""
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture(scope="session")
+def fake_model():
+    """Base URL of a local stand-in for the Anthropic API"""
+    server = start_fake_anthropic(latency_seconds=0)
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
@@ -0,0 +1,50 @@
+"""Pytest plugin enforcing per-endpoint SQL statement budgets.
+
+Mark a test with @pytest.mark.query_budget(n, route="GET /boards/{board_id}")
+and it fails if any request to that route (method optional, path as the route
+template) runs more than n statements. Without route every request counts.
+"""
+
+import pytest
+
+from app.metrics import request_observers
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(max_queries, route=None): fail when a request to route "
+        "executes more than max_queries SQL statements",
+    )
+
+
+def _matches(route: str | None, method: str, path: str) -> bool:
+    return route is None or route in (path, f"{method} {path}")
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+
+    budget = marker.args[0]
+    route = marker.kwargs.get("route")
+    checked: list[tuple[str, str, int]] = []
+
+    def observe(method, path, stats):
+        if _matches(route, method, path):
+            checked.append((method, path, stats.queries))
+
+    request_observers.append(observe)
+    try:
+        result = yield
+    finally:
+        request_observers.remove(observe)
+
+    if not checked:
+        pytest.fail(f"query_budget: no request matched {route!r}")
+    over = [f"{m} {p}: {n} queries" for m, p, n in checked if n > budget]
+    if over:
+        pytest.fail(f"query budget of {budget} exceeded: " + "; ".join(over))
+    return result
@@ -0,0 +1,188 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.models.ai_job import AIJob
+from app.models.board_summary import BoardSummary
+from app.services import ai_job_service, ai_service
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def ai_configured(monkeypatch, fake_model):
+    monkeypatch.setattr(settings, "anthropic_api_key", "test")
+    monkeypatch.setattr(settings, "anthropic_base_url", fake_model)
+    monkeypatch.setattr(ai_job_service, "SessionLocal", TestingSessionLocal)
+
+
+@pytest.fixture
+def board_id(client):
+    board_id = client.post("/boards", json={"name": "Roadmap"}).json()["id"]
+    client.post("/ideas", json={"title": "Offline mode", "board_id": board_id})
+    return board_id
+
+
+def test_job_runs_in_background_and_result_is_stored(client, board_id):
+    created = client.post("/ai/jobs", json={"kind": "summarize", "board_id": board_id})
+    assert created.status_code == 202
+    assert created.json()["status"] == "queued"
+
+    assert ai_job_service.process_next_job()
+    assert not ai_job_service.process_next_job()
+
+    job = client.get(f"/ai/jobs/{created.json()['id']}").json()
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 1
+    assert job["result"]["themes"] == ["performance", "reliability"]
+
+
+def test_failed_job_is_retried_then_pushed(client, board_id, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("model overloaded")
+
+    pushed = []
+    monkeypatch.setattr(ai_service, "get_idea_suggestions", broken)
+    monkeypatch.setattr(
+        ai_job_service, "send_callback", lambda url, job: pushed.append(job["status"])
+    )
+    job_id = client.post(
+        "/ai/jobs",
+        json={
+            "kind": "suggest",
+            "board_id": board_id,
+            "callback_url": "http://example.test/hook",
+        },
+    ).json()["id"]
+
+    while ai_job_service.process_next_job():
+        pass
+
+    job = client.get(f"/ai/jobs/{job_id}").json()
+    assert job["status"] == "failed"
+    assert job["attempts"] == settings.ai_job_max_attempts
+    assert "model overloaded" in job["error"]
+    # Only the final outcome is pushed, not the retries
+    assert pushed == ["failed"]
+
+
+def test_job_for_missing_board_is_rejected(client):
+    response = client.post("/ai/jobs", json={"kind": "summarize", "board_id": 999})
+    assert response.status_code == 404
+    assert client.post("/ai/jobs", json={"kind": "categorize"}).status_code == 422
+
+
+def test_jobs_abandoned_by_a_dead_worker_are_requeued(db):
+    started = datetime.now() - timedelta(seconds=settings.ai_job_timeout_seconds + 60)
+    db.add(AIJob(kind="categorize", status="running", payload={}, started_at=started))
+    db.commit()
+
+    assert ai_job_service.requeue_stale_jobs(db) == 1
+    assert db.query(AIJob).one().status == "queued"
+
+
+def test_stale_jobs_out_of_attempts_are_failed(db):
+    started = datetime.now() - timedelta(seconds=settings.ai_job_timeout_seconds + 60)
+    db.add(
+        AIJob(
+            kind="categorize",
+            status="running",
+            payload={},
+            started_at=started,
+            attempts=settings.ai_job_max_attempts,
+        )
+    )
+    db.commit()
+
+    assert ai_job_service.requeue_stale_jobs(db) == 0
+    job = db.query(AIJob).one()
+    assert job.status == "failed"
+    assert job.finished_at is not None
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "not a url",
+        "ftp://example.com/hook",
+        "http://localhost:8000/hook",
+        "http://127.0.0.1/hook",
+        "http://10.0.0.5/hook",
+        "http://169.254.169.254/latest/meta-data",
+        "http://[::1]/hook",
+    ],
+)
+def test_callback_url_must_be_a_public_http_url(client, board_id, url):
+    response = client.post(
+        "/ai/jobs", json={"kind": "suggest", "board_id": board_id, "callback_url": url}
+    )
+    assert response.status_code == 422
+
+
+def test_callback_allowlist_replaces_the_public_host_check(
+    client, board_id, monkeypatch
+):
+    monkeypatch.setattr(settings, "ai_job_callback_allowed_hosts", ["hooks.internal"])
+    job = {"kind": "suggest", "board_id": board_id}
+    allowed = {**job, "callback_url": "http://hooks.internal/done"}
+    elsewhere = {**job, "callback_url": "https://example.com/done"}
+    assert client.post("/ai/jobs", json=allowed).status_code == 202
+    assert client.post("/ai/jobs", json=elsewhere).status_code == 422
+
+
+def test_callbacks_to_internal_or_invalid_urls_are_not_sent(monkeypatch):
+    sent = []
+    monkeypatch.setattr(ai_job_service.httpx, "post", lambda *a, **k: sent.append(a))
+    monkeypatch.setattr(
+        ai_job_service.socket,
+        "getaddrinfo",
+        lambda host, port: [(None, None, None, "", ("10.1.2.3", 0))],
+    )
+    job = {
+        "id": 1,
+        "kind": "suggest",
+        "status": "succeeded",
+        "board_id": None,
+        "result": None,
+        "error": None,
+        "attempts": 1,
+        "created_at": datetime.now(),
+        "started_at": None,
+        "finished_at": None,
+    }
+    # A public-looking name that now resolves to a private address
+    ai_job_service.send_callback("http://hooks.example.com/done", job)
+    # Stored before validation existed; must not take the worker down
+    ai_job_service.send_callback("http://[::1", job)
+    assert sent == []
+
+
+def test_job_deleted_with_its_board_mid_run_is_dropped(client, board_id, monkeypatch):
+    pushed = []
+    monkeypatch.setattr(
+        ai_job_service, "send_callback", lambda url, job: pushed.append(job)
+    )
+    summarize_board = ai_service.summarize_board
+
+    def board_deleted_meanwhile(*args):
+        client.delete(f"/boards/{board_id}")
+        return summarize_board(*args)
+
+    monkeypatch.setattr(ai_service, "summarize_board", board_deleted_meanwhile)
+    client.post(
+        "/ai/jobs",
+        json={
+            "kind": "summarize",
+            "board_id": board_id,
+            "callback_url": "http://example.test/hook",
+        },
+    )
+
+    assert ai_job_service.process_next_job()
+    db = TestingSessionLocal()
+    try:
+        assert db.query(AIJob).count() == 0
+        assert db.query(BoardSummary).count() == 0
+    finally:
+        db.close()
+    assert pushed == []
@@ -0,0 +1,114 @@
+import json
+from pathlib import Path
+
+import pytest
+from anthropic.types import Message
+
+from app.config import settings
+from app.services import ai_service
+
+FIXTURES = Path(__file__).parent / "fixtures" / "anthropic"
+
+
+class RecordedClient:
+    """Replays recorded Messages API responses in order, keeping the requests"""
+
+    def __init__(self, *names: str):
+        self.responses = [
+            Message.model_validate(json.loads((FIXTURES / f"{name}.json").read_text()))
+            for name in names
+        ]
+        self.requests: list[dict] = []
+        self.messages = self
+
+    def create(self, **request):
+        self.requests.append(request)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def replay(monkeypatch):
+    def install(*names: str) -> RecordedClient:
+        client = RecordedClient(*names)
+        monkeypatch.setattr(ai_service, "get_client", lambda: client)
+        return client
+
+    return install
+
+
+def test_summary_comes_from_a_forced_tool_call(replay):
+    client = replay("summarize_board")
+    result = ai_service.summarize_board("Offline", [{"title": "Offline mode"}])
+
+    assert result["themes"] == ["offline", "sync", "mobile"]
+    assert result["top_priority"] == "Offline mode"
+    assert client.requests[0]["tool_choice"] == {
+        "type": "tool",
+        "name": "summarize_board",
+    }
+
+
+def test_stable_prompt_parts_are_cached_prefixes(replay):
+    client = replay("summarize_board", "suggest_ideas")
+    ideas = [{"title": "Offline mode", "votes": 3}]
+    ai_service.summarize_board("Offline", ideas)
+    ai_service.get_idea_suggestions("Offline", ideas)
+
+    summarize, suggest = client.requests
+    # Same tools and system prompt, so both calls share one cached prefix
+    assert summarize["tools"] == suggest["tools"]
+    assert summarize["system"][-1]["cache_control"] == {"type": "ephemeral"}
+    # Board content is cached; votes and the per-call instruction come after it
+    board, votes, task = summarize["messages"][0]["content"]
+    assert "cache_control" in board
+    assert "cache_control" not in votes and "cache_control" not in task
+    assert "3 votes" in votes["text"] and "votes" not in board["text"]
+    assert board == suggest["messages"][0]["content"][0]
+
+
+def test_ideas_without_votes_get_no_vote_counts(replay):
+    client = replay("suggest_ideas")
+    ai_service.get_idea_suggestions("Offline", [{"title": "Offline mode"}])
+
+    board, task = client.requests[0]["messages"][0]["content"]
+    assert "votes" not in board["text"]
+
+
+def test_cache_token_usage_is_counted(replay, client):
+    replay("suggest_tags")
+    ai_service.auto_categorize_idea("Sync", None, ["offline"])
+
+    metrics = client.get("/metrics").text
+    assert 'ai_tokens_total{tool="suggest_tags",kind="cache_write"}' in metrics
+    assert 'ai_tokens_total{tool="suggest_tags",kind="cache_read"}' in metrics
+
+
+def test_suggestions_and_tags_are_cleaned_up(replay):
+    replay("suggest_ideas", "suggest_tags")
+
+    assert ai_service.get_idea_suggestions("Offline", []) == [
+        "Conflict-free sync",
+        "Offline search",
+        "Queue uploads on Wi-Fi",
+    ]
+    assert ai_service.auto_categorize_idea("Sync", None, []) == ["offline", "sync"]
+
+
+def test_invalid_answer_is_retried_once(replay):
+    client = replay("summarize_board_invalid", "summarize_board")
+    invalid_before = ai_service.output_stats.invalid.get("summarize_board", 0)
+
+    result = ai_service.summarize_board("Offline", [{"title": "Offline mode"}])
+
+    assert result["top_priority"] == "Offline mode"
+    assert len(client.requests) == 2
+    assert ai_service.output_stats.invalid["summarize_board"] == invalid_before + 1
+
+
+def test_retry_budget_is_bounded(replay, monkeypatch):
+    monkeypatch.setattr(settings, "ai_output_max_attempts", 2)
+    client = replay("summarize_board_invalid", "summarize_board_invalid")
+
+    with pytest.raises(ai_service.AIOutputError):
+        ai_service.summarize_board("Offline", [{"title": "Offline mode"}])
+    assert len(client.requests) == 2
@@ -0,0 +1,119 @@
+import pytest
+
+from app.services.clustering_service import propose_groups
+
+
+def make_ideas(client, board_id, ideas):
+    return [
+        client.post(
+            "/ideas",
+            json={"board_id": board_id, "width": 200, "height": 150, **idea},
+        ).json()["id"]
+        for idea in ideas
+    ]
+
+
+@pytest.fixture
+def board(client):
+    board = client.post("/boards", json={"name": "Retro"}).json()
+    billing = make_ideas(
+        client,
+        board["id"],
+        [
+            {"title": f"Invoice export {i}", "position_x": i * 30, "position_y": 0}
+            for i in range(4)
+        ],
+    )
+    mobile = make_ideas(
+        client,
+        board["id"],
+        [
+            {
+                "title": f"Mobile dark mode {i}",
+                "position_x": 2000 + i * 30,
+                "position_y": 1500,
+            }
+            for i in range(4)
+        ],
+    )
+    return {"id": board["id"], "billing": billing, "mobile": mobile}
+
+
+def test_propose_groups_by_text_alone():
+    ideas = [
+        {
+            "id": i,
+            "title": "Invoice totals" if i < 5 else "Offline sync",
+            "description": None,
+            "position_x": (i % 5) * 50.0,
+            "position_y": 0.0,
+            "width": 100.0,
+            "height": 100.0,
+        }
+        for i in range(10)
+    ]
+    # Both topics are spread over the same spot, so only the text can tell
+    groups = propose_groups(ideas, k=2, position_weight=0)
+    assert sorted(sorted(g.idea_ids) for g in groups) == [
+        [0, 1, 2, 3, 4],
+        [5, 6, 7, 8, 9],
+    ]
+    names = {g.name for g in groups}
+    assert any("invoice" in name.lower() for name in names)
+    # Rectangles cover their members, padded
+    for group in groups:
+        assert group.position_x == -40
+        assert group.width == 200 + 100 + 80
+
+
+def test_propose_groups_drops_small_clusters():
+    ideas = [
+        {
+            "id": 1,
+            "title": "Lonely",
+            "position_x": 0,
+            "position_y": 0,
+            "width": 1,
+            "height": 1,
+        }
+    ]
+    assert propose_groups(ideas) == []
+
+
+def test_auto_group_proposes_without_writing(client, board):
+    response = client.post(f"/boards/{board['id']}/auto-group", json={"k": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["applied"] is False
+    assert sorted(sorted(g["idea_ids"]) for g in body["groups"]) == sorted(
+        [board["billing"], board["mobile"]]
+    )
+    assert all(g["id"] is None for g in body["groups"])
+    assert client.get(f"/groups?board_id={board['id']}").json() == []
+
+
+def test_auto_group_applies_in_one_transaction(client, board):
+    revision = client.get(f"/boards/{board['id']}").json()["revision"]
+    body = client.post(
+        f"/boards/{board['id']}/auto-group", json={"k": 2, "apply": True}
+    ).json()
+    assert body["applied"] is True
+
+    stored = {g["id"]: g for g in client.get(f"/groups?board_id={board['id']}").json()}
+    assert len(stored) == 2
+    for group in body["groups"]:
+        assert sorted(stored[group["id"]]["idea_ids"]) == sorted(group["idea_ids"])
+        assert stored[group["id"]]["width"] == group["width"]
+
+    changes = client.get(
+        f"/boards/{board['id']}/changes", params={"since": revision}
+    ).json()
+    assert changes["revision"] > revision
+
+    # Everything is grouped now, so there is nothing left to propose
+    again = client.post(f"/boards/{board['id']}/auto-group", json={"apply": True})
+    assert again.json() == {"groups": [], "applied": False}
+
+
+def test_auto_group_missing_board(client):
+    assert client.post("/boards/999/auto-group", json={}).status_code == 404
@@ -0,0 +1,55 @@
+import time
+
+from app.cache import TTLCache, apply_remote_invalidation, set_invalidation_publisher
+
+
+def test_lru_eviction_and_hit_counters():
+    cache = TTLCache("test-lru", max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == (True, 1)
+    cache.set("c", 3)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache("test-ttl", max_entries=10, ttl_seconds=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") == (False, None)
+    assert cache.stats()["expirations"] == 1
+
+
+def test_invalidation_is_published_and_applied_remotely():
+    published = []
+    cache = TTLCache("test-shared", max_entries=10, ttl_seconds=60)
+    cache.set("a", 1)
+    set_invalidation_publisher(lambda name, key: published.append((name, key)))
+    try:
+        cache.invalidate("a")
+    finally:
+        set_invalidation_publisher(None)
+    assert published == [("test-shared", "a")]
+
+    cache.set("b", 2)
+    apply_remote_invalidation("test-shared", "b")
+    assert cache.get("b") == (False, None)
+
+
+def test_tag_list_is_served_from_cache_until_invalidated(client, db, queries):
+    client.post("/tags", json={"name": "ai"})
+    assert [tag["name"] for tag in client.get("/tags").json()] == ["ai"]
+
+    queries.clear()
+    client.get("/tags")
+    assert not any("FROM tags ORDER BY" in statement for statement in queries)
+
+    client.post("/tags", json={"name": "backend"})
+    assert [tag["name"] for tag in client.get("/tags").json()] == ["ai", "backend"]
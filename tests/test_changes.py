@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+from app.models.board import Board
+from app.models.change import BoardChange
+from app.services.revision_service import compact_change_log
+
+
+def create_board(db) -> Board:
+    board = Board(name="Planning")
+    db.add(board)
+    db.commit()
+    db.refresh(board)
+    return board
+
+
+def test_changes_since_returns_only_what_changed(client, db):
+    board = create_board(db)
+    tag = client.post("/tags", json={"name": "ux"}).json()
+    first = client.post("/ideas", json={"title": "Kept", "board_id": board.id}).json()
+    second = client.post("/ideas", json={"title": "Gone", "board_id": board.id}).json()
+    client.post(
+        "/connections", json={"source_id": first["id"], "target_id": second["id"]}
+    )
+    since = client.get(f"/boards/{board.id}").json()["revision"]
+
+    client.patch(
+        f"/ideas/{first['id']}/position", json={"position_x": 5, "position_y": 6}
+    )
+    client.patch(f"/ideas/{first['id']}/tags", json={"tag_ids": [tag["id"]]})
+    group = client.post(
+        "/groups",
+        json={"name": "Keep", "board_id": board.id, "idea_ids": [first["id"]]},
+    ).json()
+    client.delete(f"/ideas/{second['id']}")
+
+    changes = client.get(f"/boards/{board.id}/changes?since={since}").json()
+
+    assert changes["revision"] == since + 4
+    assert changes["full_resync"] is False
+    assert [idea["id"] for idea in changes["ideas"]] == [first["id"]]
+    assert changes["ideas"][0]["group_id"] == group["id"]
+    assert [g["id"] for g in changes["groups"]] == [group["id"]]
+    assert changes["connections"] == []
+    assert changes["idea_tags"] == [{"idea_id": first["id"], "tag_ids": [tag["id"]]}]
+    assert changes["deleted"]["ideas"] == [second["id"]]
+    assert len(changes["deleted"]["connections"]) == 1
+
+
+def test_deleting_an_idea_tombstones_connections_on_their_own_board(client, db):
+    board, other = create_board(db), create_board(db)
+    target = client.post("/ideas", json={"title": "Target", "board_id": board.id})
+    source = client.post("/ideas", json={"title": "Source", "board_id": other.id})
+    connection = client.post(
+        "/connections",
+        json={"source_id": source.json()["id"], "target_id": target.json()["id"]},
+    ).json()
+    since = client.get(f"/boards/{other.id}").json()["revision"]
+    etag = client.get(f"/boards/{other.id}").headers["etag"]
+
+    client.delete(f"/ideas/{target.json()['id']}")
+
+    changes = client.get(f"/boards/{other.id}/changes?since={since}").json()
+    assert changes["revision"] == since + 1
+    assert changes["deleted"]["connections"] == [connection["id"]]
+    assert client.get(f"/boards/{other.id}").headers["etag"] != etag
+    own = client.get(f"/boards/{board.id}/changes?since=0").json()
+    assert own["deleted"]["ideas"] == [target.json()["id"]]
+    assert own["deleted"]["connections"] == []
+
+
+def test_changes_at_current_revision_are_empty(client, db):
+    board = create_board(db)
+    client.post("/ideas", json={"title": "One", "board_id": board.id})
+
+    changes = client.get(f"/boards/{board.id}/changes?since=1").json()
+
+    assert changes["ideas"] == []
+    assert changes["deleted"] == {"ideas": [], "groups": [], "connections": []}
+
+
+def test_moving_ideas_between_groups_reports_both_groups(client, db):
+    board = create_board(db)
+    other = client.post("/boards", json={"name": "Other"}).json()
+    idea = client.post("/ideas", json={"title": "Mover", "board_id": board.id}).json()
+    stranger = client.post(
+        "/ideas", json={"title": "Elsewhere", "board_id": other["id"]}
+    ).json()
+    old = client.post(
+        "/groups", json={"name": "Old", "board_id": board.id, "idea_ids": [idea["id"]]}
+    ).json()
+    new = client.post("/groups", json={"name": "New", "board_id": board.id}).json()
+    since = client.get(f"/boards/{board.id}").json()["revision"]
+
+    response = client.post(
+        f"/groups/{new['id']}/ideas", json={"idea_ids": [idea["id"], stranger["id"]]}
+    )
+    # Ideas on another board can't be pulled in
+    assert response.json()["idea_ids"] == [idea["id"]]
+
+    changes = client.get(f"/boards/{board.id}/changes?since={since}").json()
+    groups = {group["id"]: group["idea_ids"] for group in changes["groups"]}
+    assert groups == {old["id"]: [], new["id"]: [idea["id"]]}
+    ideas = {i["id"]: i["group_id"] for i in client.get("/ideas").json()}
+    assert ideas[stranger["id"]] is None
+
+
+def test_compaction_drops_superseded_and_flags_full_resync(client, db):
+    board = create_board(db)
+    idea = client.post("/ideas", json={"title": "Moved", "board_id": board.id}).json()
+    for x in range(3):
+        client.patch(
+            f"/ideas/{idea['id']}/position", json={"position_x": x, "position_y": 0}
+        )
+
+    compact_change_log(db, timedelta(days=7))
+    assert db.query(BoardChange).count() == 1
+
+    compact_change_log(db, timedelta(seconds=-60))
+    assert db.query(BoardChange).count() == 0
+
+    changes = client.get(f"/boards/{board.id}/changes?since=1").json()
+    assert changes["full_resync"] is True
+    current = client.get(f"/boards/{board.id}/changes?since=4").json()
+    assert current["full_resync"] is False
@@ -0,0 +1,105 @@
+import pytest
+
+
+@pytest.fixture
+def template(client):
+    board = client.post(
+        "/boards", json={"name": "Retro template", "description": "Weekly"}
+    ).json()
+    tag = client.post("/tags", json={"name": "action"}).json()
+    went_well = client.post(
+        "/ideas",
+        json={"title": "Went well", "board_id": board["id"], "tag_ids": [tag["id"]]},
+    ).json()
+    to_improve = client.post(
+        "/ideas", json={"title": "To improve", "board_id": board["id"]}
+    ).json()
+    elsewhere = client.post("/boards", json={"name": "Elsewhere"}).json()
+    outside = client.post(
+        "/ideas", json={"title": "Outside", "board_id": elsewhere["id"]}
+    ).json()
+    group = client.post(
+        "/groups",
+        json={
+            "name": "Columns",
+            "board_id": board["id"],
+            "idea_ids": [went_well["id"]],
+        },
+    ).json()
+    client.post(
+        "/connections",
+        json={
+            "source_id": went_well["id"],
+            "target_id": to_improve["id"],
+            "label": "leads to",
+        },
+    )
+    client.post(
+        "/connections", json={"source_id": to_improve["id"], "target_id": outside["id"]}
+    )
+    client.post(f"/ideas/{went_well['id']}/vote")
+    return {"board": board, "tag": tag, "group": group, "went_well": went_well}
+
+
+def board_contents(client, board_id):
+    ideas = {i["title"]: i for i in client.get(f"/ideas?board_id={board_id}").json()}
+    groups = client.get(f"/groups?board_id={board_id}").json()
+    connections = client.get(f"/connections?board_id={board_id}").json()
+    return ideas, groups, connections
+
+
+def test_clone_copies_everything_with_new_ids(client, template, queries):
+    queries.clear()
+    response = client.post(f"/boards/{template['board']['id']}/clone", json={})
+    assert response.status_code == 200
+    clone = response.json()
+    assert clone["name"] == "Copy of Retro template"
+    assert clone["description"] == "Weekly"
+    assert clone["idea_count"] == 2
+    # One INSERT ... SELECT per table, however big the board
+    assert len([q for q in queries if q.startswith("INSERT")]) == 5
+
+    ideas, groups, connections = board_contents(client, clone["id"])
+    original_ids = {template["went_well"]["id"]}
+    assert not original_ids & {i["id"] for i in ideas.values()}
+    assert [t["name"] for t in ideas["Went well"]["tags"]] == ["action"]
+    assert ideas["Went well"]["votes"] == 0
+
+    (group,) = groups
+    assert group["id"] != template["group"]["id"]
+    assert group["idea_ids"] == [ideas["Went well"]["id"]]
+    assert ideas["Went well"]["group_id"] == group["id"]
+    assert ideas["To improve"]["group_id"] is None
+
+    # The connection leaving the board isn't copied
+    assert [(c["source_id"], c["target_id"], c["label"]) for c in connections] == [
+        (ideas["Went well"]["id"], ideas["To improve"]["id"], "leads to")
+    ]
+
+
+def test_clone_overrides_and_votes(client, template):
+    clone = client.post(
+        f"/boards/{template['board']['id']}/clone",
+        json={"name": "Sprint 12 retro", "keep_votes": True},
+    ).json()
+    assert clone["name"] == "Sprint 12 retro"
+    ideas, _, _ = board_contents(client, clone["id"])
+    assert ideas["Went well"]["votes"] == 1
+
+    # A clone of the clone maps through its own originals
+    again = client.post(f"/boards/{clone['id']}/clone", json={}).json()
+    ideas_again, groups_again, connections_again = board_contents(client, again["id"])
+    assert groups_again[0]["idea_ids"] == [ideas_again["Went well"]["id"]]
+    assert len(connections_again) == 1
+
+
+def test_clone_missing_board(client):
+    assert client.post("/boards/999/clone", json={}).status_code == 404
+
+
+def test_cloned_ideas_list_in_a_stable_order(client, template):
+    clone = client.post(f"/boards/{template['board']['id']}/clone", json={}).json()
+    ideas = client.get(f"/ideas?board_id={clone['id']}").json()
+    # Copied in one statement, so they can share created_at; id breaks the tie
+    assert [i["title"] for i in ideas] == ["Went well", "To improve"]
+    assert [i["id"] for i in ideas] == sorted(i["id"] for i in ideas)
@@ -0,0 +1,57 @@
+from app.models.idea import Idea
+from app.models.tag import idea_tags
+
+
+def test_board_delete_cascades_in_the_database(client, db, queries):
+    board = client.post("/boards", json={"name": "Doomed"}).json()
+    other = client.post("/boards", json={"name": "Neighbour"}).json()
+    tag = client.post("/tags", json={"name": "ux"}).json()
+    ideas = [
+        client.post(
+            "/ideas",
+            json={"title": f"I{i}", "board_id": board["id"], "tag_ids": [tag["id"]]},
+        ).json()["id"]
+        for i in range(5)
+    ]
+    client.post(
+        "/groups", json={"name": "G", "board_id": board["id"], "idea_ids": ideas}
+    )
+    outsider = client.post(
+        "/ideas", json={"title": "Elsewhere", "board_id": other["id"]}
+    ).json()["id"]
+    incoming = client.post(
+        "/connections", json={"source_id": outsider, "target_id": ideas[0]}
+    ).json()
+    since = client.get(f"/boards/{other['id']}").json()["revision"]
+
+    queries.clear()
+    assert client.delete(f"/boards/{board['id']}").status_code == 200
+
+    # One DELETE on boards; children go by ON DELETE CASCADE, not row by row
+    deletes = [q for q in queries if q.startswith("DELETE")]
+    assert len(deletes) == 1 and deletes[0].startswith("DELETE FROM boards")
+    assert db.query(Idea).filter(Idea.board_id == board["id"]).count() == 0
+    assert db.query(idea_tags).count() == 0
+    assert client.get(f"/boards/{board['id']}").status_code == 404
+
+    changes = client.get(f"/boards/{other['id']}/changes?since={since}").json()
+    assert changes["deleted"]["connections"] == [incoming["id"]]
+
+
+def test_group_delete_unassigns_ideas_without_loading_them(client, queries):
+    board = client.post("/boards", json={"name": "B"}).json()
+    ideas = [
+        client.post("/ideas", json={"title": "I", "board_id": board["id"]}).json()["id"]
+        for _ in range(3)
+    ]
+    group = client.post(
+        "/groups", json={"name": "G", "board_id": board["id"], "idea_ids": ideas}
+    ).json()
+
+    queries.clear()
+    assert client.delete(f"/groups/{group['id']}").status_code == 200
+
+    assert not [q for q in queries if q.startswith("SELECT")]
+    listed = client.get(f"/ideas?board_id={board['id']}").json()
+    assert [idea["group_id"] for idea in listed] == [None, None, None]
+    assert client.delete(f"/groups/{group['id']}").status_code == 404
@@ -0,0 +1,84 @@
+from app.models.board import Board
+from app.models.idea import Idea
+
+
+def create_board(db) -> Board:
+    board = Board(name="Retro", description="Sprint retro")
+    db.add(board)
+    db.commit()
+    db.refresh(board)
+    return board
+
+
+def test_board_read_returns_weak_etag(client, db):
+    board = create_board(db)
+
+    response = client.get(f"/boards/{board.id}")
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'W/"board-{board.id}-0"'
+    assert response.json()["revision"] == 0
+
+
+def test_matching_if_none_match_returns_304_with_one_query(client, db, queries):
+    board = create_board(db)
+    etag = client.get(f"/boards/{board.id}").headers["etag"]
+
+    for path in (
+        f"/boards/{board.id}",
+        f"/ideas?board_id={board.id}",
+        f"/groups?board_id={board.id}",
+    ):
+        queries.clear()
+        response = client.get(path, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+        assert len(queries) == 1
+        assert "revision" in queries[0]
+
+
+def test_mutations_bump_revision(client, db):
+    board = create_board(db)
+    etag = client.get(f"/ideas?board_id={board.id}").headers["etag"]
+
+    created = client.post("/ideas", json={"title": "Dot voting", "board_id": board.id})
+    idea_id = created.json()["id"]
+    client.patch(
+        f"/ideas/{idea_id}/position", json={"position_x": 10, "position_y": 20}
+    )
+    client.post(f"/ideas/{idea_id}/vote")
+
+    response = client.get(
+        f"/ideas?board_id={board.id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'W/"board-{board.id}-3"'
+    assert db.get(Idea, idea_id).votes == 1
+
+
+def test_tags_etag_changes_when_tags_change(client, db):
+    etag = client.get("/tags").headers["etag"]
+    assert client.get("/tags", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/tags", json={"name": "research"})
+
+    response = client.get("/tags", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_tags_etag_survives_reused_tag_ids(client, db):
+    client.post("/tags", json={"name": "research"})
+    newest = client.post("/tags", json={"name": "design"}).json()
+    etag = client.get("/tags").headers["etag"]
+
+    # SQLite hands the deleted tag's id to the next one, so count and highest
+    # id end up where they were
+    client.delete(f"/tags/{newest['id']}")
+    assert client.post("/tags", json={"name": "ops"}).json()["id"] == newest["id"]
+
+    response = client.get("/tags", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [tag["name"] for tag in response.json()] == ["ops", "research"]
@@ -0,0 +1,79 @@
+import pytest
+
+
+@pytest.fixture
+def board(client):
+    board = client.post("/boards", json={"name": "Layout"}).json()
+
+    def idea(x, y):
+        return client.post(
+            "/ideas",
+            json={
+                "title": "Note",
+                "board_id": board["id"],
+                "position_x": x,
+                "position_y": y,
+                "width": 100,
+                "height": 100,
+            },
+        ).json()["id"]
+
+    inside, outside = idea(50, 50), idea(900, 900)
+    group = client.post(
+        "/groups",
+        json={
+            "name": "Cluster",
+            "board_id": board["id"],
+            "position_x": 0,
+            "position_y": 0,
+            "width": 400,
+            "height": 300,
+            "idea_ids": [inside],
+        },
+    ).json()
+    return {
+        "id": board["id"],
+        "group": group["id"],
+        "inside": inside,
+        "outside": outside,
+    }
+
+
+def positions(client, board) -> dict[int, tuple[float, float]]:
+    ideas = client.get(f"/ideas?board_id={board['id']}").json()
+    return {i["id"]: (i["position_x"], i["position_y"]) for i in ideas}
+
+
+def test_group_move_carries_members_in_one_update(client, board, queries):
+    queries.clear()
+    response = client.patch(
+        f"/groups/{board['group']}/position",
+        json={"position_x": 30, "position_y": -20, "move_ideas": True},
+    )
+
+    assert response.json()["position_x"] == 30
+    assert len([q for q in queries if q.startswith("UPDATE ideas SET")]) == 1
+    assert positions(client, board) == {
+        board["inside"]: (80, 30),
+        board["outside"]: (900, 900),
+    }
+
+
+def test_group_move_alone_leaves_ideas(client, board):
+    client.patch(
+        f"/groups/{board['group']}/position", json={"position_x": 30, "position_y": 0}
+    )
+    assert positions(client, board)[board["inside"]] == (50, 50)
+
+
+def test_contained_ideas_join_group(client, board):
+    client.delete(f"/groups/{board['group']}/ideas/{board['inside']}")
+    client.patch(
+        f"/ideas/{board['outside']}/position",
+        json={"position_x": 250, "position_y": 180},
+    )
+
+    group = client.post(f"/groups/{board['group']}/ideas/contained").json()
+
+    # The second idea's center (300, 230) is inside the 400x300 group
+    assert group["idea_ids"] == [board["inside"], board["outside"]]
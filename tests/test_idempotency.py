@@ -0,0 +1,128 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app import idempotency
+from app.cache import clear_caches
+from app.models.idea import Idea
+from app.models.idempotency import IdempotencyKey
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def test_sessions(monkeypatch):
+    monkeypatch.setattr(idempotency, "SessionLocal", TestingSessionLocal)
+
+
+@pytest.fixture
+def board_id(client):
+    return client.post("/boards", json={"name": "Workshop"}).json()["id"]
+
+
+def test_retry_replays_response_without_running_handler(client, db, board_id, queries):
+    body = {"title": "Retry me", "board_id": board_id}
+    first = client.post("/ideas", json=body, headers={"Idempotency-Key": "abc"})
+    queries.clear()
+    retry = client.post("/ideas", json=body, headers={"Idempotency-Key": "abc"})
+
+    assert retry.status_code == first.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    # Served from the local cache: no SQL at all
+    assert queries == []
+    assert db.query(Idea).count() == 1
+
+
+def test_retry_on_another_worker_replays_stored_response(client, db, board_id):
+    headers = {"Idempotency-Key": "abc"}
+    first = client.post(f"/ideas/{_idea(client, board_id)}/vote", headers=headers)
+    clear_caches()
+    retry = client.post(f"/ideas/{first.json()['id']}/vote", headers=headers)
+
+    assert retry.json()["votes"] == first.json()["votes"] == 1
+    assert retry.headers["idempotent-replayed"] == "true"
+
+
+def test_key_reused_for_another_request_is_rejected(client, board_id):
+    headers = {"Idempotency-Key": "abc"}
+    client.post("/ideas", json={"title": "A", "board_id": board_id}, headers=headers)
+    response = client.post(
+        "/ideas", json={"title": "B", "board_id": board_id}, headers=headers
+    )
+
+    assert response.status_code == 422
+
+
+def test_key_still_running_is_a_conflict(client, db, board_id):
+    db.add(
+        IdempotencyKey(
+            key=_scoped("abc"),
+            fingerprint="in-flight",
+            expires_at=datetime.now() + timedelta(hours=1),
+        )
+    )
+    db.commit()
+    response = client.post(
+        "/ideas",
+        json={"title": "A", "board_id": board_id},
+        headers={"Idempotency-Key": "abc"},
+    )
+
+    assert response.status_code == 409
+    assert response.headers["retry-after"] == "1"
+
+
+def test_claim_leases_expire_long_before_responses(client, db, board_id):
+    headers = {"Idempotency-Key": "abc"}
+    db.add(
+        IdempotencyKey(
+            key=_scoped("abc"),
+            fingerprint="crashed",
+            expires_at=datetime.now(UTC).replace(tzinfo=None) - timedelta(seconds=1),
+        )
+    )
+    db.commit()
+
+    # The worker holding the claim died; once its lease is up a retry runs
+    response = client.post(
+        "/ideas", json={"title": "A", "board_id": board_id}, headers=headers
+    )
+    assert response.status_code == 200
+
+    db.expire_all()
+    stored = db.get(IdempotencyKey, _scoped("abc"))
+    assert stored.status_code == 200
+    assert stored.expires_at > datetime.now(UTC).replace(tzinfo=None) + timedelta(
+        hours=23
+    )
+
+
+def test_keys_are_scoped_per_client(client, db, board_id):
+    body = {"title": "Same", "board_id": board_id}
+    for token in ("alice", "bob"):
+        response = client.post(
+            "/ideas",
+            json=body,
+            headers={"Idempotency-Key": "abc", "Authorization": f"Bearer {token}"},
+        )
+        assert "idempotent-replayed" not in response.headers
+
+    assert db.query(Idea).count() == 2
+
+
+def test_expired_keys_are_purged(db):
+    db.add(IdempotencyKey(key="old", fingerprint="x", expires_at=datetime(2000, 1, 1)))
+    db.commit()
+
+    assert idempotency.purge_expired_keys(db) == 1
+
+
+def _scoped(key: str) -> str:
+    """The stored form of a key sent by the test client"""
+    return idempotency.scoped_key(
+        {"type": "http", "headers": [], "client": ("testclient", 50000)}, key
+    )
+
+
+def _idea(client, board_id: int) -> int:
+    return client.post("/ideas", json={"title": "A", "board_id": board_id}).json()["id"]
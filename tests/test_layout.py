@@ -0,0 +1,119 @@
+import itertools
+
+import pytest
+
+
+@pytest.fixture
+def board(client):
+    board = client.post("/boards", json={"name": "Messy"}).json()
+    ideas = [
+        client.post(
+            "/ideas",
+            json={
+                "title": f"Idea {i}",
+                "board_id": board["id"],
+                # Piled up on top of each other
+                "position_x": 500 + i,
+                "position_y": 300,
+                "width": 100,
+                "height": 80,
+            },
+        ).json()["id"]
+        for i in range(6)
+    ]
+    return {"id": board["id"], "ideas": ideas}
+
+
+def boxes(client, board) -> dict[int, tuple[float, float, float, float]]:
+    ideas = client.get(f"/ideas?board_id={board['id']}").json()
+    return {
+        i["id"]: (i["position_x"], i["position_y"], i["width"], i["height"])
+        for i in ideas
+    }
+
+
+def overlapping(boxes) -> bool:
+    return any(
+        ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+        for (ax, ay, aw, ah), (bx, by, bw, bh) in itertools.combinations(boxes, 2)
+    )
+
+
+def test_grid_layout_saves_in_one_update(client, board, queries):
+    queries.clear()
+    response = client.post(
+        f"/boards/{board['id']}/layout/auto", json={"algorithm": "grid", "apply": True}
+    )
+
+    assert response.json()["applied"] is True
+    assert len([q for q in queries if q.startswith("UPDATE ideas SET")]) == 1
+    stored = boxes(client, board)
+    assert not overlapping(stored.values())
+    # Anchored where the pile was
+    assert min(x for x, _, _, _ in stored.values()) == 500
+    assert min(y for _, y, _, _ in stored.values()) == 300
+
+
+def test_layout_without_apply_leaves_board(client, board):
+    before = boxes(client, board)
+    body = client.post(f"/boards/{board['id']}/layout/auto", json={}).json()
+    assert body["applied"] is False
+    assert len(body["ideas"]) == 6
+    assert boxes(client, board) == before
+
+
+def test_force_layout_pulls_connected_ideas_together(client, board):
+    a, b, c, d, e, f = board["ideas"]
+    for source, target in [(a, b), (b, c), (c, a), (d, e), (e, f), (f, d)]:
+        client.post("/connections", json={"source_id": source, "target_id": target})
+
+    body = client.post(
+        f"/boards/{board['id']}/layout/auto", json={"algorithm": "force"}
+    ).json()
+    position = {i["id"]: (i["position_x"], i["position_y"]) for i in body["ideas"]}
+
+    def distance(p, q):
+        return (
+            (position[p][0] - position[q][0]) ** 2
+            + (position[p][1] - position[q][1]) ** 2
+        ) ** 0.5
+
+    assert distance(a, b) < distance(a, d)
+    assert distance(d, e) < distance(c, f)
+
+
+def test_group_layout_packs_members_inside_groups(client, board):
+    first, second = (
+        client.post(
+            "/groups",
+            json={"name": name, "board_id": board["id"], "idea_ids": ids},
+        ).json()["id"]
+        for name, ids in [("One", board["ideas"][:2]), ("Two", board["ideas"][2:5])]
+    )
+
+    body = client.post(
+        f"/boards/{board['id']}/layout/auto",
+        json={"algorithm": "groups", "apply": True},
+    ).json()
+
+    groups = {g["id"]: g for g in client.get(f"/groups?board_id={board['id']}").json()}
+    assert {g["id"] for g in body["groups"]} == {first, second}
+    rects = [
+        (g["position_x"], g["position_y"], g["width"], g["height"])
+        for g in groups.values()
+    ]
+    assert not overlapping(rects)
+    stored = boxes(client, board)
+    for group in groups.values():
+        for idea_id in group["idea_ids"]:
+            x, y, w, h = stored[idea_id]
+            assert group["position_x"] <= x
+            assert x + w <= group["position_x"] + group["width"]
+            assert group["position_y"] <= y
+            assert y + h <= group["position_y"] + group["height"]
+    # The ungrouped idea stays clear of both groups
+    assert not overlapping([stored[board["ideas"][5]], *rects])
+
+
+def test_layout_missing_board(client):
+    assert client.post("/boards/999/layout/auto", json={}).status_code == 404
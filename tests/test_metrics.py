@@ -0,0 +1,55 @@
+import re
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.metrics import RequestStats, _request_stats, registry
+
+
+def test_server_timing_counts_queries(client):
+    response = client.get("/boards")
+
+    timing = response.headers["Server-Timing"]
+    assert re.search(r'db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+', timing)
+    assert not timing.startswith('db;dur=0.0;desc="0 queries"')
+
+
+def test_metrics_are_labelled_by_route_template(client):
+    registry.reset()
+    board = client.post("/boards", json={"name": "Metrics"}).json()
+    idea = client.post("/ideas", json={"title": "A", "board_id": board["id"]}).json()
+    for x in range(2):
+        client.patch(
+            f"/ideas/{idea['id']}/position", json={"position_x": x, "position_y": 0}
+        )
+    client.get("/no-such-path")
+
+    body = client.get("/metrics").text
+
+    route = 'method="PATCH",route="/ideas/{idea_id}/position"'
+    assert f'http_requests_total{{{route},status="200"}} 2' in body
+    assert f"http_request_duration_seconds_count{{{route}}} 2" in body
+    assert f'db_queries_per_request_bucket{{{route},le="+Inf"}} 2' in body
+    assert 'route="unmatched",status="404"' in body
+
+
+def test_failed_statements_do_not_skew_later_timings(db):
+    db.execute(text("SELECT 1"))
+    for _ in range(3):
+        with pytest.raises(OperationalError):
+            db.execute(text("SELECT * FROM no_such_table"))
+        db.rollback()
+    assert "query_started" not in db.connection().info
+
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    try:
+        started = time.perf_counter()
+        db.execute(text("SELECT 1"))
+        elapsed = time.perf_counter() - started
+    finally:
+        _request_stats.reset(token)
+    assert stats.queries == 1
+    assert 0 < stats.db_seconds <= elapsed
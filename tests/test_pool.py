@@ -0,0 +1,64 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base, get_db
+from app.main import app
+from app.pool import TimedQueuePool, pool_stats
+
+
+@pytest.fixture
+def small_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        connect_args={"check_same_thread": False},
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def test_session_checks_out_lazily_and_returns_on_commit(small_engine):
+    session = sessionmaker(bind=small_engine)()
+    assert pool_stats(small_engine)["checked_out"] == 0
+
+    session.execute(text("SELECT 1"))
+    assert pool_stats(small_engine)["checked_out"] == 1
+
+    session.commit()
+    assert pool_stats(small_engine)["checked_out"] == 0
+    session.close()
+
+
+def test_exhausted_pool_returns_503(small_engine):
+    Session = sessionmaker(bind=small_engine)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        client = TestClient(app)
+        held = small_engine.connect()
+        response = client.get("/boards")
+        held.close()
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert client.get("/boards").status_code == 200
+    finally:
+        app.dependency_overrides.clear()
+
+    stats = pool_stats(small_engine)
+    assert stats["timeouts"] == 1
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] >= 1
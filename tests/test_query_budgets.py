@@ -0,0 +1,77 @@
+import pytest
+
+from app.query_debug import CapturedStatement, find_repeated, statement_shape
+
+
+@pytest.fixture
+def board(client):
+    """A board with enough rows that any per-row query would blow its budget"""
+    board = client.post("/boards", json={"name": "Budget"}).json()
+    tags = [client.post("/tags", json={"name": f"t{i}"}).json() for i in range(3)]
+    ideas = [
+        client.post(
+            "/ideas",
+            json={
+                "title": f"Idea {i}",
+                "board_id": board["id"],
+                "tag_ids": [tags[i % 3]["id"]],
+            },
+        ).json()
+        for i in range(10)
+    ]
+    client.post(
+        "/groups",
+        json={"name": "G", "board_id": board["id"], "idea_ids": [ideas[0]["id"]]},
+    )
+    for source, target in zip(ideas, ideas[1:]):
+        client.post(
+            "/connections", json={"source_id": source["id"], "target_id": target["id"]}
+        )
+    return board["id"]
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        pytest.param("/boards", marks=pytest.mark.query_budget(1, route="GET /boards")),
+        pytest.param(
+            "/boards/{board_id}",
+            marks=pytest.mark.query_budget(3, route="GET /boards/{board_id}"),
+        ),
+        pytest.param(
+            "/ideas?board_id={board_id}",
+            marks=pytest.mark.query_budget(3, route="GET /ideas"),
+        ),
+        pytest.param(
+            "/groups?board_id={board_id}",
+            marks=pytest.mark.query_budget(3, route="GET /groups"),
+        ),
+        pytest.param(
+            "/connections?board_id={board_id}",
+            marks=pytest.mark.query_budget(1, route="GET /connections"),
+        ),
+        pytest.param(
+            "/boards/{board_id}/changes?since=1",
+            marks=pytest.mark.query_budget(6, route="GET /boards/{board_id}/changes"),
+        ),
+    ],
+)
+def test_read_endpoints_stay_within_budget(client, board, path):
+    assert client.get(path.format(board_id=board)).status_code == 200
+
+
+def test_repeated_statement_shapes_are_flagged():
+    statements = [
+        CapturedStatement("SELECT * FROM tags WHERE idea_id = ?", (i,), 0.001)
+        for i in range(6)
+    ]
+    statements.append(
+        CapturedStatement("SELECT * FROM ideas WHERE id IN (?, ?, ?)", (1, 2, 3), 0.0)
+    )
+
+    assert find_repeated(statements, threshold=5) == [
+        ("SELECT * FROM tags WHERE idea_id = ?", 6)
+    ]
+    assert (
+        statement_shape("SELECT 1 WHERE id IN (?,\n ?)") == "SELECT 1 WHERE id IN (?)"
+    )
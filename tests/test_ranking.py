@@ -0,0 +1,125 @@
+import pytest
+from sqlalchemy import insert, select
+
+from app.models.vote import IdeaVoteCount
+from app.services import ranking_service
+
+
+@pytest.fixture
+def board(client):
+    board = client.post("/boards", json={"name": "Ranked"}).json()
+    ideas = [
+        client.post("/ideas", json={"title": title, "board_id": board["id"]}).json()[
+            "id"
+        ]
+        for title in ("First", "Second", "Third")
+    ]
+    return {"id": board["id"], "ideas": ideas}
+
+
+def vote(client, idea_id, times=1):
+    for _ in range(times):
+        assert client.post(f"/ideas/{idea_id}/vote").status_code == 200
+
+
+def top(client, **params) -> list[int]:
+    response = client.get("/ideas/top", params=params)
+    assert response.status_code == 200
+    return [idea["id"] for idea in response.json()]
+
+
+def test_top_ideas_per_board_follow_votes(client, board):
+    first, second, third = board["ideas"]
+    vote(client, second, 2)
+    vote(client, third)
+    assert top(client, board_id=board["id"]) == [second, third, first]
+
+    # The cached ranking is updated by the votes themselves
+    vote(client, first, 3)
+    assert top(client, board_id=board["id"], k=2) == [first, second]
+
+    created = client.post("/ideas", json={"title": "New", "board_id": board["id"]})
+    assert top(client, board_id=board["id"])[-1] == created.json()["id"]
+
+    client.delete(f"/ideas/{first}")
+    assert top(client, board_id=board["id"], k=1) == [second]
+
+
+def test_cached_ranking_skips_the_sort(client, board, queries):
+    top(client, board_id=board["id"])
+    queries.clear()
+    top(client, board_id=board["id"])
+    assert not [q for q in queries if "LIMIT" in q]
+
+
+def test_full_ranking_only_admits_ideas_that_beat_the_last(client, board, monkeypatch):
+    first, second, third = board["ideas"]
+    vote(client, first)
+    monkeypatch.setattr(ranking_service, "MAX_TOP", 2)
+    assert top(client, board_id=board["id"]) == [first, second]
+    vote(client, third, 2)
+    assert top(client, board_id=board["id"]) == [third, first]
+
+
+def test_top_ideas_by_tag_across_boards(client, board):
+    other = client.post("/boards", json={"name": "Other"}).json()
+    tag = client.post("/tags", json={"name": "ux"}).json()
+    tagged = client.post(
+        "/ideas",
+        json={"title": "Tagged", "board_id": other["id"], "tag_ids": [tag["id"]]},
+    ).json()
+    client.patch(f"/ideas/{board['ideas'][0]}/tags", json={"tag_ids": [tag["id"]]})
+    vote(client, tagged["id"], 2)
+    vote(client, board["ideas"][1], 5)
+
+    response = client.get("/ideas/top", params={"tag_id": tag["id"]}).json()
+    assert [i["id"] for i in response] == [tagged["id"], board["ideas"][0]]
+    assert response[0]["tags"][0]["name"] == "ux"
+    assert top(client, k=1) == [board["ideas"][1]]
+
+
+def test_trending_counts_recent_votes_only(client, board, db):
+    first, second, _ = board["ideas"]
+    vote(client, first, 3)
+    vote(client, second, 2)
+    # Ten votes for the second idea, two hours ago
+    old_minute = ranking_service._current_minute() - 120
+    db.execute(
+        insert(IdeaVoteCount).values(
+            idea_id=second, minute=old_minute, board_id=board["id"], votes=10
+        )
+    )
+    db.commit()
+
+    response = client.get("/ideas/trending", params={"board_id": board["id"]})
+    assert [(i["id"], i["recent_votes"]) for i in response.json()] == [
+        (first, 3),
+        (second, 2),
+    ]
+    day = client.get(
+        "/ideas/trending", params={"board_id": board["id"], "window_minutes": 180}
+    ).json()
+    assert [(i["id"], i["recent_votes"]) for i in day] == [(second, 12), (first, 3)]
+
+    # Three votes made one bucket row, not three
+    assert (
+        len(
+            db.scalars(
+                select(IdeaVoteCount).where(IdeaVoteCount.idea_id == first)
+            ).all()
+        )
+        == 1
+    )
+
+
+def test_purge_drops_expired_vote_counts(client, board, db):
+    vote(client, board["ideas"][0])
+    db.execute(
+        insert(IdeaVoteCount).values(
+            idea_id=board["ideas"][1], minute=0, board_id=board["id"], votes=1
+        )
+    )
+    db.commit()
+
+    assert ranking_service.purge_vote_counts(db) == 1
+    assert db.scalars(select(IdeaVoteCount.idea_id)).all() == [board["ideas"][0]]
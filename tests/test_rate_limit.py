@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import settings
+from app.db import get_db
+from app.main import app
+from app.rate_limit import ConcurrencyLimiter, MemoryBuckets
+from app.routers import ai
+from app.services import ai_service
+
+
+def test_bucket_allows_burst_then_reports_wait():
+    buckets = MemoryBuckets()
+    assert buckets.take("k", rate_per_second=1 / 60, burst=2) == 0
+    assert buckets.take("k", rate_per_second=1 / 60, burst=2) == 0
+    assert buckets.take("k", rate_per_second=1 / 60, burst=2) == pytest.approx(60, 0.01)
+    # Other keys have their own bucket
+    assert buckets.take("other", rate_per_second=1 / 60, burst=2) == 0
+
+
+def test_limiter_queues_then_sheds():
+    async def scenario():
+        limiter = ConcurrencyLimiter("test", 1, max_queue=1, queue_timeout=1)
+        await limiter.acquire()
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.queued == 1
+
+        with pytest.raises(HTTPException) as shed:
+            await limiter.acquire()
+        assert shed.value.status_code == 503
+        assert limiter.shed["queue_full"] == 1
+
+        limiter.release()
+        await queued
+        assert (limiter.in_flight, limiter.queued) == (1, 0)
+        limiter.release()
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_limiter_sheds_after_queue_timeout():
+    async def scenario():
+        limiter = ConcurrencyLimiter("test", 1, max_queue=1, queue_timeout=0.01)
+        await limiter.acquire()
+        with pytest.raises(HTTPException) as shed:
+            await limiter.acquire()
+        assert shed.value.headers["Retry-After"] == "1"
+        assert (limiter.queued, limiter.shed["queue_timeout"]) == (0, 1)
+
+    asyncio.run(scenario())
+
+
+def test_client_over_limit_gets_429(client, monkeypatch):
+    monkeypatch.setattr(settings, "anthropic_api_key", "test")
+    monkeypatch.setattr(ai_service, "auto_categorize_idea", lambda *args: ["ops"])
+    monkeypatch.setattr(ai.client_limit, "burst", 2)
+    monkeypatch.setattr(ai.client_limit, "per_minute", 1)
+    monkeypatch.setattr(ai.client_limit, "limited", 0)
+    monkeypatch.setattr("app.rate_limit._backend", MemoryBuckets())
+
+    responses = [
+        client.post("/ai/categorize", json={"title": "Cache reads"}) for _ in range(3)
+    ]
+
+    assert [r.status_code for r in responses] == [200, 200, 429]
+    assert responses[2].headers["retry-after"] == "60"
+    assert 'rate_limited_total{limit="ai_client"} 1' in client.get("/metrics").text
+
+
+def test_missing_board_does_not_use_board_limit(client, monkeypatch):
+    monkeypatch.setattr(settings, "anthropic_api_key", "test")
+    monkeypatch.setattr(ai.board_limit, "burst", 1)
+    monkeypatch.setattr(ai.board_limit, "per_minute", 1)
+    monkeypatch.setattr("app.rate_limit._backend", MemoryBuckets())
+    monkeypatch.setattr(ai_service, "get_idea_suggestions", lambda *args: ["Try"])
+
+    # Board 1 doesn't exist yet: 404s, with board 1's bucket left alone
+    for _ in range(2):
+        response = client.post("/ai/suggestions", json={"board_id": 1})
+        assert response.status_code == 404
+    client.post("/boards", json={"name": "Now it does"})
+    response = client.post("/ai/suggestions", json={"board_id": 1})
+    assert response.status_code == 200
+
+
+def test_model_calls_do_not_hold_a_connection(client, monkeypatch):
+    monkeypatch.setattr(settings, "anthropic_api_key", "test")
+    monkeypatch.setattr("app.rate_limit._backend", MemoryBuckets())
+    sessions = []
+    override = app.dependency_overrides[get_db]
+
+    def recording_db():
+        for session in override():
+            sessions.append(session)
+            yield session
+
+    def fake_model(*args):
+        assert not sessions[-1].in_transaction()
+        return ["Try"]
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, recording_db)
+    monkeypatch.setattr(ai_service, "get_idea_suggestions", fake_model)
+    monkeypatch.setattr(ai_service, "auto_categorize_idea", fake_model)
+    board = client.post("/boards", json={"name": "Workshop"}).json()
+    client.post("/ideas", json={"title": "A", "board_id": board["id"]})
+
+    response = client.post("/ai/suggestions", json={"board_id": board["id"]})
+    assert response.status_code == 200
+    response = client.post("/ai/categorize", json={"title": "Cache reads"})
+    assert response.status_code == 200
@@ -0,0 +1,77 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import db as app_db
+from app.cache import clear_caches
+from app.db import Base, RoutingSession
+from app.main import app
+from app.models.board import Board
+
+
+@pytest.fixture
+def routed(tmp_path, monkeypatch):
+    """Two separate SQLite files standing in for a primary and a lagging replica"""
+    engines = {}
+    for name in ("primary", "replica"):
+        engines[name] = create_engine(
+            f"sqlite:///{tmp_path / name}.db",
+            connect_args={"check_same_thread": False},
+        )
+        Base.metadata.create_all(bind=engines[name])
+        with sessionmaker(bind=engines[name])() as session:
+            session.add(Board(name=f"on {name}"))
+            session.commit()
+    monkeypatch.setattr(
+        app_db,
+        "SessionLocal",
+        sessionmaker(
+            class_=RoutingSession,
+            autoflush=False,
+            bind=engines["primary"],
+            replica=engines["replica"],
+        ),
+    )
+    clear_caches()
+    yield engines
+    for engine in engines.values():
+        engine.dispose()
+
+
+def board_names(client) -> list[str]:
+    return [board["name"] for board in client.get("/boards").json()]
+
+
+def test_reads_go_to_replica_and_writes_to_primary(routed):
+    client = TestClient(app)
+    assert board_names(client) == ["on replica"]
+
+    response = client.post("/boards", json={"name": "new"})
+    assert response.status_code == 200
+    with sessionmaker(bind=routed["primary"])() as session:
+        assert session.query(Board).filter(Board.name == "new").count() == 1
+
+
+def test_client_reads_own_writes_from_primary(routed, monkeypatch):
+    writer = TestClient(app)
+    writer.post("/boards", json={"name": "new"})
+    assert app_db.PRIMARY_COOKIE in writer.cookies
+    assert board_names(writer) == ["on primary", "new"]
+
+    # Other clients keep reading the replica
+    assert board_names(TestClient(app)) == ["on replica"]
+
+    # Once the window has passed the writer goes back to the replica
+    writer.cookies.set(app_db.PRIMARY_COOKIE, "0")
+    assert board_names(writer) == ["on replica"]
+
+
+def test_replica_reads_do_not_fill_shared_caches(routed):
+    writer = TestClient(app)
+    writer.patch("/boards/1", json={"name": "renamed"})
+
+    # A lagging replica read must not put the old name back in the cache ...
+    assert TestClient(app).get("/boards/1").json()["name"] == "on replica"
+    # ... where the writer, pinned to the primary, would find it
+    assert writer.get("/boards/1").json()["name"] == "renamed"
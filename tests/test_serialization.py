@@ -0,0 +1,43 @@
+from pydantic import TypeAdapter
+
+from app.main import app
+from app.models.board import Board
+from app.models.idea import Idea
+from app.models.tag import Tag
+from app.schemas.idea import IdeaResponse
+
+
+def test_fast_path_matches_validated_orm_output(client, db):
+    board = Board(name="Launch")
+    tag = Tag(name="priority")
+    db.add_all([board, tag])
+    db.commit()
+    client.post(
+        "/ideas",
+        json={"title": "Beta list", "board_id": board.id, "tag_ids": [tag.id]},
+    )
+    client.post("/ideas", json={"title": "Press kit", "board_id": board.id})
+
+    response = client.get(f"/ideas?board_id={board.id}")
+
+    ideas = db.query(Idea).order_by(Idea.created_at).all()
+    expected = TypeAdapter(list[IdeaResponse]).dump_python(
+        TypeAdapter(list[IdeaResponse]).validate_python(ideas, from_attributes=True),
+        mode="json",
+    )
+    assert response.json() == expected
+    assert response.json()[0]["tags"][0]["name"] == "priority"
+
+
+def test_list_endpoints_keep_response_schemas():
+    paths = app.openapi()["paths"]
+    for path, schema in (
+        ("/ideas", "IdeaResponse"),
+        ("/groups", "GroupResponse"),
+        ("/connections", "ConnectionResponse"),
+        ("/tags", "TagResponse"),
+        ("/boards", "BoardResponse"),
+    ):
+        content = paths[path]["get"]["responses"]["200"]["content"]
+        items = content["application/json"]["schema"]["items"]
+        assert items["$ref"] == f"#/components/schemas/{schema}"
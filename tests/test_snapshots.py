@@ -0,0 +1,185 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.config import settings
+from app.db import insert_many_returning_ids
+from app.models.board import Board
+from app.models.snapshot import BoardSnapshot
+from app.services import snapshot_service
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def board(client):
+    board = client.post("/boards", json={"name": "Retro"}).json()
+    tag = client.post("/tags", json={"name": "action"}).json()
+    ideas = [
+        client.post(
+            "/ideas",
+            json={
+                "title": f"Idea {i}",
+                "board_id": board["id"],
+                "tag_ids": [tag["id"]],
+            },
+        ).json()
+        for i in range(5)
+    ]
+    group = client.post(
+        "/groups",
+        json={
+            "name": "Keep",
+            "board_id": board["id"],
+            "idea_ids": [ideas[0]["id"], ideas[1]["id"]],
+        },
+    ).json()
+    client.post(
+        "/connections",
+        json={"source_id": ideas[0]["id"], "target_id": ideas[1]["id"], "label": "x"},
+    )
+    return {"board": board, "ideas": ideas, "group": group}
+
+
+def board_contents(client, board_id):
+    ideas = {
+        i["title"]: (i["group_id"] is not None, [t["name"] for t in i["tags"]])
+        for i in client.get(f"/ideas?board_id={board_id}").json()
+    }
+    groups = [g["name"] for g in client.get(f"/groups?board_id={board_id}").json()]
+    titles = {
+        i["id"]: i["title"] for i in client.get(f"/ideas?board_id={board_id}").json()
+    }
+    connections = [
+        (titles[c["source_id"]], titles[c["target_id"]], c["label"])
+        for c in client.get(f"/connections?board_id={board_id}").json()
+    ]
+    return ideas, groups, connections
+
+
+def test_restore_undoes_deletes_and_edits(client, board):
+    board_id, ideas = board["board"]["id"], board["ideas"]
+    before = board_contents(client, board_id)
+    first = client.post(f"/boards/{board_id}/snapshots", json={"label": "Start"}).json()
+    assert (first["idea_count"], first["group_count"]) == (5, 1)
+    assert first["connection_count"] == 1
+
+    client.patch(f"/ideas/{ideas[2]['id']}/content", json={"title": "Renamed"})
+    client.delete(f"/groups/{board['group']['id']}")
+    for idea in ideas[:2]:
+        client.delete(f"/ideas/{idea['id']}")
+    client.post("/ideas", json={"title": "Added later", "board_id": board_id})
+
+    second = client.post(f"/boards/{board_id}/snapshots", json={}).json()
+    # Only what changed since the first snapshot is stored
+    assert second["size_bytes"] < first["size_bytes"]
+
+    response = client.post(f"/boards/{board_id}/snapshots/{first['id']}/restore")
+    assert response.status_code == 200
+    restored = response.json()
+    assert restored["upserted"] == {"group": 1, "idea": 3, "connection": 1}
+    assert restored["deleted"] == {"group": 0, "idea": 1, "connection": 0}
+    assert restored["relinked_ideas"] == 2
+    assert board_contents(client, board_id) == before
+
+    # The board as it was before the restore was saved too, so it can be undone
+    client.post(
+        f"/boards/{board_id}/snapshots/{restored['backup_snapshot_id']}/restore"
+    )
+    ideas_after, groups_after, connections_after = board_contents(client, board_id)
+    assert set(ideas_after) == {"Idea 3", "Idea 4", "Renamed", "Added later"}
+    assert (groups_after, connections_after) == ([], [])
+
+    changes = client.get(f"/boards/{board_id}/changes?since=0").json()
+    assert changes["revision"] == restored["revision"] + 1
+
+
+def test_list_snapshots_and_keyframes(client, board, db, monkeypatch):
+    monkeypatch.setattr(settings, "snapshot_keyframe_interval", 2)
+    board_id = board["board"]["id"]
+    for i in range(3):
+        client.patch(
+            f"/ideas/{board['ideas'][0]['id']}/content", json={"title": f"Take {i}"}
+        )
+        client.post(f"/boards/{board_id}/snapshots", json={"label": f"Take {i}"})
+
+    snapshots = client.get(f"/boards/{board_id}/snapshots").json()
+    assert [s["label"] for s in snapshots] == ["Take 2", "Take 1", "Take 0"]
+    assert {s["kind"] for s in snapshots} == {"manual"}
+    # Every second snapshot starts a new chain and rebuilds on its own
+    for snapshot, title in zip(snapshots, ["Take 2", "Take 1", "Take 0"]):
+        state = snapshot_service.load_state(db, snapshot["id"])
+        assert title in {row[0] for row in state.ideas.values()}
+
+
+def test_periodic_snapshots_skip_unchanged_boards(client, board, db):
+    board_id = board["board"]["id"]
+    assert snapshot_service.boards_to_snapshot(db) == [board_id]
+    client.post(f"/boards/{board_id}/snapshots", json={})
+    assert snapshot_service.boards_to_snapshot(db) == []
+    client.post(f"/ideas/{board['ideas'][0]['id']}/vote")
+    assert snapshot_service.boards_to_snapshot(db) == [board_id]
+
+
+def test_periodic_snapshot_is_claimed_once(client, board, db, monkeypatch):
+    monkeypatch.setattr(snapshot_service, "SessionLocal", TestingSessionLocal)
+    board_id = board["board"]["id"]
+    # Another worker got to the board first
+    assert snapshot_service.claim_snapshot(db, board_id) is not None
+    db.commit()
+    assert snapshot_service.claim_snapshot(db, board_id) is None
+    assert snapshot_service._snapshot_once() == (0, 0)
+    assert client.get(f"/boards/{board_id}/snapshots").json() == []
+
+    # A claim given back after a failed snapshot is picked up by the next run
+    snapshot_service.release_snapshot_claim(
+        db, board_id, db.get(Board, board_id).revision
+    )
+    db.commit()
+    assert snapshot_service._snapshot_once() == (1, 0)
+    assert snapshot_service._snapshot_once() == (0, 0)
+
+
+def test_old_snapshot_chains_are_pruned(client, board, db, monkeypatch):
+    monkeypatch.setattr(settings, "snapshot_keyframe_interval", 2)
+    board_id = board["board"]["id"]
+    for i in range(5):
+        client.patch(
+            f"/ideas/{board['ideas'][0]['id']}/content", json={"title": f"Take {i}"}
+        )
+        client.post(f"/boards/{board_id}/snapshots", json={"label": f"Take {i}"})
+    taken = [
+        s["id"] for s in reversed(client.get(f"/boards/{board_id}/snapshots").json())
+    ]
+
+    # Chains: Take 0-1, Take 2-3, Take 4. All but the newest are out of the window
+    db.execute(
+        update(BoardSnapshot)
+        .where(BoardSnapshot.id.in_(taken[:4]))
+        .values(created_at=datetime.now(UTC).replace(tzinfo=None) - timedelta(days=40))
+    )
+    db.commit()
+    assert snapshot_service.prune_snapshots(db, timedelta(days=30)) == 2
+
+    kept = client.get(f"/boards/{board_id}/snapshots").json()
+    assert [s["label"] for s in kept] == ["Take 4", "Take 3", "Take 2"]
+    state = snapshot_service.load_state(db, kept[1]["id"])
+    assert "Take 3" in {row[0] for row in state.ideas.values()}
+    assert snapshot_service.prune_snapshots(db, timedelta(days=30)) == 0
+
+
+def test_snapshot_not_found(client, board):
+    board_id = board["board"]["id"]
+    assert client.post("/boards/999/snapshots", json={}).status_code == 404
+    assert client.get("/boards/999/snapshots").status_code == 404
+    response = client.post(f"/boards/{board_id}/snapshots/999/restore")
+    assert response.status_code == 404
+
+
+def test_bulk_insert_returns_ids_in_row_order(db):
+    names = [f"Board {i}" for i in range(5)]
+    ids = insert_many_returning_ids(
+        db, Board.__table__, [{"name": name} for name in names]
+    )
+    stored = dict(db.execute(select(Board.id, Board.name)).all())
+    assert [stored[board_id] for board_id in ids] == names
@@ -0,0 +1,81 @@
+import pytest
+
+from app.config import settings
+from app.models.board_summary import BoardSummary
+from app.services import ai_job_service, ai_service
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def ai_configured(monkeypatch, fake_model):
+    monkeypatch.setattr(settings, "anthropic_api_key", "test")
+    monkeypatch.setattr(settings, "anthropic_base_url", fake_model)
+    monkeypatch.setattr(settings, "summary_stale_after_votes", 2)
+    monkeypatch.setattr(ai_job_service, "SessionLocal", TestingSessionLocal)
+
+
+@pytest.fixture
+def board(client):
+    board_id = client.post("/boards", json={"name": "Roadmap"}).json()["id"]
+    idea_id = client.post(
+        "/ideas", json={"title": "Offline mode", "board_id": board_id}
+    ).json()["id"]
+    return {"id": board_id, "idea": idea_id}
+
+
+def summarize(client, board_id: int) -> dict:
+    response = client.post("/ai/summarize", json={"board_id": board_id})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_summary_is_served_from_storage(client, board, monkeypatch):
+    first = summarize(client, board["id"])
+
+    def unexpected(*args):
+        raise AssertionError("the model should not be called")
+
+    monkeypatch.setattr(ai_service, "summarize_board", unexpected)
+    stored = summarize(client, board["id"])
+
+    assert stored["summary"] == first["summary"]
+    assert stored["stale"] is False
+    assert stored["age_seconds"] >= 0
+
+
+def test_votes_past_threshold_mark_summary_stale(client, board):
+    summarize(client, board["id"])
+    client.post(f"/ideas/{board['idea']}/vote")
+    assert summarize(client, board["id"])["stale"] is False
+
+    client.post(f"/ideas/{board['idea']}/vote")
+    assert summarize(client, board["id"])["stale"] is True
+
+
+def test_stale_summary_is_refreshed_once_board_is_quiet(client, db, board, monkeypatch):
+    summarize(client, board["id"])
+    for _ in range(2):
+        client.post(f"/ideas/{board['idea']}/vote")
+
+    monkeypatch.setattr(settings, "summary_refresh_debounce_seconds", 3600)
+    assert ai_job_service.schedule_summary_refreshes(db) == 0
+
+    monkeypatch.setattr(settings, "summary_refresh_debounce_seconds", 0)
+    assert ai_job_service.schedule_summary_refreshes(db) == 1
+    # Already queued, so not scheduled twice
+    assert ai_job_service.schedule_summary_refreshes(db) == 0
+
+    assert ai_job_service.process_next_job()
+    assert summarize(client, board["id"])["stale"] is False
+    summary = db.query(BoardSummary).one()
+    assert (summary.pending_votes, summary.refresh_job_id) == (0, None)
+
+
+def test_bulk_tagging_counts_toward_staleness(client, db, board):
+    summarize(client, board["id"])
+    tag = client.post("/tags", json={"name": "later"}).json()
+    client.post(f"/tags/{tag['id']}/ideas", json={"board_id": board["id"]})
+
+    summary = db.query(BoardSummary).one()
+    assert summary.pending_edits == 1
+    assert summary.last_change_at is not None
@@ -0,0 +1,55 @@
+import pytest
+
+
+@pytest.fixture
+def board(client):
+    board = client.post("/boards", json={"name": "Retag"}).json()
+    tag = client.post("/tags", json={"name": "ux"}).json()
+    ideas = [
+        client.post(
+            "/ideas", json={"title": f"Idea {i}", "board_id": board["id"]}
+        ).json()["id"]
+        for i in range(3)
+    ]
+    client.patch(f"/ideas/{ideas[0]}/tags", json={"tag_ids": [tag["id"]]})
+    return {"id": board["id"], "tag": tag["id"], "ideas": ideas}
+
+
+def tagged(client, board) -> list[int]:
+    ideas = client.get(f"/ideas?board_id={board['id']}&tag_ids={board['tag']}")
+    return [idea["id"] for idea in ideas.json()]
+
+
+def test_bulk_tag_by_board_is_one_insert(client, board, queries):
+    queries.clear()
+    response = client.post(
+        f"/tags/{board['tag']}/ideas", json={"board_id": board["id"]}
+    )
+
+    assert response.json() == {"tag_id": board["tag"], "idea_ids": board["ideas"][1:]}
+    inserts = [q for q in queries if q.startswith("INSERT INTO idea_tags")]
+    assert len(inserts) == 1
+    assert "ON CONFLICT DO NOTHING" in inserts[0]
+    assert tagged(client, board) == board["ideas"]
+
+
+def test_bulk_untag_by_ids(client, board):
+    client.post(f"/tags/{board['tag']}/ideas", json={"idea_ids": board["ideas"]})
+    since = client.get(f"/boards/{board['id']}").json()["revision"]
+
+    response = client.request(
+        "DELETE",
+        f"/tags/{board['tag']}/ideas",
+        json={"idea_ids": board["ideas"][:2], "board_id": board["id"]},
+    )
+
+    assert response.json()["idea_ids"] == board["ideas"][:2]
+    assert tagged(client, board) == board["ideas"][2:]
+    changes = client.get(f"/boards/{board['id']}/changes?since={since}").json()
+    assert {link["idea_id"] for link in changes["idea_tags"]} == set(board["ideas"][:2])
+
+
+def test_bulk_tag_validation(client, board):
+    assert client.post(f"/tags/{board['tag']}/ideas", json={}).status_code == 422
+    response = client.post("/tags/999/ideas", json={"idea_ids": board["ideas"]})
+    assert response.status_code == 404
@@ -0,0 +1,77 @@
+import pytest
+
+
+@pytest.fixture
+def board(client):
+    board = client.post("/boards", json={"name": "Workshop"}).json()
+    first = client.post("/ideas", json={"title": "A", "board_id": board["id"]}).json()
+    second = client.post("/ideas", json={"title": "B", "board_id": board["id"]}).json()
+    group = client.post(
+        "/groups",
+        json={"name": "G", "board_id": board["id"], "idea_ids": [first["id"]]},
+    ).json()
+    connection = client.post(
+        "/connections", json={"source_id": first["id"], "target_id": second["id"]}
+    ).json()
+    return {
+        "board": board["id"],
+        "idea": first["id"],
+        "group": group["id"],
+        "connection": connection["id"],
+    }
+
+
+@pytest.mark.parametrize(
+    "method,path,body,table",
+    [
+        (
+            "patch",
+            "/ideas/{idea}/position",
+            {"position_x": 1, "position_y": 2},
+            "ideas",
+        ),
+        ("patch", "/ideas/{idea}/size", {"width": 10, "height": 20}, "ideas"),
+        ("patch", "/ideas/{idea}/content", {"title": "New"}, "ideas"),
+        ("post", "/ideas/{idea}/vote", None, "ideas"),
+        ("patch", "/groups/{group}", {"name": "Renamed"}, "idea_groups"),
+        (
+            "patch",
+            "/groups/{group}/position",
+            {"position_x": 1, "position_y": 2},
+            "idea_groups",
+        ),
+        ("patch", "/groups/{group}/size", {"width": 1, "height": 2}, "idea_groups"),
+        ("patch", "/connections/{connection}", {"label": "why"}, "idea_connections"),
+        ("patch", "/boards/{board}", {"name": "Renamed"}, "boards"),
+    ],
+)
+def test_write_is_one_returning_statement(
+    client, board, queries, method, path, body, table
+):
+    queries.clear()
+    response = client.request(method, path.format(**board), json=body)
+
+    assert response.status_code == 200
+    writes = [q for q in queries if q.startswith(f"UPDATE {table} SET")]
+    assert len(writes) == 1
+    assert "RETURNING" in writes[0]
+    # No follow-up reads: the response is built from the returned row
+    assert not [q for q in queries if q.startswith("SELECT")]
+
+
+def test_returned_row_carries_links(client, board):
+    tag = client.post("/tags", json={"name": "ux"}).json()
+    client.patch(f"/ideas/{board['idea']}/tags", json={"tag_ids": [tag["id"]]})
+
+    idea = client.post(f"/ideas/{board['idea']}/vote").json()
+    group = client.patch(f"/groups/{board['group']}", json={"color": "#000"}).json()
+
+    assert idea["votes"] == 1
+    assert [t["name"] for t in idea["tags"]] == ["ux"]
+    assert group["idea_ids"] == [board["idea"]]
+    assert group["color"] == "#000"
+
+
+def test_missing_row_is_404(client, board):
+    response = client.patch("/ideas/999/size", json={"width": 1, "height": 1})
+    assert response.status_code == 404